@@ -0,0 +1,123 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Write speed and read latency of positions and m/z per candidate chunk shape."""
+
+# candidates are the chunk shape of prioritized_axes_heuristic, the one of
+# tune_chunk_shape, and fixed numbers of rows, reads use the default h5py chunk
+# cache, a random slab are RANDOM_SLAB_ROWS consecutive ions at a random offset
+
+import os
+import tempfile
+
+import h5py
+import numpy as np
+from pynxtools.dataconverter.chunk import prioritized_axes_heuristic
+
+from pynxtools_apm.parsers.ifes_reconstruction import IfesReconstructionParser
+from pynxtools_apm.utils.chunk_tuner import tune_chunk_shape
+from pynxtools_apm.utils.compression_policy import get_hdf5_dataset_kwargs
+from pynxtools_apm.utils.generate_synthetic_data import ApmCreateExampleData
+
+from .bench_reader import SEED, SIZES, get_file_path
+
+FIELDS = {
+    "positions": (
+        "/ENTRY[entry1]/atom_probeID[atom_probe]/reconstruction/reconstructed_positions",
+        (0, 1),
+    ),
+    "mass_to_charge": (
+        "/ENTRY[entry1]/atom_probeID[atom_probe]/mass_to_charge_conversion/mass_to_charge",
+        (0,),
+    ),
+}
+CANDIDATES = ("heuristic", "tuned", "4096", "65536", "1048576")
+RANDOM_SLAB_ROWS = 10000
+N_RANDOM_SLABS = 20
+
+
+def get_chunk_shape(values: np.ndarray, field_class: str, candidate: str):
+    axes = FIELDS[field_class][1]
+    if candidate == "heuristic":
+        return prioritized_axes_heuristic(values, axes)
+    if candidate == "tuned":
+        return tune_chunk_shape(values, field_class, axes)
+    return (min(int(candidate), values.shape[0]),) + values.shape[1:]
+
+
+class ChunkShapes:
+    """Write a field with a candidate chunk shape and read it in slabs or as whole."""
+
+    params = (tuple(FIELDS), CANDIDATES, SIZES)
+    param_names = ["field_class", "candidate", "n_ions"]
+    timeout = 1200
+
+    def setup_cache(self):
+        cache_dir = tempfile.mkdtemp(prefix="pynxtools_apm_benchmarks_")
+        for n_ions in SIZES:
+            ApmCreateExampleData(SEED, n_ions).write(
+                get_file_path(cache_dir, n_ions, ".epos")
+            )
+        return cache_dir
+
+    def setup(self, cache_dir, field_class, candidate, n_ions):
+        template: dict = {}
+        IfesReconstructionParser(get_file_path(cache_dir, n_ions, ".epos"), 1).parse(
+            template
+        )
+        self.staged = template[FIELDS[field_class][0]]
+        self.staged["chunks"] = get_chunk_shape(
+            self.staged["compress"], field_class, candidate
+        )
+        self.file_path = os.path.join(
+            cache_dir, f"{field_class}.{candidate}.{n_ions}.{os.getpid()}.h5"
+        )
+        self.write()
+        rng = np.random.default_rng(SEED)
+        self.offsets = rng.integers(
+            0, max(n_ions - RANDOM_SLAB_ROWS, 1), N_RANDOM_SLABS
+        )
+
+    def teardown(self, cache_dir, field_class, candidate, n_ions):
+        if os.path.isfile(self.file_path):
+            os.remove(self.file_path)
+
+    def write(self):
+        with h5py.File(self.file_path, "w") as h5w:
+            h5w.create_dataset(
+                "values",
+                data=self.staged["compress"],
+                **get_hdf5_dataset_kwargs(self.staged),
+            )
+
+    def time_write(self, cache_dir, field_class, candidate, n_ions):
+        self.write()
+
+    def time_read_random_slab(self, cache_dir, field_class, candidate, n_ions):
+        with h5py.File(self.file_path, "r") as h5r:
+            dst = h5r["values"]
+            for offset in self.offsets:
+                dst[offset : offset + RANDOM_SLAB_ROWS]
+
+    def time_read_full(self, cache_dir, field_class, candidate, n_ions):
+        with h5py.File(self.file_path, "r") as h5r:
+            h5r["values"][...]
+
+    def track_file_size(self, cache_dir, field_class, candidate, n_ions):
+        return os.path.getsize(self.file_path)
+
+    track_file_size.unit = "bytes"
@@ -0,0 +1,168 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Write throughput and file size of the compressed fields per compression policy."""
+
+# the fields of a synthetic ePOS file are staged with each policy and written with
+# the function of the pynxtools writer which handles compressed template values,
+# throughput is the uncompressed payload divided by the time to write it,
+# ParallelCompression compresses the chunks of gzip fields in a thread pool like
+# repack_nexus_file does after a conversion
+
+import os
+import tempfile
+import time
+
+import h5py
+import numpy as np
+from pynxtools.dataconverter.writer import handle_dicts_entries
+
+from pynxtools_apm.parsers.ifes_reconstruction import IfesReconstructionParser
+from pynxtools_apm.utils.compression_policy import (
+    COMPRESSION_POLICIES,
+    get_hdf5_dataset_kwargs,
+    use_compression_policy,
+)
+from pynxtools_apm.utils.generate_synthetic_data import ApmCreateExampleData
+from pynxtools_apm.utils.indexed_template import get_payload_nbytes
+from pynxtools_apm.utils.parallel_compression import write_compressed_chunks
+
+from .bench_reader import SEED, SIZES, get_file_path
+
+POLICIES = tuple(COMPRESSION_POLICIES)
+WORKERS = (1, 2, 4)
+
+
+def write_compressed(template: dict, file_path: str):
+    with h5py.File(file_path, "w") as h5w:
+        for key, value in template.items():
+            if isinstance(value, dict) and "compress" in value:
+                name = key.replace("/", "_")
+                handle_dicts_entries(value, h5w, name, file_path, key, False)
+
+
+def write_staged(
+    h5grp: h5py.Group,
+    name: str,
+    staged: dict | np.ndarray,
+    max_workers: int | None = None,
+) -> h5py.Dataset:
+    """Create a dataset for a value staged with stage_compressed."""
+    if not isinstance(staged, dict):  # smaller than the compression threshold
+        return h5grp.create_dataset(name, data=staged)
+    values = staged["compress"]
+    if (
+        staged.get("filter") == "gzip"
+        and isinstance(staged.get("chunks"), tuple)
+        and isinstance(values, np.ndarray)
+        and values.ndim > 0
+    ):
+        return write_compressed_chunks(
+            h5grp,
+            name,
+            values,
+            staged["chunks"],
+            staged["strength"],
+            max_workers=max_workers,
+        )
+    return h5grp.create_dataset(name, data=values, **get_hdf5_dataset_kwargs(staged))
+
+
+class CompressionPolicies:
+    """Write the compressed fields of a reconstruction with each policy."""
+
+    params = (POLICIES, SIZES)
+    param_names = ["policy", "n_ions"]
+    timeout = 1200
+
+    def setup_cache(self):
+        cache_dir = tempfile.mkdtemp(prefix="pynxtools_apm_benchmarks_")
+        for n_ions in SIZES:
+            ApmCreateExampleData(SEED, n_ions).write(
+                get_file_path(cache_dir, n_ions, ".epos")
+            )
+        return cache_dir
+
+    def setup(self, cache_dir, policy, n_ions):
+        self.template: dict = {}
+        with use_compression_policy(policy):
+            IfesReconstructionParser(
+                get_file_path(cache_dir, n_ions, ".epos"), 1
+            ).parse(self.template)
+        self.n_bytes = sum(
+            get_payload_nbytes(value) for value in self.template.values()
+        )
+        self.file_path = os.path.join(cache_dir, f"{policy}.{n_ions}.{os.getpid()}.h5")
+
+    def teardown(self, cache_dir, policy, n_ions):
+        if os.path.isfile(self.file_path):
+            os.remove(self.file_path)
+
+    def time_write(self, cache_dir, policy, n_ions):
+        write_compressed(self.template, self.file_path)
+
+    def track_throughput(self, cache_dir, policy, n_ions):
+        start = time.perf_counter()
+        write_compressed(self.template, self.file_path)
+        return self.n_bytes / (time.perf_counter() - start)
+
+    track_throughput.unit = "bytes/s"
+
+    def track_file_size(self, cache_dir, policy, n_ions):
+        write_compressed(self.template, self.file_path)
+        return os.path.getsize(self.file_path)
+
+    track_file_size.unit = "bytes"
+
+    def track_compression_ratio(self, cache_dir, policy, n_ions):
+        write_compressed(self.template, self.file_path)
+        return self.n_bytes / os.path.getsize(self.file_path)
+
+    track_compression_ratio.unit = "ratio"
+
+
+class ParallelCompression:
+    """Write the compressed fields with chunks compressed in a thread pool."""
+
+    params = (WORKERS, SIZES)
+    param_names = ["max_workers", "n_ions"]
+    timeout = 1200
+
+    def setup_cache(self):
+        return CompressionPolicies().setup_cache()
+
+    def setup(self, cache_dir, max_workers, n_ions):
+        self.template: dict = {}
+        with use_compression_policy("balanced"):
+            IfesReconstructionParser(
+                get_file_path(cache_dir, n_ions, ".epos"), 1
+            ).parse(self.template)
+        self.file_path = os.path.join(
+            cache_dir, f"parallel.{max_workers}.{n_ions}.{os.getpid()}.h5"
+        )
+
+    def teardown(self, cache_dir, max_workers, n_ions):
+        if os.path.isfile(self.file_path):
+            os.remove(self.file_path)
+
+    def time_write(self, cache_dir, max_workers, n_ions):
+        with h5py.File(self.file_path, "w") as h5w:
+            for key, value in self.template.items():
+                if isinstance(value, dict) and "compress" in value:
+                    write_staged(
+                        h5w, key.replace("/", "_"), value, max_workers=max_workers
+                    )
@@ -0,0 +1,37 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Cold-start cost of importing the reader, each sample runs in a fresh interpreter."""
+
+
+def timeraw_import_reader():
+    return """
+    import pynxtools_apm.reader
+    """
+
+
+def timeraw_import_reader_and_parse_pos_rrng():
+    # the readers for the formats of a typical job are resolved on first use only
+    return """
+    import pynxtools_apm.parsers.ifes_ranging
+    import pynxtools_apm.parsers.ifes_reconstruction
+    from pynxtools_apm.utils.format_registry import get_reader_spec
+    from pynxtools_apm.utils.lazy_import import load_object
+
+    load_object(get_reader_spec("pos", "reconstruction"))
+    load_object(get_reader_spec("rrng", "ranging"))
+    """
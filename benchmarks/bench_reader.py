@@ -0,0 +1,150 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Time and peak memory of the reader stages on synthetic datasets per format and size."""
+
+# the datasets are synthesized once per benchmark run in setup_cache, the number
+# of ions defaults to sizes which complete within seconds, larger sizes like
+# PYNXTOOLS_APM_BENCHMARK_SIZES=1000000,100000000 need a correspondingly large disk
+
+import json
+import os
+import shutil
+import tempfile
+
+from pynxtools.dataconverter.template import Template
+
+from pynxtools_apm.parsers.ifes_ranging import IfesRangingDefinitionsParser
+from pynxtools_apm.parsers.ifes_reconstruction import IfesReconstructionParser
+from pynxtools_apm.reader import APMReader
+from pynxtools_apm.utils.generate_synthetic_data import ApmCreateExampleData
+from pynxtools_apm.utils.profiling import PROFILING_JSON_ENV_VAR
+
+BENCHMARK_SIZES_ENV_VAR = "PYNXTOOLS_APM_BENCHMARK_SIZES"
+SIZES = tuple(
+    int(n_ions)
+    for n_ions in os.environ.get(BENCHMARK_SIZES_ENV_VAR, "10000,1000000").split(",")
+)
+FORMATS = (".pos", ".epos", ".apt")
+STAGES = ("reconstruction", "ranging", "default_plots", "cleanup")
+SEED = 42
+
+
+def get_file_path(cache_dir: str, n_ions: int, suffix: str) -> str:
+    return os.path.join(cache_dir, f"synthetic.{n_ions}{suffix}")
+
+
+def create_datasets() -> str:
+    cache_dir = tempfile.mkdtemp(prefix="pynxtools_apm_benchmarks_")
+    for n_ions in SIZES:
+        dataset = ApmCreateExampleData(SEED, n_ions)
+        for suffix in FORMATS + (".rrng",):
+            dataset.write(get_file_path(cache_dir, n_ions, suffix))
+    return cache_dir
+
+
+class ReaderStages:
+    """Parse reconstruction and ranging definitions alone and run the full reader."""
+
+    params = (FORMATS, SIZES)
+    param_names = ["file_format", "n_ions"]
+    timeout = 1200
+
+    def setup_cache(self):
+        return create_datasets()
+
+    def setup(self, cache_dir, file_format, n_ions):
+        self.file_paths = (
+            get_file_path(cache_dir, n_ions, file_format),
+            get_file_path(cache_dir, n_ions, ".rrng"),
+        )
+
+    def time_reconstruction(self, cache_dir, file_format, n_ions):
+        IfesReconstructionParser(self.file_paths[0], 1).parse({})
+
+    def peakmem_reconstruction(self, cache_dir, file_format, n_ions):
+        IfesReconstructionParser(self.file_paths[0], 1).parse({})
+
+    def time_ranging(self, cache_dir, file_format, n_ions):
+        IfesRangingDefinitionsParser(self.file_paths[1], 1).parse({})
+
+    def time_read(self, cache_dir, file_format, n_ions):
+        APMReader().read(Template(), self.file_paths)
+
+    def peakmem_read(self, cache_dir, file_format, n_ions):
+        APMReader().read(Template(), self.file_paths)
+
+
+class ReaderStageProfile:
+    """Wall time and peak memory increase of each stage as profiled by the reader."""
+
+    params = (FORMATS, SIZES, STAGES)
+    param_names = ["file_format", "n_ions", "stage"]
+    timeout = 1200
+    unit = "seconds"
+
+    def setup_cache(self):
+        return create_datasets()
+
+    def setup(self, cache_dir, file_format, n_ions, stage):
+        file_paths = (
+            get_file_path(cache_dir, n_ions, file_format),
+            get_file_path(cache_dir, n_ions, ".rrng"),
+        )
+        json_file_path = os.path.join(cache_dir, f"profile.{os.getpid()}.json")
+        os.environ[PROFILING_JSON_ENV_VAR] = json_file_path
+        try:
+            APMReader().read(Template(), file_paths)
+        finally:
+            del os.environ[PROFILING_JSON_ENV_VAR]
+        with open(json_file_path) as fp:
+            self.stages = {record["name"]: record for record in json.load(fp)["stages"]}
+        os.remove(json_file_path)
+
+    def track_elapsed_time(self, cache_dir, file_format, n_ions, stage):
+        return self.stages[stage]["elapsed_time"]
+
+    def track_peak_resident_memory_increase(
+        self, cache_dir, file_format, n_ions, stage
+    ):
+        return self.stages[stage]["peak_resident_memory_increase"]
+
+    track_peak_resident_memory_increase.unit = "bytes"
+
+
+class SyntheticData:
+    """Throughput of writing synthetic reconstructions chunk by chunk."""
+
+    params = (FORMATS, SIZES)
+    param_names = ["file_format", "n_ions"]
+    timeout = 1200
+
+    def setup(self, file_format, n_ions):
+        self.cache_dir = tempfile.mkdtemp(prefix="pynxtools_apm_benchmarks_")
+
+    def teardown(self, file_format, n_ions):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def time_write(self, file_format, n_ions):
+        ApmCreateExampleData(SEED, n_ions).write(
+            get_file_path(self.cache_dir, n_ions, file_format)
+        )
+
+    def peakmem_write(self, file_format, n_ions):
+        ApmCreateExampleData(SEED, n_ions).write(
+            get_file_path(self.cache_dir, n_ions, file_format)
+        )
@@ -24,12 +24,18 @@ from pynxtools_apm.utils.pint_custom_unit_registry import ureg
 MASS_SPECTRUM_DEFAULT_BINNING = ureg.Quantity(0.01, ureg.dalton)
 NAIVE_GRID_DEFAULT_VOXEL_SIZE = ureg.Quantity(1.0, ureg.nanometer)
 NAIVE_GRID_DEFAULT_MAX_SIZE = 1024**3  # byte
+CURVE_PREVIEW_MAX_POINTS = 100_000  # longer curves are decimated for default plots
 DEFAULT_COMPRESSION_FILTER = "gzip"
-FAST_COMPRESSION_FILTER = (
-    "gzip"  # workaround 2026/05/29, develop still uses pynxtools 0.132"blosc"
-)
 DEFAULT_COMPRESSION_LEVEL = 9
+COMPRESSION_POLICY = "standard"  # standard, fastest, balanced, or archival
+COMPRESSION_MIN_SIZE = (
+    4096  # byte, smaller arrays are stored uncompressed, 0 compresses all
+)
 MAKE_RANGING_DEFINITIONS_UNIQUE = True
+MEMORY_BUDGET = 0  # byte, 0 uses a fraction of the available main memory
+PROFILING_EVENTS = False  # stages as NXcs_profiling_event, values differ per run
+USE_INDEXED_TEMPLATE = False  # index template keys for prefix and suffix queries
+READER_THREADS = 1  # >1 runs independent parsing stages concurrently, 1 in order
 SEPARATOR = "____"
 
 
@@ -18,6 +18,7 @@
 """Utilities for working with NeXus concepts encoded as Python dicts in the concepts dir."""
 
 from datetime import datetime
+from time import perf_counter_ns
 from typing import Any
 
 import flatdict as fd
@@ -30,7 +31,13 @@ from pynxtools_apm.utils.get_checksum import (
     get_sha256_of_file_content,
 )
 from pynxtools_apm.utils.interpret_boolean import try_interpret_as_boolean
-from pynxtools_apm.utils.pint_custom_unit_registry import is_not_special_unit, ureg
+from pynxtools_apm.utils.pint_custom_unit_registry import (
+    convert_to,
+    get_unit,
+    is_not_special_unit,
+    ureg,
+)
+from pynxtools_apm.utils.profiling import add_field_cost, get_field_costs
 from pynxtools_apm.utils.string_conversions import right_chop
 
 # best practice is use np.ndarray or np.generic as magnitude within that ureg.Quantity!
@@ -79,6 +86,26 @@ def var_path_to_specific_path(path: str, instance_identifier: list):
                 return nx_specific_path
 
 
+def compile_var_path(path: str) -> tuple[str, ...]:
+    """Split a variadic path once into the parts between its * placeholders."""
+    return tuple(path.split("*"))
+
+
+def resolve_var_path(parts: tuple[str, ...], instance_identifier: list):
+    """Same as var_path_to_specific_path but for a path compiled with compile_var_path."""
+    if len(parts) == 1:
+        return parts[0] if parts[0] != "" else None
+    if len(instance_identifier) >= len(parts) - 1:
+        return (
+            "".join(
+                f"{part}{instance_identifier[idx]}"
+                for idx, part in enumerate(parts[0:-1])
+            )
+            + parts[-1]
+        )
+    return None
+
+
 def get_case(arg):
     """Identify which case an instruction from the configuration belongs to.
     Each case comes with specific instructions to resolve that are detailed
@@ -276,6 +303,192 @@ def use_functor(
     return template
 
 
+def compile_map_cmds(cmds: list, prfx_src: str, prfx_trg: str) -> list[tuple]:
+    """Resolve case, src keys, and trg path parts of map instructions once.
+
+    Each instruction is compiled into a tuple (case, trg_parts, src_keys, cmd).
+    """
+    compiled: list[tuple] = []
+    for cmd in cmds:
+        case = get_case(cmd)
+        if case == "case_one":  # str
+            compiled.append(
+                (
+                    case,
+                    compile_var_path(f"{prfx_trg}/{cmd}"),
+                    (f"{prfx_src}{cmd}",),
+                    cmd,
+                )
+            )
+            continue
+        if case is None:
+            raise ValueError(f"Unexpected instruction {cmd} in map_functor !")
+        if case.startswith("case_four"):
+            compiled.append((case, (), (), cmd))
+            continue
+        if case in ("case_two_str", "case_three_str", "case_five_str"):
+            src_paths = [cmd[-1] if case == "case_two_str" else cmd[2]]
+        elif case == "case_six":
+            src_paths = [cmd[2], cmd[3]]
+        else:  # all *_list cases
+            src_paths = cmd[-1] if case == "case_two_list" else cmd[2]
+            # ignore empty list, all src paths str
+            if len(src_paths) == 0:
+                continue
+            if not all(isinstance(val, str) for val in src_paths):
+                continue
+        compiled.append(
+            (
+                case,
+                compile_var_path(f"{prfx_trg}/{cmd[0]}"),
+                tuple(f"{prfx_src}{val}" for val in src_paths),
+                cmd,
+            )
+        )
+    return compiled
+
+
+def run_map_cmd(
+    compiled_cmd: tuple,
+    mdata: fd.FlatDict,
+    ids: list,
+    template: dict,
+    trg_dtype_key: str = "",
+):
+    """Process a single map instruction compiled with compile_map_cmds."""
+    case, trg_parts, src_keys, cmd = compiled_cmd
+    if case == "case_one" or case == "case_two_str":  # str or str, str
+        src_val = mdata.get(src_keys[0])
+        if src_val is not None and src_val != "":
+            trg = resolve_var_path(trg_parts, ids)
+            set_value(template, trg, src_val, trg_dtype_key)
+    elif case == "case_two_list":
+        # all src_val have to exist of same type
+        if not all(key in mdata for key in src_keys):
+            return
+        src_values = [mdata[key] for key in src_keys]
+        if not all(src_val is not None and src_val != "" for src_val in src_values):
+            return
+        if trg_dtype_key != "str":
+            if not all(type(val) is type(src_values[0]) for val in src_values):
+                return
+        trg = resolve_var_path(trg_parts, ids)
+        set_value(template, trg, src_values, trg_dtype_key)
+    elif case == "case_three_str":  # str, ureg.Unit, str
+        src_val = mdata.get(src_keys[0])
+        if not src_val:
+            return
+        trg = resolve_var_path(trg_parts, ids)
+        if isinstance(src_val, ureg.Quantity):
+            set_value(
+                template,
+                trg,
+                convert_to(src_val.magnitude, src_val.units, cmd[1]),
+                trg_dtype_key,
+            )
+        else:
+            set_value(template, trg, ureg.Quantity(src_val, cmd[1]), trg_dtype_key)
+    elif case == "case_three_list":  # str, ureg.Unit, list
+        if not all(key in mdata for key in src_keys):
+            return
+        src_values = [mdata[key] for key in src_keys]
+        if not all(src_val is not None and src_val != "" for src_val in src_values):
+            return
+        if not all(type(val) is type(src_values[0]) for val in src_values):
+            # need to check whether content are scalars also
+            return
+        trg = resolve_var_path(trg_parts, ids)
+        # potentially a list of ureg.Quantities with different scaling
+        normalize = []
+        for val in src_values:
+            if isinstance(val, ureg.Quantity):
+                normalize.append(convert_to(val.magnitude, val.units, cmd[1]).magnitude)
+            else:
+                raise TypeError("Unimplemented case for {val} in case_three_list !")
+        set_value(
+            template,
+            trg,
+            ureg.Quantity(normalize, cmd[1]),
+            trg_dtype_key,
+        )
+    elif case.startswith("case_four"):
+        # both of these cases can be avoided in an implementation when the
+        # src quantity is already a pint quantity instead of some
+        # pure python or numpy value or array respectively
+        raise NotImplementedError(
+            f"Hitting unimplemented case_four, instead refactor implementation such"
+            f"that values on the src side are pint.Quantities already!"
+        )
+    elif case == "case_five_str":
+        src_val = mdata.get(src_keys[0])
+        if not src_val:
+            return
+        trg = resolve_var_path(trg_parts, ids)
+        if isinstance(src_val, ureg.Quantity):
+            set_value(
+                template,
+                trg,
+                convert_to(src_val.magnitude, src_val.units, cmd[1]),
+                trg_dtype_key,
+            )
+        else:
+            set_value(template, trg, convert_to(src_val, cmd[3], cmd[1]), trg_dtype_key)
+    elif case == "case_five_list":
+        if not all(key in mdata for key in src_keys):
+            return
+        src_values = [mdata[key] for key in src_keys]
+        if not all(src_val is not None and src_val != "" for src_val in src_values):
+            return
+        if isinstance(src_values[0], ureg.Quantity):
+            raise ValueError(f"Hit unimplemented case that src_val is ureg.Quantity")
+        if not all(type(val) is type(src_values[0]) for val in src_values):
+            return
+        trg = resolve_var_path(trg_parts, ids)
+        set_value(template, trg, convert_to(src_values, cmd[3], cmd[1]), trg_dtype_key)
+    elif case == "case_six":
+        # logger.debug(">>>> Hitting case_six, check handling of units!")
+        if src_keys[0] not in mdata or src_keys[1] not in mdata:
+            return
+        src_val = mdata[src_keys[0]]
+        src_unit = mdata[src_keys[1]]
+        if not src_val or not src_unit:
+            return
+        trg = resolve_var_path(trg_parts, ids)
+        if isinstance(src_val, ureg.Quantity):
+            set_value(
+                template,
+                trg,
+                convert_to(src_val.magnitude, src_val.units, cmd[1]),
+                trg_dtype_key,
+            )
+        else:
+            set_value(
+                template,
+                trg,
+                convert_to(src_val, get_unit(src_unit), cmd[1]),
+                trg_dtype_key,
+            )
+
+
+def run_map_cmds(
+    compiled: list[tuple],
+    mdata: fd.FlatDict,
+    ids: list,
+    template: dict,
+    trg_dtype_key: str = "",
+) -> dict:
+    """Process map instructions compiled with compile_map_cmds."""
+    field_costs = get_field_costs()
+    for compiled_cmd in compiled:
+        if field_costs is None:
+            run_map_cmd(compiled_cmd, mdata, ids, template, trg_dtype_key)
+            continue
+        tic = perf_counter_ns()
+        run_map_cmd(compiled_cmd, mdata, ids, template, trg_dtype_key)
+        add_field_cost(field_costs, "*".join(compiled_cmd[1]), perf_counter_ns() - tic)
+    return template
+
+
 def map_functor(
     cmds: list,
     mdata: fd.FlatDict,
@@ -291,132 +504,9 @@ def map_functor(
     # either here or on a resolved variadic name in the trg variable
     # in the set_value function or specific parameterized concept names like
     # cmd[0] == "optics/operation_mode" (see rsciio_gatan_cfg, GATAN_DYNAMIC_VARIOUS_NX)
-    for cmd in cmds:
-        case = get_case(cmd)
-        if case == "case_one":  # str
-            src_val = mdata.get(f"{prfx_src}{cmd}")
-            if src_val is not None and src_val != "":
-                trg = var_path_to_specific_path(f"{prfx_trg}/{cmd}", ids)
-                set_value(template, trg, src_val, trg_dtype_key)
-        elif case == "case_two_str":  # str, str
-            src_val = mdata.get(f"{prfx_src}{cmd[1]}")
-            if src_val is not None and src_val != "":
-                trg = var_path_to_specific_path(f"{prfx_trg}/{cmd[0]}", ids)
-                set_value(template, trg, src_val, trg_dtype_key)
-        elif case == "case_two_list":
-            # ignore empty list, all src paths str, all src_val have to exist of same type
-            if len(cmd[1]) == 0:
-                continue
-            if not all(isinstance(val, str) for val in cmd[1]):
-                continue
-            if not all(f"{prfx_src}{val}" in mdata for val in cmd[1]):
-                continue
-            src_values = [mdata[f"{prfx_src}{val}"] for val in cmd[1]]
-            if len(src_values) == 0:
-                continue
-            if not all(src_val is not None and src_val != "" for src_val in src_values):
-                continue
-            if trg_dtype_key != "str":
-                if not all(type(val) is type(src_values[0]) for val in src_values):
-                    continue
-            trg = var_path_to_specific_path(f"{prfx_trg}/{cmd[0]}", ids)
-            set_value(template, trg, src_values, trg_dtype_key)
-        elif case == "case_three_str":  # str, ureg.Unit, str
-            src_val = mdata.get(f"{prfx_src}{cmd[2]}")
-            if not src_val:
-                continue
-            trg = var_path_to_specific_path(f"{prfx_trg}/{cmd[0]}", ids)
-            if isinstance(src_val, ureg.Quantity):
-                set_value(template, trg, src_val.to(cmd[1]), trg_dtype_key)
-            else:
-                set_value(template, trg, ureg.Quantity(src_val, cmd[1]), trg_dtype_key)
-        elif case == "case_three_list":  # str, ureg.Unit, list
-            if len(cmd[2]) == 0:
-                continue
-            if not all(isinstance(val, str) for val in cmd[2]):
-                continue
-            if not all(f"{prfx_src}{val}" in mdata for val in cmd[2]):
-                continue
-            src_values = [mdata[f"{prfx_src}{val}"] for val in cmd[2]]
-            if not all(src_val is not None and src_val != "" for src_val in src_values):
-                continue
-            if not all(type(val) is type(src_values[0]) for val in src_values):
-                # need to check whether content are scalars also
-                continue
-            trg = var_path_to_specific_path(f"{prfx_trg}/{cmd[0]}", ids)
-            if isinstance(src_values, ureg.Quantity):
-                set_value(template, trg, src_values, trg_dtype_key)
-            else:
-                # potentially a list of ureg.Quantities with different scaling
-                normalize = []
-                for val in src_values:
-                    if isinstance(val, ureg.Quantity):
-                        normalize.append(val.to(cmd[1]).magnitude)
-                    else:
-                        raise TypeError(
-                            "Unimplemented case for {val} in case_three_list !"
-                        )
-                set_value(
-                    template,
-                    trg,
-                    ureg.Quantity(normalize, cmd[1]),
-                    trg_dtype_key,
-                )
-        elif case.startswith("case_four"):
-            # both of these cases can be avoided in an implementation when the
-            # src quantity is already a pint quantity instead of some
-            # pure python or numpy value or array respectively
-            raise NotImplementedError(
-                f"Hitting unimplemented case_four, instead refactor implementation such"
-                f"that values on the src side are pint.Quantities already!"
-            )
-        elif case == "case_five_str":
-            src_val = mdata.get(f"{prfx_src}{cmd[2]}")
-            if not src_val:
-                continue
-            trg = var_path_to_specific_path(f"{prfx_trg}/{cmd[0]}", ids)
-            if isinstance(src_val, ureg.Quantity):
-                set_value(template, trg, src_val.to(cmd[1]), trg_dtype_key)
-            else:
-                pint_src = ureg.Quantity(src_val, cmd[3])
-                set_value(template, trg, pint_src.to(cmd[1]), trg_dtype_key)
-        elif case == "case_five_list":
-            if len(cmd[2]) == 0:
-                continue
-            if not all(isinstance(val, str) for val in cmd[2]):
-                continue
-            if not all(f"{prfx_src}{val}" in mdata for val in cmd[2]):
-                continue
-            src_values = [mdata[f"{prfx_src}{val}"] for val in cmd[2]]
-            if not all(src_val is not None and src_val != "" for src_val in src_values):
-                continue
-            if isinstance(src_values[0], ureg.Quantity):
-                raise ValueError(
-                    f"Hit unimplemented case that src_val is ureg.Quantity"
-                )
-            if not all(type(val) is type(src_values[0]) for val in src_values):
-                continue
-            trg = var_path_to_specific_path(f"{prfx_trg}/{cmd[0]}", ids)
-            if isinstance(src_values, ureg.Quantity):
-                set_value(template, trg, src_values.to(cmd[1]), trg_dtype_key)
-            else:
-                pint_src = ureg.Quantity(src_values, cmd[3])
-                set_value(template, trg, pint_src.to(cmd[1]), trg_dtype_key)
-        elif case == "case_six":
-            # logger.debug(">>>> Hitting case_six, check handling of units!")
-            if f"{prfx_src}{cmd[2]}" not in mdata or f"{prfx_src}{cmd[3]}" not in mdata:
-                continue
-            src_val = mdata[f"{prfx_src}{cmd[2]}"]
-            src_unit = mdata[f"{prfx_src}{cmd[3]}"]
-            if not src_val or not src_unit:
-                continue
-            trg = var_path_to_specific_path(f"{prfx_trg}/{cmd[0]}", ids)
-            if isinstance(src_val, ureg.Quantity):
-                set_value(template, trg, src_val.to(cmd[1]), trg_dtype_key)
-            else:
-                pint_src = ureg.Quantity(src_val, ureg.Unit(src_unit))
-                set_value(template, trg, pint_src.to(cmd[1]), trg_dtype_key)
-    return template
+    return run_map_cmds(
+        compile_map_cmds(cmds, prfx_src, prfx_trg), mdata, ids, template, trg_dtype_key
+    )
 
 
 def unix_timestamp_functor(
@@ -509,15 +599,12 @@ def filehash_functor(
     return template
 
 
-def add_specific_metadata_pint(
-    cfg: dict, mdata: fd.FlatDict, ids: list, template: dict
-) -> dict:
-    """Map specific concept src on specific NeXus concept trg.
+def compile_mapping_plan(cfg: dict) -> list[tuple]:
+    """Compile a configuration dictionary from configurations/*.py into a flat plan.
 
-    cfg: a configuration dictionary from configurations/*.py mapping from src to trg
-    mdata: instance data of src concepts
-    ids: list of identifier to resolve variadic template paths to specific template paths
-    template: dictionary where to store mapped instance data using template paths
+    The plan is a list of steps which are executed in order, map and map_to_* functors
+    are compiled into ("map", compiled_cmds, dtype_key) steps, all other functors into
+    ("use", cmds) or (functor_key, functor, cmds, prefix_src) steps.
     """
     if "prefix_trg" in cfg:
         prefix_trg = cfg["prefix_trg"]
@@ -541,50 +628,73 @@ def add_specific_metadata_pint(
     # returns an output, given the mapping can be abstract, we call it a functor
 
     # https://numpy.org/doc/stable/reference/arrays.dtypes.html
+    plan: list[tuple] = []
     for prefix_src in prfx_src:
         for functor_key, functor in cfg.items():
             if functor_key in ["prefix_trg", "prefix_src"]:
                 continue
             elif functor_key == "use":
-                use_functor(cfg["use"], mdata, prefix_trg, ids, template)
+                plan.append(("use", functor))
             elif functor_key == "map":
-                map_functor(functor, mdata, prefix_src, prefix_trg, ids, template)
+                plan.append(
+                    ("map", compile_map_cmds(functor, prefix_src, prefix_trg), "")
+                )
             elif functor_key.startswith("map_to_"):
                 dtype_key = functor_key.replace("map_to_", "")
                 if dtype_key in MAP_TO_DTYPES:
-                    map_functor(
-                        functor,
-                        mdata,
-                        prefix_src,
-                        prefix_trg,
-                        ids,
-                        template,
-                        dtype_key,
+                    plan.append(
+                        (
+                            "map",
+                            compile_map_cmds(functor, prefix_src, prefix_trg),
+                            dtype_key,
+                        )
                     )
                 else:
                     raise KeyError(f"Unexpected dtype_key {dtype_key} !")
             elif functor_key == "unix_to_iso8601":
-                unix_timestamp_functor(
-                    cfg["unix_to_iso8601"], mdata, prefix_src, prefix_trg, ids, template
-                )
+                plan.append((functor_key, unix_timestamp_functor, functor, prefix_src))
             elif functor_key == "cameca_to_iso8601":
-                cameca_timestamp_functor(
-                    cfg["cameca_to_iso8601"],
-                    mdata,
-                    prefix_src,
-                    prefix_trg,
-                    ids,
-                    template,
+                plan.append(
+                    (functor_key, cameca_timestamp_functor, functor, prefix_src)
                 )
             elif functor_key == DEFAULT_CHECKSUM_ALGORITHM:
-                filehash_functor(
-                    cfg[DEFAULT_CHECKSUM_ALGORITHM],
-                    mdata,
-                    prefix_src,
-                    prefix_trg,
-                    ids,
-                    template,
-                )
+                plan.append((functor_key, filehash_functor, functor, prefix_src))
             else:
                 raise KeyError(f"Unexpected functor_key {functor_key} !")
+    return plan
+
+
+# compiled plans by id of the configuration dictionary, the configuration itself is
+# kept as a reference such that its id cannot be reused by another object,
+# configurations are considered immutable once they have been compiled
+MAPPING_PLAN_CACHE: dict[int, tuple[dict, list[tuple]]] = {}
+
+
+def get_mapping_plan(cfg: dict) -> list[tuple]:
+    """Get compiled plan for cfg, compile on first use."""
+    cached = MAPPING_PLAN_CACHE.get(id(cfg))
+    if cached is None or cached[0] is not cfg:
+        cached = (cfg, compile_mapping_plan(cfg))
+        MAPPING_PLAN_CACHE[id(cfg)] = cached
+    return cached[1]
+
+
+def add_specific_metadata_pint(
+    cfg: dict, mdata: fd.FlatDict, ids: list, template: dict
+) -> dict:
+    """Map specific concept src on specific NeXus concept trg.
+
+    cfg: a configuration dictionary from configurations/*.py mapping from src to trg
+    mdata: instance data of src concepts
+    ids: list of identifier to resolve variadic template paths to specific template paths
+    template: dictionary where to store mapped instance data using template paths
+    """
+    prefix_trg = cfg.get("prefix_trg")
+    for step in get_mapping_plan(cfg):
+        if step[0] == "map":
+            run_map_cmds(step[1], mdata, ids, template, step[2])
+        elif step[0] == "use":
+            use_functor(step[1], mdata, prefix_trg, ids, template)
+        else:
+            step[1](step[2], mdata, step[3], prefix_trg, ids, template)
     return template
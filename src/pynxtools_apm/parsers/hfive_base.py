@@ -19,7 +19,10 @@
 
 # taken from pynxtools-em, eventually should be made a part of pynxtools like hfive_utils
 
+import hashlib
 import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 
 import h5py
 import numpy as np
@@ -78,6 +81,132 @@ def only_finite_payload(obj, payload) -> str:
     return "non_iufc"
 
 
+# upper bound for the number of bytes which are read from a dataset at once while
+# hashing; slabs are cut along the slowest axis and aligned to the chunks of the
+# dataset so that each chunk is decompressed only once
+HFIVE_HASHING_MAX_SLAB_SIZE = 64 * 1024**2  # byte
+
+
+def iterate_dataset_slabs(
+    h5obj: h5py.Dataset,
+    field_name: str = "",
+    max_slab_size: int = HFIVE_HASHING_MAX_SLAB_SIZE,
+):
+    """Yield consecutive slabs along axis 0 of the payload of h5obj (or of a field).
+
+    Slabs are C-contiguous and cover the full extent of all other axes, therefore
+    concatenating them yields exactly the bytes of the entire payload h5obj[()].
+    """
+    dtype = h5obj.dtype.fields[field_name][0] if field_name else h5obj.dtype
+    n_rows = h5obj.shape[0]
+    row_size = dtype.itemsize * int(np.prod(h5obj.shape[1:], dtype=np.int64))
+    rows_per_slab = max(1, max_slab_size // max(1, row_size))
+    if h5obj.chunks is not None:
+        rows_per_chunk = h5obj.chunks[0]
+        rows_per_slab = max(
+            rows_per_chunk, (rows_per_slab // rows_per_chunk) * rows_per_chunk
+        )
+    source = h5obj.fields(field_name) if field_name else h5obj
+    for start in range(0, n_rows, rows_per_slab):
+        yield np.ascontiguousarray(source[start : min(start + rows_per_slab, n_rows)])
+
+
+def scan_dataset_payload(
+    h5obj: h5py.Dataset,
+    field_name: str = "",
+    hashing: bool = True,
+    malformed: bool = True,
+    max_slab_size: int = HFIVE_HASHING_MAX_SLAB_SIZE,
+) -> tuple[str, dict]:
+    """Hash and analyze the payload of h5obj (or of a field) in a single pass.
+
+    Each slab is read once and fed to both the hasher and the statistics.
+    The digest is identical to get_sha256_of_bytes_object(h5obj[()]).
+    """
+    dtype = h5obj.dtype.fields[field_name][0] if field_name else h5obj.dtype
+    if h5obj.ndim == 0 or h5obj.size == 0 or dtype.hasobject:
+        # scalars, empty, and variable-length payload take the in-memory path
+        # as these cannot be represented as one contiguous block of bytes
+        blocks = [h5obj.fields(field_name)[()] if field_name else h5obj[()]]
+    else:
+        blocks = iterate_dataset_slabs(h5obj, field_name, max_slab_size)
+    sha256_hash = hashlib.sha256()
+    # like only_finite_payload, which inspects the compound and not the field,
+    # fields of a compound dataset are reported as non_iufc
+    is_iufc = dtype.kind in "iufc" and not field_name
+    stats: dict = {"dtype": str(dtype), "n_values": int(h5obj.size)}
+    if is_iufc:
+        stats.update({"n_finite": 0, "n_nan": 0, "min": None, "max": None})
+    for block in blocks:
+        if hashing:
+            sha256_hash.update(block)
+        if not malformed or not is_iufc:
+            continue
+        block = np.asarray(block)
+        if dtype.kind in "iu":
+            n_finite = block.size
+            finite = block
+        else:
+            is_finite = np.isfinite(block)
+            n_finite = int(np.count_nonzero(is_finite))
+            stats["n_nan"] += int(np.count_nonzero(np.isnan(block)))
+            finite = block if n_finite == block.size else block[is_finite]
+        stats["n_finite"] += n_finite
+        if n_finite > 0 and dtype.kind != "c":
+            lo, hi = np.min(finite).item(), np.max(finite).item()
+            stats["min"] = lo if stats["min"] is None else min(stats["min"], lo)
+            stats["max"] = hi if stats["max"] is None else max(stats["max"], hi)
+    if not malformed:
+        return (str(sha256_hash.hexdigest()) if hashing else "", {})
+    # finiteness is reported with the same vocabulary as only_finite_payload
+    if not is_iufc:
+        stats["finiteness"] = "non_iufc"
+    elif stats["n_values"] == 0:
+        stats["finiteness"] = "issue_with_scalars"
+    elif stats["n_finite"] == stats["n_values"]:
+        stats["finiteness"] = "all_finite"
+    else:
+        stats["finiteness"] = "not_all_finite"
+    if is_iufc:
+        stats["n_non_finite"] = stats["n_values"] - stats["n_finite"]
+    return (str(sha256_hash.hexdigest()) if hashing else "", stats)
+
+
+def get_sha256_of_dataset(
+    h5obj: h5py.Dataset,
+    field_name: str = "",
+    max_slab_size: int = HFIVE_HASHING_MAX_SLAB_SIZE,
+) -> str:
+    """Compute SHA256 of the payload of h5obj (or of a field) with bounded memory.
+
+    The digest is identical to get_sha256_of_bytes_object(h5obj[()]).
+    """
+    return scan_dataset_payload(
+        h5obj, field_name, hashing=True, malformed=False, max_slab_size=max_slab_size
+    )[0]
+
+
+# datasets with less payload are hashed inline even if a process pool is used
+# as then the overhead of dispatching the task exceeds the cost of hashing
+HFIVE_HASHING_PARALLEL_MIN_SIZE = 4 * 1024**2  # byte
+
+# each worker of the process pool holds its own read-only handle to the file
+_hashing_worker_h5r = None
+
+
+def _init_hashing_worker(file_path: str):
+    global _hashing_worker_h5r
+    _hashing_worker_h5r = h5py.File(file_path, "r")
+
+
+def _scan_dataset_in_worker(
+    dst_path: str, field_name: str, hashing: bool, malformed: bool
+) -> tuple[str, dict]:
+    return scan_dataset_payload(
+        _hashing_worker_h5r[dst_path], field_name, hashing, malformed
+    )
+
+
 NXAPM_VOLATILE_NAMED_HDF_PATHS = (
     "/@HDF5_Version",
     "/@NeXus_release",
@@ -102,6 +231,7 @@ class HdfFiveBaseParser:
         hashing: bool = True,
         malformed: bool = False,
         verbose: bool = False,
+        max_workers: int = 1,
     ):
         # tech_partner the company which designed this format
         # schema_name the specific name of the family of schemas supported by this reader
@@ -131,6 +261,9 @@ class HdfFiveBaseParser:
         self.hashing = hashing
         self.malformed = malformed
         self.verbose = verbose
+        # max_workers > 1 dispatches the scanning of large datasets to a process pool
+        self.max_workers = max_workers
+        self.deferred_scans: dict = {}
 
     def init_cache(self, cache_key: str) -> str:
         """Init a new cache for normalized EBSD data if not existent."""
@@ -158,6 +291,59 @@ class HdfFiveBaseParser:
             self.h5r.close()
             self.h5r = None
 
+    def scan_dataset(
+        self, node_key: str, h5obj: h5py.Dataset, field_name: str = "", prefix=""
+    ) -> tuple:
+        """Get hash and statistics of h5obj, large payload is deferred to the pool."""
+        if not self.hashing and not self.malformed:
+            return ("", "")
+        dtype = h5obj.dtype.fields[field_name][0] if field_name else h5obj.dtype
+        if (
+            self.max_workers > 1
+            and not dtype.hasobject
+            and h5obj.size * dtype.itemsize >= HFIVE_HASHING_PARALLEL_MIN_SIZE
+        ):
+            self.deferred_scans[node_key] = (h5obj.name, field_name, prefix)
+            return ("", "")
+        sha, stats = scan_dataset_payload(
+            h5obj, field_name, self.hashing, self.malformed
+        )
+        return (
+            f"{prefix}__{sha}" if self.hashing else "",
+            stats if self.malformed else "",
+        )
+
+    def resolve_deferred_scans(self):
+        """Scan all deferred datasets in a process pool and merge the results."""
+        if len(self.deferred_scans) == 0:
+            return
+        with ProcessPoolExecutor(
+            max_workers=min(self.max_workers, len(self.deferred_scans)),
+            # spawn instead of fork to not inherit the state of the HDF5 library
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_hashing_worker,
+            initargs=(self.file_path,),
+        ) as pool:
+            futures = {
+                node_key: pool.submit(
+                    _scan_dataset_in_worker,
+                    dst_path,
+                    field_name,
+                    self.hashing,
+                    self.malformed,
+                )
+                for node_key, (dst_path, field_name, _) in self.deferred_scans.items()
+            }
+            for node_key, future in futures.items():
+                sha, stats = future.result()
+                prefix = self.deferred_scans[node_key][2]
+                self.datasets[node_key] = (
+                    *self.datasets[node_key][0:4],
+                    f"{prefix}__{sha}" if self.hashing else "",
+                    stats if self.malformed else "",
+                )
+        self.deferred_scans = {}
+
     def __call__(self, node_name, h5obj):
         # only h5py datasets have dtype attribute, so we can search on this
         if isinstance(h5obj, h5py.Dataset):
@@ -172,12 +358,9 @@ class HdfFiveBaseParser:
                                 type(h5obj),
                                 np.shape(h5obj),
                                 h5obj[0],
-                                f"{h5obj.dtype}__{get_sha256_of_bytes_object(h5obj[()])}"
-                                if self.hashing
-                                else "",
-                                f"{only_finite_payload(h5obj, h5obj[()])}"
-                                if self.malformed
-                                else "",
+                                *self.scan_dataset(
+                                    node_name, h5obj, prefix=f"{h5obj.dtype}"
+                                ),
                             )
                             self.instances[node_name] = Concept(
                                 node_name,
@@ -191,24 +374,28 @@ class HdfFiveBaseParser:
                             n_dims = len(np.shape(h5obj))
                             if n_dims == 1:
                                 for name in h5obj.dtype.names:
+                                    # dtype and shape of the field from the
+                                    # metadata, subarray fields add their shape
+                                    field_dtype = h5obj.dtype.fields[name][0]
+                                    field_shape = h5obj.shape + field_dtype.shape
                                     self.datasets[f"{node_name}/#{name}"] = (
                                         "IS_FIELD_IN_COMPOUND_DATASET",
-                                        h5obj.fields(name)[()].dtype,
-                                        np.shape(h5obj.fields(name)[()]),
+                                        field_dtype.base,
+                                        field_shape,
                                         h5obj.fields(name)[0],
-                                        f"{h5obj.fields(name)[()].dtype}__{get_sha256_of_bytes_object(h5obj.fields(name)[()])}"
-                                        if self.hashing
-                                        else "",
-                                        f"{only_finite_payload(h5obj, h5obj.fields(name)[()])}"
-                                        if self.malformed
-                                        else "",
+                                        *self.scan_dataset(
+                                            f"{node_name}/#{name}",
+                                            h5obj,
+                                            name,
+                                            f"{field_dtype.base}",
+                                        ),
                                     )
                                     self.instances[f"{node_name}/{name}"] = Concept(
                                         node_name,
                                         None,
                                         None,
-                                        h5obj.fields(name)[()].dtype,
-                                        np.shape(h5obj.fields(name)[()]),
+                                        field_dtype.base,
+                                        field_shape,
                                         None,
                                         hdf_type="compound_dataset_entry",
                                     )
@@ -224,12 +411,11 @@ class HdfFiveBaseParser:
                                     type(h5obj),
                                     np.shape(h5obj),
                                     h5obj[()],
-                                    f"{h5obj.ndim}__{h5obj.shape}__{h5obj.dtype.name}__{get_sha256_of_bytes_object(h5obj[()])}"
-                                    if self.hashing
-                                    else "",
-                                    f"{only_finite_payload(h5obj, h5obj[()])}"
-                                    if self.malformed
-                                    else "",
+                                    *self.scan_dataset(
+                                        node_name,
+                                        h5obj,
+                                        prefix=f"{h5obj.ndim}__{h5obj.shape}__{h5obj.dtype.name}",
+                                    ),
                                 )
                                 self.instances[node_name] = Concept(
                                     node_name,
@@ -247,12 +433,11 @@ class HdfFiveBaseParser:
                                         type(h5obj),
                                         np.shape(h5obj),
                                         h5obj[0],
-                                        f"{h5obj.ndim}__{h5obj.shape}__{h5obj.dtype.name}__{get_sha256_of_bytes_object(h5obj[()])}"
-                                        if self.hashing
-                                        else "",
-                                        f"{only_finite_payload(h5obj, h5obj[()])}"
-                                        if self.malformed
-                                        else "",
+                                        *self.scan_dataset(
+                                            node_name,
+                                            h5obj,
+                                            prefix=f"{h5obj.ndim}__{h5obj.shape}__{h5obj.dtype.name}",
+                                        ),
                                     )
                                     self.instances[node_name] = Concept(
                                         node_name,
@@ -269,12 +454,11 @@ class HdfFiveBaseParser:
                                         type(h5obj),
                                         np.shape(h5obj),
                                         h5obj[()],
-                                        f"{h5obj.ndim}__{h5obj.shape}__{h5obj.dtype.name}__{get_sha256_of_bytes_object(h5obj[()])}"
-                                        if self.hashing
-                                        else "",
-                                        f"{only_finite_payload(h5obj, h5obj[()])}"
-                                        if self.malformed
-                                        else "",
+                                        *self.scan_dataset(
+                                            node_name,
+                                            h5obj,
+                                            prefix=f"{h5obj.ndim}__{h5obj.shape}__{h5obj.dtype.name}",
+                                        ),
                                     )
                                     self.instances[node_name] = Concept(
                                         node_name,
@@ -291,12 +475,11 @@ class HdfFiveBaseParser:
                                     type(h5obj),
                                     np.shape(h5obj),
                                     h5obj[0, 0],
-                                    f"{h5obj.ndim}__{h5obj.shape}__{h5obj.dtype.name}__{get_sha256_of_bytes_object(h5obj[()])}"
-                                    if self.hashing
-                                    else "",
-                                    f"{only_finite_payload(h5obj, h5obj[()])}"
-                                    if self.malformed
-                                    else "",
+                                    *self.scan_dataset(
+                                        node_name,
+                                        h5obj,
+                                        prefix=f"{h5obj.ndim}__{h5obj.shape}__{h5obj.dtype.name}",
+                                    ),
                                 )
                                 self.instances[node_name] = Concept(
                                     node_name,
@@ -313,12 +496,11 @@ class HdfFiveBaseParser:
                                     type(h5obj),
                                     np.shape(h5obj),
                                     h5obj[0, 0, 0],
-                                    f"{h5obj.ndim}__{h5obj.shape}__{h5obj.dtype.name}__{get_sha256_of_bytes_object(h5obj[()])}"
-                                    if self.hashing
-                                    else "",
-                                    f"{only_finite_payload(h5obj, h5obj[()])}"
-                                    if self.malformed
-                                    else "",
+                                    *self.scan_dataset(
+                                        node_name,
+                                        h5obj,
+                                        prefix=f"{h5obj.ndim}__{h5obj.shape}__{h5obj.dtype.name}",
+                                    ),
                                 )
                                 self.instances[node_name] = Concept(
                                     node_name,
@@ -335,12 +517,11 @@ class HdfFiveBaseParser:
                                     type(h5obj),
                                     np.shape(h5obj),
                                     None,
-                                    f"{h5obj.ndim}__{h5obj.shape}__{h5obj.dtype.name}__{get_sha256_of_bytes_object(h5obj[()])}"
-                                    if self.hashing
-                                    else "",
-                                    f"{only_finite_payload(h5obj, h5obj[()])}"
-                                    if self.malformed
-                                    else "",
+                                    *self.scan_dataset(
+                                        node_name,
+                                        h5obj,
+                                        prefix=f"{h5obj.ndim}__{h5obj.shape}__{h5obj.dtype.name}",
+                                    ),
                                 )
                                 self.instances[node_name] = Concept(
                                     node_name,
@@ -436,6 +617,7 @@ class HdfFiveBaseParser:
             # first step visit all groups and datasets recursively
             # get their full path within the HDF5 file
             self.h5r.visititems(self)
+            self.resolve_deferred_scans()
             # second step visit all these and get their attributes
             for h5path, h5ifo in self.groups.items():
                 self.get_attribute_data_structure(h5path, dict(self.h5r[h5path].attrs))
@@ -447,7 +629,9 @@ class HdfFiveBaseParser:
                         h5path, dict(self.h5r[h5path].attrs)
                     )
 
-    def store_hashes(self, blacklist_by_key: list, blacklist_by_suffix: list, **kwargs):
+    def store_hashes(
+        self, blacklist_by_key: list | tuple, blacklist_by_suffix: tuple, **kwargs
+    ):
         """Generate yaml file with sorted list of HDF5 grp, dst, and attrs
 
         including their datatype and SHA256 checksum computed from the each nodes data.
@@ -477,10 +661,10 @@ class HdfFiveBaseParser:
     def store_malformed(self, **kwargs):
         """Generate yaml file with sorted list of HDF5 dst
 
-        reporting if their payload is all finite or not."""
-        key_value: dict[str, str] = {}
+        reporting if their payload is all finite or not including value statistics."""
+        key_value: dict[str, dict] = {}
         for key, ifo in self.datasets.items():
-            key_value[key] = f"{ifo[-1]}"
+            key_value[key] = ifo[-1]
         with open(
             kwargs.get(
                 "file_path",
@@ -22,18 +22,6 @@ from typing import Any
 
 import numpy as np
 from ase.data import chemical_symbols
-from ifes_apt_tc_data_modeling.analysisset.analysisset_reader import (
-    ReadAnalysissetFileFormat,
-)
-from ifes_apt_tc_data_modeling.cameca.cameca_reader import ReadCamecaHfiveFileFormat
-from ifes_apt_tc_data_modeling.env.env_reader import ReadEnvFileFormat
-from ifes_apt_tc_data_modeling.fig.fig_reader import ReadFigTxtFileFormat
-from ifes_apt_tc_data_modeling.imago.imago_reader import ReadImagoAnalysisFileFormat
-from ifes_apt_tc_data_modeling.pyccapt.pyccapt_reader import (
-    ReadPyccaptRangingFileFormat,
-)
-from ifes_apt_tc_data_modeling.rng.rng_reader import ReadRngFileFormat
-from ifes_apt_tc_data_modeling.rrng.rrng_reader import ReadRrngFileFormat
 from ifes_apt_tc_data_modeling.utils.definitions import (
     MAX_NUMBER_OF_ATOMS_PER_ION,
     MAX_NUMBER_OF_ION_SPECIES,
@@ -44,15 +32,13 @@ from ifes_apt_tc_data_modeling.utils.utils import (
     nuclide_hash_to_human_readable_name,
     nuclide_hash_to_nuclide_list,
 )
-from pynxtools.dataconverter.chunk import prioritized_axes_heuristic
 
-from pynxtools_apm import (
-    DEFAULT_COMPRESSION_FILTER,
-    DEFAULT_COMPRESSION_LEVEL,
-    MAKE_RANGING_DEFINITIONS_UNIQUE,
-    get_pynxtools_apm_version,
-)
-from pynxtools_apm.utils.io_case_logic import VALID_FILE_NAME_SUFFIX_RANGE
+from pynxtools_apm import MAKE_RANGING_DEFINITIONS_UNIQUE, get_pynxtools_apm_version
+from pynxtools_apm.utils.compression_policy import get_staged_values, stage_compressed
+from pynxtools_apm.utils.file_pool import open_reader
+from pynxtools_apm.utils.format_registry import detect_file_format, get_reader_spec
+from pynxtools_apm.utils.ion_table import IonTable
+from pynxtools_apm.utils.template_paths import ion_paths, peak_identification_prefix
 
 WARNING_TOO_MANY_DEFINITIONS = f"More than {MAX_NUMBER_OF_ION_SPECIES} ranging definitions. Check if there are duplicates."
 from pynxtools_apm.utils.custom_logging import logger
@@ -61,29 +47,21 @@ from pynxtools_apm.utils.custom_logging import logger
 def add_unknown_iontype(template: dict, entry_id: int) -> dict:
     """Add default unknown iontype."""
     # all unidentifiable ions are mapped on the unknown type
-    trg = f"/ENTRY[entry{entry_id}]/atom_probeID[atom_probe]/ranging/peak_identification/ionID[ion0]/"
+    keys = ion_paths(entry_id, 0)
     ivec = create_nuclide_hash([])
-    template[f"{trg}nuclide_hash"] = {
-        "compress": np.asarray(ivec, np.uint16),
-        "filter": DEFAULT_COMPRESSION_FILTER,
-        "strength": DEFAULT_COMPRESSION_LEVEL,
-        "chunks": prioritized_axes_heuristic(np.asarray(ivec, np.uint16), (0,)),
-    }
-    template[f"{trg}charge_state"] = np.int8(0)
-    template[f"{trg}mass_to_charge_range"] = np.reshape(
+    template[keys["nuclide_hash"]] = stage_compressed(
+        np.asarray(ivec, np.uint16), "metadata", (0,)
+    )
+    template[keys["charge_state"]] = np.int8(0)
+    template[keys["mass_to_charge_range"]] = np.reshape(
         np.asarray([0.0, MQ_EPSILON], np.float32), (1, 2)
     )
-    template[f"{trg}mass_to_charge_range/@units"] = "Da"
+    template[keys["mass_to_charge_range/@units"]] = "Da"
     nuclide_list = nuclide_hash_to_nuclide_list(ivec)
-    template[f"{trg}nuclide_list"] = {
-        "compress": np.asarray(nuclide_list, np.uint16),
-        "filter": DEFAULT_COMPRESSION_FILTER,
-        "strength": DEFAULT_COMPRESSION_LEVEL,
-        "chunks": prioritized_axes_heuristic(
-            np.asarray(nuclide_list, np.uint16), (0, 1)
-        ),
-    }
-    template[f"{trg}name"] = nuclide_hash_to_human_readable_name(ivec, 0)
+    template[keys["nuclide_list"]] = stage_compressed(
+        np.asarray(nuclide_list, np.uint16), "metadata", (0, 1)
+    )
+    template[keys["name"]] = nuclide_hash_to_human_readable_name(ivec, 0)
     return template
 
 
@@ -91,149 +69,11 @@ def add_standardize_molecular_ions(
     ion_lst: list, template: dict, entry_id: int
 ) -> dict:
     """Added standard formatted molecular ion entries."""
-    ion_id = 1
-    trg = (
-        f"/ENTRY[entry{entry_id}]/atom_probeID[atom_probe]/ranging/peak_identification/"
+    ion_table = IonTable.from_nx_ions(ion_lst)
+    ion_table.to_template(template, entry_id)
+    template[f"{peak_identification_prefix(entry_id)}number_of_ion_types"] = np.uint32(
+        len(ion_table) + 1
     )
-    for ion in ion_lst:
-        path = f"{trg}ionID[ion{ion_id}]/"
-        template[f"{path}nuclide_hash"] = {
-            "compress": np.asarray(ion.nuclide_hash, np.uint16),
-            "filter": DEFAULT_COMPRESSION_FILTER,
-            "strength": DEFAULT_COMPRESSION_LEVEL,
-            "chunks": prioritized_axes_heuristic(
-                np.asarray(ion.nuclide_hash, np.uint16),
-                (0,),
-            ),
-        }
-        template[f"{path}charge_state"] = np.int8(ion.charge_state)
-        template[f"{path}mass_to_charge_range"] = np.asarray(
-            ion.ranges.magnitude, np.float32
-        )
-        template[f"{path}mass_to_charge_range/@units"] = f"{ion.ranges.units}"
-        template[f"{path}nuclide_list"] = {
-            "compress": np.asarray(ion.nuclide_list, np.uint16),
-            "filter": DEFAULT_COMPRESSION_FILTER,
-            "strength": DEFAULT_COMPRESSION_LEVEL,
-            "chunks": prioritized_axes_heuristic(
-                np.asarray(ion.nuclide_list, np.uint16),
-                (0, 1),
-            ),
-        }
-        template[f"{path}name"] = ion.name
-
-        if ion.charge_state_model["n_cand"] > 0:
-            path = f"{trg}ionID[ion{ion_id}]/charge_state_analysis/"
-            template[f"{path}config/nuclides"] = np.asarray(ion.nuclide_hash, np.uint16)
-            template[f"{path}config/mass_to_charge_range"] = np.asarray(
-                ion.ranges.magnitude, np.float32
-            )
-            template[f"{path}config/mass_to_charge_range/@units"] = (
-                f"{ion.ranges.units}"
-            )
-            template[f"{path}config/min_abundance"] = np.float64(
-                ion.charge_state_model["min_abundance"]
-            )
-            # template[f"{path}config/min_abundance_product"] = np.float64(
-            #     ion.charge_state_model["min_abundance_product"]
-            # )
-            template[f"{path}config/min_half_life"] = np.float64(
-                ion.charge_state_model["min_half_life"]
-            )
-            template[f"{path}config/min_half_life/@units"] = "s"
-            template[f"{path}config/sacrifice_isotopic_uniqueness"] = bool(
-                ion.charge_state_model["sacrifice_isotopic_uniqueness"]
-            )
-            if ion.charge_state_model["n_cand"] == 1:
-                template[f"{path}nuclide_hash"] = {
-                    "compress": np.asarray(
-                        ion.charge_state_model["nuclide_hash"], np.uint16
-                    ),
-                    "filter": DEFAULT_COMPRESSION_FILTER,
-                    "strength": DEFAULT_COMPRESSION_LEVEL,
-                    "chunks": prioritized_axes_heuristic(
-                        np.asarray(ion.charge_state_model["nuclide_hash"], np.uint16),
-                        (0, 1),  # for a charge state model a 2d matrix not a 1d vector!
-                    ),
-                }
-                template[f"{path}charge_state"] = np.int8(
-                    ion.charge_state_model["charge_state"]
-                )
-                template[f"{path}mass"] = np.float64(ion.charge_state_model["mass"])
-                template[f"{path}mass/@units"] = "Da"
-                template[f"{path}natural_abundance_product"] = np.float64(
-                    ion.charge_state_model["natural_abundance_product"]
-                )
-                template[f"{path}shortest_half_life"] = np.float64(
-                    ion.charge_state_model["shortest_half_life"]
-                )
-                template[f"{path}shortest_half_life/@units"] = "s"
-            elif ion.charge_state_model["n_cand"] > 1:
-                template[f"{path}nuclide_hash"] = {
-                    "compress": np.asarray(
-                        ion.charge_state_model["nuclide_hash"], np.uint16
-                    ),
-                    "filter": DEFAULT_COMPRESSION_FILTER,
-                    "strength": DEFAULT_COMPRESSION_LEVEL,
-                    "chunks": prioritized_axes_heuristic(
-                        np.asarray(ion.charge_state_model["nuclide_hash"], np.uint16),
-                        (0, 1),
-                    ),
-                }
-                template[f"{path}charge_state"] = {
-                    "compress": np.asarray(
-                        ion.charge_state_model["charge_state"], np.int8
-                    ),
-                    "filter": DEFAULT_COMPRESSION_FILTER,
-                    "strength": DEFAULT_COMPRESSION_LEVEL,
-                    "chunks": prioritized_axes_heuristic(
-                        np.asarray(ion.charge_state_model["charge_state"], np.int8),
-                        (0,),
-                    ),
-                }
-                template[f"{path}mass"] = {
-                    "compress": np.asarray(ion.charge_state_model["mass"], np.float64),
-                    "filter": DEFAULT_COMPRESSION_FILTER,
-                    "strength": DEFAULT_COMPRESSION_LEVEL,
-                    "chunks": prioritized_axes_heuristic(
-                        np.asarray(ion.charge_state_model["mass"], np.float64), (0,)
-                    ),
-                }
-                template[f"{path}mass/@units"] = "Da"
-                template[f"{path}natural_abundance_product"] = {
-                    "compress": np.asarray(
-                        ion.charge_state_model["natural_abundance_product"], np.float64
-                    ),
-                    "filter": DEFAULT_COMPRESSION_FILTER,
-                    "strength": DEFAULT_COMPRESSION_LEVEL,
-                    "chunks": prioritized_axes_heuristic(
-                        np.asarray(
-                            ion.charge_state_model["natural_abundance_product"],
-                            np.float64,
-                        ),
-                        (0,),
-                    ),
-                }
-                template[f"{path}shortest_half_life"] = {
-                    "compress": np.asarray(
-                        ion.charge_state_model["shortest_half_life"], np.float64
-                    ),
-                    "filter": DEFAULT_COMPRESSION_FILTER,
-                    "strength": DEFAULT_COMPRESSION_LEVEL,
-                    "chunks": prioritized_axes_heuristic(
-                        np.asarray(
-                            ion.charge_state_model["shortest_half_life"], np.float64
-                        ),
-                        (0,),
-                    ),
-                }
-                template[f"{path}shortest_half_life/@units"] = "s"
-        ion_id += 1
-
-    trg = (
-        f"/ENTRY[entry{entry_id}]/atom_probeID[atom_probe]/ranging/peak_identification/"
-    )
-    template[f"{trg}number_of_ion_types"] = np.uint32(ion_id)
     return template
 
 
@@ -248,7 +88,9 @@ def add_standardize_molecular_ions(
 def extract_data_from_env_file(file_path: str, template: dict, entry_id: int) -> dict:
     """Add those required information which a ENV file has."""
     logger.debug(f"Extracting data from ENV file: {file_path}")
-    rangefile = ReadEnvFileFormat(file_path, MAKE_RANGING_DEFINITIONS_UNIQUE)
+    rangefile = open_reader(
+        get_reader_spec("env", "ranging"), file_path, MAKE_RANGING_DEFINITIONS_UNIQUE
+    )
     if len(rangefile.env["molecular_ions"]) > np.iinfo(np.uint8).max + 1:
         logger.warning(WARNING_TOO_MANY_DEFINITIONS)
 
@@ -261,7 +103,11 @@ def extract_data_from_fig_txt_file(
 ) -> dict:
     """Add those required information which a FIG.TXT file has."""
     logger.debug(f"Extracting data from FIG.TXT file: {file_path}")
-    rangefile = ReadFigTxtFileFormat(file_path, MAKE_RANGING_DEFINITIONS_UNIQUE)
+    rangefile = open_reader(
+        get_reader_spec("fig_txt", "ranging"),
+        file_path,
+        MAKE_RANGING_DEFINITIONS_UNIQUE,
+    )
     if len(rangefile.fig["molecular_ions"]) > np.iinfo(np.uint8).max + 1:
         logger.warning(WARNING_TOO_MANY_DEFINITIONS)
 
@@ -274,7 +120,11 @@ def extract_data_from_pyccapt_file(
 ) -> dict:
     """Add those required information which a pyccapt/ranging HDF5 file has."""
     logger.debug(f"Extracting data from pyccapt/ranging HDF5 file: {file_path}")
-    rangefile = ReadPyccaptRangingFileFormat(file_path, MAKE_RANGING_DEFINITIONS_UNIQUE)
+    rangefile = open_reader(
+        get_reader_spec("pyccapt_ranging", "ranging"),
+        file_path,
+        MAKE_RANGING_DEFINITIONS_UNIQUE,
+    )
     if len(rangefile.pyc["molecular_ions"]) > np.iinfo(np.uint8).max + 1:
         logger.warning(WARNING_TOO_MANY_DEFINITIONS)
 
@@ -285,7 +135,11 @@ def extract_data_from_pyccapt_file(
 def extract_data_from_imago_file(file_path: str, template: dict, entry_id: int) -> dict:
     """Add those required information from XML-serialized IVAS state dumps."""
     logger.debug(f"Extracting data from XML-serialized IVAS analysis file: {file_path}")
-    rangefile = ReadImagoAnalysisFileFormat(file_path, MAKE_RANGING_DEFINITIONS_UNIQUE)
+    rangefile = open_reader(
+        get_reader_spec("imago_analysis", "ranging"),
+        file_path,
+        MAKE_RANGING_DEFINITIONS_UNIQUE,
+    )
     if len(rangefile.imago["molecular_ions"]) > np.iinfo(np.uint8).max + 1:
         logger.warning(WARNING_TOO_MANY_DEFINITIONS)
 
@@ -298,7 +152,9 @@ def extract_data_from_imago_file(file_path: str, template: dict, entry_id: int)
 def extract_data_from_rng_file(file_path: str, template: dict, entry_id: int) -> dict:
     """Add those required information which an RNG file has."""
     logger.debug(f"Extracting data from RNG file: {file_path}")
-    rangefile = ReadRngFileFormat(file_path, MAKE_RANGING_DEFINITIONS_UNIQUE)
+    rangefile = open_reader(
+        get_reader_spec("rng", "ranging"), file_path, MAKE_RANGING_DEFINITIONS_UNIQUE
+    )
     if len(rangefile.rng["molecular_ions"]) > np.iinfo(np.uint8).max + 1:
         logger.warning(WARNING_TOO_MANY_DEFINITIONS)
 
@@ -309,7 +165,9 @@ def extract_data_from_rng_file(file_path: str, template: dict, entry_id: int) ->
 def extract_data_from_rrng_file(file_path: str, template: dict, entry_id) -> dict:
     """Add those required information which an RRNG file has."""
     logger.debug(f"Extracting data from RRNG file: {file_path}")
-    rangefile = ReadRrngFileFormat(file_path, MAKE_RANGING_DEFINITIONS_UNIQUE)
+    rangefile = open_reader(
+        get_reader_spec("rrng", "ranging"), file_path, MAKE_RANGING_DEFINITIONS_UNIQUE
+    )
     if len(rangefile.rrng["molecular_ions"]) > np.iinfo(np.uint8).max + 1:
         logger.warning(WARNING_TOO_MANY_DEFINITIONS)
 
@@ -322,7 +180,11 @@ def extract_data_from_cameca_hfive_file(
 ) -> dict:
     """Add those required information which a Cameca HDF5 file has."""
     logger.debug(f"Extracting data from Cameca HDF5 file: {file_path}")
-    rangefile = ReadCamecaHfiveFileFormat(file_path, MAKE_RANGING_DEFINITIONS_UNIQUE)
+    rangefile = open_reader(
+        get_reader_spec("cameca_hdf5", "ranging"),
+        file_path,
+        MAKE_RANGING_DEFINITIONS_UNIQUE,
+    )
     if len(rangefile.cameca["molecular_ions"]) > np.iinfo(np.uint8).max + 1:
         logger.warning(WARNING_TOO_MANY_DEFINITIONS)
 
@@ -337,7 +199,11 @@ def extract_data_from_analysisset_file(
 ) -> dict:
     """Add those required information which an analysisset file has."""
     logger.debug(f"Extracting data from analysisset XML file: {file_path}")
-    rangefile = ReadAnalysissetFileFormat(file_path, MAKE_RANGING_DEFINITIONS_UNIQUE)
+    rangefile = open_reader(
+        get_reader_spec("analysisset", "ranging"),
+        file_path,
+        MAKE_RANGING_DEFINITIONS_UNIQUE,
+    )
     if len(rangefile.analysisset["molecular_ions"]) > np.iinfo(np.uint8).max + 1:
         logger.warning(WARNING_TOO_MANY_DEFINITIONS)
 
@@ -357,11 +223,9 @@ class IfesRangingDefinitionsParser:
             "file_path": file_path,
             "entry_id": entry_id,
         }
-        for suffix in VALID_FILE_NAME_SUFFIX_RANGE:
-            if file_path.lower().endswith(suffix):
-                self.meta["file_format"] = suffix
-                break
-        if self.meta["file_format"] is not None:
+        self.file_format = detect_file_format(file_path, "ranging")
+        if self.file_format is not None:
+            self.meta["file_format"] = self.file_format.matching_suffix(file_path)
             self.supported = True
         else:
             logger.warning(f"{file_path} is not a supported ranging definitions file")
@@ -369,7 +233,7 @@ class IfesRangingDefinitionsParser:
     def update_atom_types_ranging_definitions_based(self, template: dict) -> dict:
         """Update the atom_types list in the specimen based on ranging defs."""
         number_of_ion_types = 1
-        prefix = f"/ENTRY[entry{self.meta['entry_id']}]/atom_probeID[atom_probe]/ranging/peak_identification/"
+        prefix = peak_identification_prefix(self.meta["entry_id"])
         if f"{prefix}number_of_ion_types" in template:
             number_of_ion_types = template[f"{prefix}number_of_ion_types"]
         logger.info(
@@ -378,14 +242,10 @@ class IfesRangingDefinitionsParser:
 
         unique_atom_numbers = set()
         max_atom_number = len(chemical_symbols) - 1
-        prefix = (
-            f"/ENTRY[entry{self.meta['entry_id']}]/atom_probeID[atom_probe]/"
-            f"ranging/peak_identification/"
-        )
-        for ion_id in np.arange(1, number_of_ion_types):
-            trg = f"{prefix}ionID[ion{ion_id}]/nuclide_list"
+        for ion_id in range(1, int(number_of_ion_types)):
+            trg = ion_paths(self.meta["entry_id"], ion_id)["nuclide_list"]
             if trg in template:
-                nuclide_list = template[trg]["compress"][:, 1]
+                nuclide_list = get_staged_values(template[trg])[:, 1]
                 # second row of NXion/nuclide_list yields atom number to decode element
                 for atom_number in nuclide_list:
                     if 0 < atom_number <= max_atom_number:
@@ -431,41 +291,9 @@ class IfesRangingDefinitionsParser:
         add_unknown_iontype(template, self.meta["entry_id"])
 
         if self.meta["file_path"] != "" and self.meta["file_format"] is not None:
-            if self.meta["file_format"] == ".env":
-                extract_data_from_env_file(
-                    self.meta["file_path"], template, self.meta["entry_id"]
-                )
-            elif self.meta["file_format"] == ".fig.txt":
-                extract_data_from_fig_txt_file(
-                    self.meta["file_path"], template, self.meta["entry_id"]
-                )
-            elif self.meta["file_format"] == "range_.h5":
-                extract_data_from_pyccapt_file(
-                    self.meta["file_path"], template, self.meta["entry_id"]
-                )
-            elif self.meta["file_format"] == ".analysis":
-                extract_data_from_imago_file(
-                    self.meta["file_path"], template, self.meta["entry_id"]
-                )
-            elif self.meta["file_format"] == ".rng":
-                extract_data_from_rng_file(
-                    self.meta["file_path"], template, self.meta["entry_id"]
-                )
-            elif self.meta["file_format"] == ".rrng":
-                extract_data_from_rrng_file(
-                    self.meta["file_path"], template, self.meta["entry_id"]
-                )
-            elif self.meta["file_format"] == ".hdf5":
-                extract_data_from_cameca_hfive_file(
-                    self.meta["file_path"], template, self.meta["entry_id"]
-                )
-            elif self.meta["file_format"] == ".analysisset":
-                extract_data_from_analysisset_file(
-                    self.meta["file_path"], template, self.meta["entry_id"]
-                )
-            else:
-                trg = f"/ENTRY[entry{self.meta['entry_id']}]/atom_probeID[atom_probe]/ranging/peak_identification/"
-                template[f"{trg}number_of_ion_types"] = 1
+            self.file_format.extract(
+                self.meta["file_path"], template, self.meta["entry_id"]
+            )
         else:
             trg = f"/ENTRY[entry{self.meta['entry_id']}]/atom_probeID[atom_probe]/ranging/peak_identification/"
             template[f"{trg}number_of_ion_types"] = 1
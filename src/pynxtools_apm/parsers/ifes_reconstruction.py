@@ -20,46 +20,29 @@
 from typing import Any
 
 import numpy as np
-from ifes_apt_tc_data_modeling.apt.apt6_reader import ReadAptFileFormat
-from ifes_apt_tc_data_modeling.ato.ato_reader import ReadAtoFileFormat
-from ifes_apt_tc_data_modeling.cameca.cameca_reader import ReadCamecaHfiveFileFormat
-from ifes_apt_tc_data_modeling.csv.csv_reader import ReadCsvFileFormat
-from ifes_apt_tc_data_modeling.epos.epos_reader import ReadEposFileFormat
-from ifes_apt_tc_data_modeling.ops.ops_reader import ReadOpsFileFormat
-from ifes_apt_tc_data_modeling.pos.pos_reader import ReadPosFileFormat
-from ifes_apt_tc_data_modeling.pyccapt.pyccapt_reader import (
-    ReadPyccaptCalibrationFileFormat,
-)
-from ifes_apt_tc_data_modeling.stuttgart.apyt_reader import (
-    ReadStuttgartApytReconstructionFileFormat,
-    ReadStuttgartApytSpectrumAlignFileFormat,
-)
-from ifes_apt_tc_data_modeling.stuttgart.raw_reader import (
-    ReadStuttgartApytRawFileFormat,
-)
-from pynxtools.dataconverter.chunk import prioritized_axes_heuristic
-
-from pynxtools_apm import DEFAULT_COMPRESSION_LEVEL, FAST_COMPRESSION_FILTER, SEPARATOR
+
+from pynxtools_apm import MAKE_RANGING_DEFINITIONS_UNIQUE, SEPARATOR
+from pynxtools_apm.utils.compression_policy import stage_compressed
+from pynxtools_apm.utils.create_nx_default_plots import get_min_max_decimation_indices
 from pynxtools_apm.utils.custom_logging import logger
-from pynxtools_apm.utils.io_case_logic import VALID_FILE_NAME_SUFFIX_RECON
+from pynxtools_apm.utils.file_pool import open_reader
+from pynxtools_apm.utils.format_registry import detect_file_format, get_reader_spec
+from pynxtools_apm.utils.memory_budget import MemoryPlan, is_skipped
+from pynxtools_apm.utils.pint_custom_unit_registry import ureg
+from pynxtools_apm.utils.text_ingest import read_text_columns
 
 
 def extract_data_from_pos_file(file_path: str, prefix: str, template: dict) -> dict:
     """Add those required information which a POS file has."""
     logger.debug(f"Extracting data from POS file: {file_path}")
-    pos_file = ReadPosFileFormat(file_path)
+    pos_file = open_reader(get_reader_spec("pos", "reconstruction"), file_path)
 
     trg = f"{prefix}/atom_probeID[atom_probe]/reconstruction/reconstructed_positions"
     xyz = pos_file.get_reconstructed_positions()
     if xyz is not None:
-        template[f"{trg}"] = {
-            "compress": np.asarray(xyz.magnitude, np.float32),
-            "filter": FAST_COMPRESSION_FILTER,
-            "strength": DEFAULT_COMPRESSION_LEVEL,
-            "chunks": prioritized_axes_heuristic(
-                np.asarray(xyz.magnitude, np.float32), (0, 1)
-            ),
-        }
+        template[f"{trg}"] = stage_compressed(
+            np.asarray(xyz.magnitude, np.float32), "positions", (0, 1)
+        )
         template[f"{trg}/@units"] = f"{xyz.units}"
     else:
         logger.warning(f"pos_file.get_reconstructed_positions() returned None")
@@ -68,14 +51,9 @@ def extract_data_from_pos_file(file_path: str, prefix: str, template: dict) -> d
     trg = f"{prefix}/atom_probeID[atom_probe]/mass_to_charge_conversion/mass_to_charge"
     m_z = pos_file.get_mass_to_charge_state_ratio()
     if m_z is not None:
-        template[f"{trg}"] = {
-            "compress": np.asarray(m_z.magnitude, np.float32),
-            "filter": FAST_COMPRESSION_FILTER,
-            "strength": DEFAULT_COMPRESSION_LEVEL,
-            "chunks": prioritized_axes_heuristic(
-                np.asarray(m_z.magnitude, np.float32), (0,)
-            ),
-        }
+        template[f"{trg}"] = stage_compressed(
+            np.asarray(m_z.magnitude, np.float32), "mass_to_charge", (0,)
+        )
         template[f"{trg}/@units"] = f"{m_z.units}"
     else:
         logger.warning(f"pos_file.get_mass_to_charge_state_ratio() returned None")
@@ -86,19 +64,14 @@ def extract_data_from_pos_file(file_path: str, prefix: str, template: dict) -> d
 def extract_data_from_epos_file(file_path: str, prefix: str, template: dict) -> dict:
     """Add those required information which an ePOS file has."""
     logger.debug(f"Extracting data from EPOS file: {file_path}")
-    epos_file = ReadEposFileFormat(file_path)
+    epos_file = open_reader(get_reader_spec("epos", "reconstruction"), file_path)
 
     trg = f"{prefix}/atom_probeID[atom_probe]/reconstruction/reconstructed_positions"
     xyz = epos_file.get_reconstructed_positions()
     if xyz is not None:
-        template[f"{trg}"] = {
-            "compress": np.asarray(xyz.magnitude, np.float32),
-            "filter": FAST_COMPRESSION_FILTER,
-            "strength": DEFAULT_COMPRESSION_LEVEL,
-            "chunks": prioritized_axes_heuristic(
-                np.asarray(xyz.magnitude, np.float32), (0, 1)
-            ),
-        }
+        template[f"{trg}"] = stage_compressed(
+            np.asarray(xyz.magnitude, np.float32), "positions", (0, 1)
+        )
         template[f"{trg}/@units"] = f"{xyz.units}"
     else:
         logger.warning(f"epos_file.get_reconstructed_positions() returned None")
@@ -107,112 +80,82 @@ def extract_data_from_epos_file(file_path: str, prefix: str, template: dict) ->
     trg = f"{prefix}/atom_probeID[atom_probe]/mass_to_charge_conversion/mass_to_charge"
     m_z = epos_file.get_mass_to_charge_state_ratio()
     if m_z is not None:
-        template[f"{trg}"] = {
-            "compress": np.asarray(m_z.magnitude, np.float32),
-            "filter": FAST_COMPRESSION_FILTER,
-            "strength": DEFAULT_COMPRESSION_LEVEL,
-            "chunks": prioritized_axes_heuristic(
-                np.asarray(m_z.magnitude, np.float32), (0,)
-            ),
-        }
+        template[f"{trg}"] = stage_compressed(
+            np.asarray(m_z.magnitude, np.float32), "mass_to_charge", (0,)
+        )
         template[f"{trg}/@units"] = f"{m_z.units}"
     else:
         logger.warning(f"epos_file.get_mass_to_charge_state_ratio() returned None")
     del m_z
 
-    trg = f"{prefix}/measurement/eventID[event1]/instrument/pulser/standing_voltage"
-    standing_voltage = epos_file.get_standing_voltage()
-    if standing_voltage is not None:
-        template[f"{trg}"] = {
-            "compress": np.asarray(standing_voltage.magnitude, np.float32),
-            "filter": FAST_COMPRESSION_FILTER,
-            "strength": DEFAULT_COMPRESSION_LEVEL,
-            "chunks": prioritized_axes_heuristic(
-                np.asarray(standing_voltage.magnitude, np.float32), (0,)
-            ),
-        }
-        template[f"{trg}/@units"] = f"{standing_voltage.units}"
-    else:
-        logger.warning(f"epos_file.get_standing_voltage() returned None")
-    del standing_voltage
-
-    trg = f"{prefix}/measurement/eventID[event1]/instrument/pulser/pulse_voltage"
-    pulse_voltage = epos_file.get_pulse_voltage()
-    if pulse_voltage is not None:
-        template[f"{trg}"] = {
-            "compress": np.asarray(pulse_voltage.magnitude, np.float32),
-            "filter": FAST_COMPRESSION_FILTER,
-            "strength": DEFAULT_COMPRESSION_LEVEL,
-            "chunks": prioritized_axes_heuristic(
-                np.asarray(pulse_voltage.magnitude, np.float32), (0,)
-            ),
-        }
-        template[f"{trg}/@units"] = f"{pulse_voltage.units}"
-    else:
-        logger.warning(f"epos_file.get_pulse_voltage() returned None")
-    del pulse_voltage
+    if not is_skipped("pulse_data"):
+        trg = f"{prefix}/measurement/eventID[event1]/instrument/pulser/standing_voltage"
+        standing_voltage = epos_file.get_standing_voltage()
+        if standing_voltage is not None:
+            template[f"{trg}"] = stage_compressed(
+                np.asarray(standing_voltage.magnitude, np.float32), "voltages", (0,)
+            )
+            template[f"{trg}/@units"] = f"{standing_voltage.units}"
+        else:
+            logger.warning(f"epos_file.get_standing_voltage() returned None")
+        del standing_voltage
+
+    if not is_skipped("pulse_data"):
+        trg = f"{prefix}/measurement/eventID[event1]/instrument/pulser/pulse_voltage"
+        pulse_voltage = epos_file.get_pulse_voltage()
+        if pulse_voltage is not None:
+            template[f"{trg}"] = stage_compressed(
+                np.asarray(pulse_voltage.magnitude, np.float32), "voltages", (0,)
+            )
+            template[f"{trg}/@units"] = f"{pulse_voltage.units}"
+        else:
+            logger.warning(f"epos_file.get_pulse_voltage() returned None")
+        del pulse_voltage
 
     trg = f"{prefix}/atom_probeID[atom_probe]/voltage_and_bowl/raw_tof"
     raw_time_of_flight = epos_file.get_raw_time_of_flight()
     if raw_time_of_flight is not None:
-        template[f"{trg}"] = {
-            "compress": np.asarray(raw_time_of_flight.magnitude, np.float32),
-            "filter": FAST_COMPRESSION_FILTER,
-            "strength": DEFAULT_COMPRESSION_LEVEL,
-            "chunks": prioritized_axes_heuristic(
-                np.asarray(raw_time_of_flight.magnitude, np.float32), (0,)
-            ),
-        }
+        template[f"{trg}"] = stage_compressed(
+            np.asarray(raw_time_of_flight.magnitude, np.float32), "mass_to_charge", (0,)
+        )
         template[f"{trg}/@units"] = f"{raw_time_of_flight.units}"
     else:
         logger.warning(f"epos_file.get_raw_time_of_flight() returned None")
     del raw_time_of_flight
 
-    trg = f"{prefix}/atom_probeID[atom_probe]/hit_finding/hit_positions"
-    hit_positions = epos_file.get_hit_positions()
-    if hit_positions is not None:
-        template[f"{trg}"] = {
-            "compress": np.asarray(hit_positions.magnitude, np.float32),
-            "filter": FAST_COMPRESSION_FILTER,
-            "strength": DEFAULT_COMPRESSION_LEVEL,
-            "chunks": prioritized_axes_heuristic(
-                np.asarray(hit_positions.magnitude, np.float32), (0, 1)
-            ),
-        }
-        template[f"{trg}/@units"] = f"{hit_positions.units}"
-    else:
-        logger.warning(f"epos_file.get_hit_positions() returned None")
-    del hit_positions
-
-    trg = f"{prefix}/atom_probeID[atom_probe]/hit_finding/epos_ions_per_pulse"
-    ions_per_pulse = epos_file.get_ions_per_pulse()
-    if ions_per_pulse is not None:
-        template[f"{trg}"] = {
-            "compress": np.asarray(ions_per_pulse.magnitude, np.uint32),
-            "filter": FAST_COMPRESSION_FILTER,
-            "strength": DEFAULT_COMPRESSION_LEVEL,
-            "chunks": prioritized_axes_heuristic(
-                np.asarray(ions_per_pulse.magnitude, np.uint32), (0,)
-            ),
-        }
-    else:
-        logger.warning(f"epos_file.get_ions_per_pulse() returned None")
-    del ions_per_pulse
-
-    trg = f"{prefix}/atom_probeID[atom_probe]/hit_finding/epos_number_of_pulses"
-    number_of_pulses = epos_file.get_number_of_pulses()
-    if number_of_pulses is not None:
-        template[f"{trg}"] = {
-            "compress": np.asarray(number_of_pulses.magnitude, np.uint32),
-            "filter": FAST_COMPRESSION_FILTER,
-            "strength": DEFAULT_COMPRESSION_LEVEL,
-            "chunks": prioritized_axes_heuristic(
-                np.asarray(number_of_pulses.magnitude, np.uint32), (0,)
-            ),
-        }
-    else:
-        logger.warning(f"epos_file.get_number_of_pulses() returned None")
-    del number_of_pulses
+    if not is_skipped("hit_positions"):
+        trg = f"{prefix}/atom_probeID[atom_probe]/hit_finding/hit_positions"
+        hit_positions = epos_file.get_hit_positions()
+        if hit_positions is not None:
+            template[f"{trg}"] = stage_compressed(
+                np.asarray(hit_positions.magnitude, np.float32), "positions", (0, 1)
+            )
+            template[f"{trg}/@units"] = f"{hit_positions.units}"
+        else:
+            logger.warning(f"epos_file.get_hit_positions() returned None")
+        del hit_positions
+
+    if not is_skipped("pulse_data"):
+        trg = f"{prefix}/atom_probeID[atom_probe]/hit_finding/epos_ions_per_pulse"
+        ions_per_pulse = epos_file.get_ions_per_pulse()
+        if ions_per_pulse is not None:
+            template[f"{trg}"] = stage_compressed(
+                np.asarray(ions_per_pulse.magnitude, np.uint32), "ion_labels", (0,)
+            )
+        else:
+            logger.warning(f"epos_file.get_ions_per_pulse() returned None")
+        del ions_per_pulse
+
+    if not is_skipped("pulse_data"):
+        trg = f"{prefix}/atom_probeID[atom_probe]/hit_finding/epos_number_of_pulses"
+        number_of_pulses = epos_file.get_number_of_pulses()
+        if number_of_pulses is not None:
+            template[f"{trg}"] = stage_compressed(
+                np.asarray(number_of_pulses.magnitude, np.uint32), "ion_labels", (0,)
+            )
+        else:
+            logger.warning(f"epos_file.get_number_of_pulses() returned None")
+        del number_of_pulses
 
     # add multiplicity data from epos
     # e.g. https://gitlab.com/jesseds/apav/-/blob/master/apav/core/multipleevent.py
@@ -222,7 +165,7 @@ def extract_data_from_epos_file(file_path: str, prefix: str, template: dict) ->
 def extract_data_from_apt_file(file_path: str, prefix: str, template: dict) -> dict:
     """Add those required information which a APT file has."""
     logger.debug(f"Extracting data from APT file: {file_path}")
-    apt_file = ReadAptFileFormat(file_path)
+    apt_file = open_reader(get_reader_spec("apt", "reconstruction"), file_path)
 
     logger.info(f"apt_file {apt_file.file_path} has the following sections")
     for section in apt_file.available_sections:
@@ -240,14 +183,9 @@ def extract_data_from_apt_file(file_path: str, prefix: str, template: dict) -> d
     trg = f"{prefix}/atom_probeID[atom_probe]/reconstruction/reconstructed_positions"
     xyz = apt_file.get_named_quantity("Position")
     if xyz is not None:
-        template[f"{trg}"] = {
-            "compress": np.asarray(xyz.magnitude, np.float32),
-            "filter": FAST_COMPRESSION_FILTER,
-            "strength": DEFAULT_COMPRESSION_LEVEL,
-            "chunks": prioritized_axes_heuristic(
-                np.asarray(xyz.magnitude, np.float32), (0, 1)
-            ),
-        }
+        template[f"{trg}"] = stage_compressed(
+            np.asarray(xyz.magnitude, np.float32), "positions", (0, 1)
+        )
         template[f"{trg}/@units"] = f"{xyz.units}"
     else:
         logger.warning(f"apt_file.get_named_quantity(Position) returned None")
@@ -256,14 +194,9 @@ def extract_data_from_apt_file(file_path: str, prefix: str, template: dict) -> d
     trg = f"{prefix}/atom_probeID[atom_probe]/mass_to_charge_conversion/mass_to_charge"
     m_z = apt_file.get_named_quantity("Mass")
     if m_z is not None:
-        template[f"{trg}"] = {
-            "compress": np.asarray(m_z.magnitude, np.float32),
-            "filter": FAST_COMPRESSION_FILTER,
-            "strength": DEFAULT_COMPRESSION_LEVEL,
-            "chunks": prioritized_axes_heuristic(
-                np.asarray(m_z.magnitude, np.float32), (0,)
-            ),
-        }
+        template[f"{trg}"] = stage_compressed(
+            np.asarray(m_z.magnitude, np.float32), "mass_to_charge", (0,)
+        )
         template[f"{trg}/@units"] = f"{m_z.units}"
     else:
         logger.warning(f"apt_file.get_named_quantity(Mass) returned None")
@@ -273,115 +206,90 @@ def extract_data_from_apt_file(file_path: str, prefix: str, template: dict) -> d
     # but it needs to be checked if this returns reasonable values
     # and specifically what these values logically mean, interaction with
     # Cameca as well as the community is vital here
-    trg = f"{prefix}/measurement/eventID[event1]/instrument/pulser/standing_voltage"
-    standing_voltage = apt_file.get_named_quantity("Voltage")
-    if standing_voltage is not None:
-        template[f"{trg}"] = {
-            "compress": np.asarray(standing_voltage.magnitude, np.float32),
-            "filter": FAST_COMPRESSION_FILTER,
-            "strength": DEFAULT_COMPRESSION_LEVEL,
-            "chunks": prioritized_axes_heuristic(
-                np.asarray(standing_voltage.magnitude, np.float32), (0,)
-            ),
-        }
-        template[f"{trg}/@units"] = f"{standing_voltage.units}"
-    else:
-        logger.warning(f"apt_file.get_named_quantity(Voltage) returned None")
-    del standing_voltage
-
-    trg = f"{prefix}/measurement/eventID[event1]/instrument/pulser/pulse_voltage"
-    for name_in_a_version in ["Vap", "Pulse Voltage"]:
-        voltage = apt_file.get_named_quantity(name_in_a_version)
-        if voltage is not None:
-            template[f"{trg}"] = {
-                "compress": np.asarray(voltage.magnitude, np.float32),
-                "filter": FAST_COMPRESSION_FILTER,
-                "strength": DEFAULT_COMPRESSION_LEVEL,
-                "chunks": prioritized_axes_heuristic(
-                    np.asarray(voltage.magnitude, np.float32), (0,)
-                ),
-            }
-            template[f"{trg}/@units"] = f"{voltage.units}"
-            break
+    if not is_skipped("pulse_data"):
+        trg = f"{prefix}/measurement/eventID[event1]/instrument/pulser/standing_voltage"
+        standing_voltage = apt_file.get_named_quantity("Voltage")
+        if standing_voltage is not None:
+            template[f"{trg}"] = stage_compressed(
+                np.asarray(standing_voltage.magnitude, np.float32), "voltages", (0,)
+            )
+            template[f"{trg}/@units"] = f"{standing_voltage.units}"
         else:
-            logger.warning(
-                f"apt_file.get_named_quantity({name_in_a_version}) returned None"
+            logger.warning(f"apt_file.get_named_quantity(Voltage) returned None")
+        del standing_voltage
+
+    if not is_skipped("pulse_data"):
+        trg = f"{prefix}/measurement/eventID[event1]/instrument/pulser/pulse_voltage"
+        for name_in_a_version in ["Vap", "Pulse Voltage"]:
+            voltage = apt_file.get_named_quantity(name_in_a_version)
+            if voltage is not None:
+                template[f"{trg}"] = stage_compressed(
+                    np.asarray(voltage.magnitude, np.float32), "voltages", (0,)
+                )
+                template[f"{trg}/@units"] = f"{voltage.units}"
+                break
+            else:
+                logger.warning(
+                    f"apt_file.get_named_quantity({name_in_a_version}) returned None"
+                )
+        try:
+            del voltage
+        except NameError:
+            pass
+
+    if not is_skipped("pulse_data"):
+        trg = f"{prefix}/measurement/eventID[event1]/instrument/pulser/pulse_frequency"
+        pulse_frequency = apt_file.get_named_quantity("freq")
+        if pulse_frequency is not None:
+            template[f"{trg}"] = stage_compressed(
+                np.asarray(pulse_frequency.magnitude, np.float32), "voltages", (0,)
             )
-    try:
-        del voltage
-    except NameError:
-        pass
-
-    trg = f"{prefix}/measurement/eventID[event1]/instrument/pulser/pulse_frequency"
-    pulse_frequency = apt_file.get_named_quantity("freq")
-    if pulse_frequency is not None:
-        template[f"{trg}"] = {
-            "compress": np.asarray(pulse_frequency.magnitude, np.float32),
-            "filter": FAST_COMPRESSION_FILTER,
-            "strength": DEFAULT_COMPRESSION_LEVEL,
-            "chunks": prioritized_axes_heuristic(
-                np.asarray(pulse_frequency.magnitude, np.float32), (0,)
-            ),
-        }
-        template[f"{trg}/@units"] = f"{pulse_frequency.units}"
-    else:
-        logger.warning(f"apt_file.get_named_quantity(freq) returned None")
-    del pulse_frequency
+            template[f"{trg}/@units"] = f"{pulse_frequency.units}"
+        else:
+            logger.warning(f"apt_file.get_named_quantity(freq) returned None")
+        del pulse_frequency
 
     trg = f"{prefix}/measurement/eventID[event1]/instrument/reflectron/voltage"
     reflectron_voltage = apt_file.get_named_quantity("Vref")
     if reflectron_voltage is not None:
-        template[f"{trg}"] = {
-            "compress": np.asarray(reflectron_voltage.magnitude, np.float32),
-            "filter": FAST_COMPRESSION_FILTER,
-            "strength": DEFAULT_COMPRESSION_LEVEL,
-            "chunks": prioritized_axes_heuristic(
-                np.asarray(reflectron_voltage.magnitude, np.float32), (0,)
-            ),
-        }
+        template[f"{trg}"] = stage_compressed(
+            np.asarray(reflectron_voltage.magnitude, np.float32), "voltages", (0,)
+        )
         template[f"{trg}/@units"] = f"{reflectron_voltage.units}"
     else:
         logger.warning(f"apt_file.get_named_quantity(Vref) returned None")
     del reflectron_voltage
 
-    trg = f"{prefix}/atom_probeID[atom_probe]/hit_finding/hit_positions"
-    detx = apt_file.get_named_quantity("XDet_mm")
-    dety = apt_file.get_named_quantity("YDet_mm")
-    if detx is not None and dety is not None:
-        if (
-            np.shape(detx.magnitude) == np.shape(dety.magnitude)
-            and f"{detx.units}" == f"{dety.units}"
-        ):
-            values = np.zeros((np.shape(detx.magnitude)[0], 2), np.float32)
-            values[:, 0] = detx.magnitude
-            values[:, 1] = dety.magnitude
-            template[f"{trg}"] = {
-                "compress": np.asarray(values, np.float32),
-                "filter": FAST_COMPRESSION_FILTER,
-                "strength": DEFAULT_COMPRESSION_LEVEL,
-                "chunks": prioritized_axes_heuristic(
-                    np.asarray(values, np.float32), (0, 1)
-                ),
-            }
-            template[f"{trg}/@units"] = f"{detx.units}"
+    if not is_skipped("hit_positions"):
+        trg = f"{prefix}/atom_probeID[atom_probe]/hit_finding/hit_positions"
+        detx = apt_file.get_named_quantity("XDet_mm")
+        dety = apt_file.get_named_quantity("YDet_mm")
+        if detx is not None and dety is not None:
+            if (
+                np.shape(detx.magnitude) == np.shape(dety.magnitude)
+                and f"{detx.units}" == f"{dety.units}"
+            ):
+                values = np.zeros((np.shape(detx.magnitude)[0], 2), np.float32)
+                values[:, 0] = detx.magnitude
+                values[:, 1] = dety.magnitude
+                template[f"{trg}"] = stage_compressed(
+                    np.asarray(values, np.float32), "positions", (0, 1)
+                )
+                template[f"{trg}/@units"] = f"{detx.units}"
+            else:
+                logger.warning(
+                    f"apt_file.get_named_quantity(XDet, YDet) shape mismatch"
+                )
         else:
-            logger.warning(f"apt_file.get_named_quantity(XDet, YDet) shape mismatch")
-    else:
-        logger.warning(f"apt_file.get_named_quantity(XDet, YDet) returned None")
-    del detx, dety
+            logger.warning(f"apt_file.get_named_quantity(XDet, YDet) returned None")
+        del detx, dety
 
     trg = f"{prefix}/measurement/eventID[event1]/instrument/DETECTOR[ion_detector]/detection_rate"
     erate = apt_file.get_named_quantity("erate")
     if erate is not None:
-        template[f"{trg}"] = {
-            "compress": np.asarray(erate.magnitude, np.float32),
-            "filter": FAST_COMPRESSION_FILTER,
-            "strength": DEFAULT_COMPRESSION_LEVEL,
-            "chunks": prioritized_axes_heuristic(
-                np.asarray(erate.magnitude, np.float32),
-                (0,),
-            ),
-        }
+        template[f"{trg}"] = stage_compressed(
+            np.asarray(erate.magnitude, np.float32), "voltages", (0,)
+        )
         template[f"{trg}/@units"] = f"{erate.units}"
         """
         # here is an example how to add this as a default plot but with real examples
@@ -403,12 +311,7 @@ def extract_data_from_apt_file(file_path: str, prefix: str, template: dict) -> d
         ids: npt.NDArray[np.uint32] = np.linspace(
             0, number_of_ids - 1, num=number_of_ids, dtype=np.uint32
         )
-        template[f"{trg}AXISNAME[axis_id]"] = {
-            "compress": ids,
-            "filter": FAST_COMPRESSION_FILTER,
-            "strength": DEFAULT_COMPRESSION_LEVEL,
-            "chunks": prioritized_axes_heuristic(ids, (0,)),
-        }
+        template[f"{trg}AXISNAME[axis_id]"] = stage_compressed(ids, "ion_labels", (0,))
         template[f"{trg}AXISNAME[axis_id]/@long_name"] = "Id"  # TODO
         del ids
         """
@@ -419,14 +322,9 @@ def extract_data_from_apt_file(file_path: str, prefix: str, template: dict) -> d
     trg = f"{prefix}/measurement/eventID[event1]/instrument/pulser/sourceID[source1]/power"
     laser_power = apt_file.get_named_quantity("laserpower")
     if laser_power is not None:
-        template[f"{trg}"] = {
-            "compress": np.asarray(laser_power.magnitude, np.float32),
-            "filter": FAST_COMPRESSION_FILTER,
-            "strength": DEFAULT_COMPRESSION_LEVEL,
-            "chunks": prioritized_axes_heuristic(
-                np.asarray(laser_power.magnitude, np.float32), (0,)
-            ),
-        }
+        template[f"{trg}"] = stage_compressed(
+            np.asarray(laser_power.magnitude, np.float32), "voltages", (0,)
+        )
         template[f"{trg}/@units"] = f"{laser_power.units}"
     else:
         logger.warning(f"apt_file.get_named_quantity(laserpower) returned None")
@@ -436,14 +334,9 @@ def extract_data_from_apt_file(file_path: str, prefix: str, template: dict) -> d
     temperature = apt_file.get_named_quantity("Temp")
     if temperature is not None:
         template[f"{trg}/measurement"] = f"temperature"
-        template[f"{trg}/value"] = {
-            "compress": np.asarray(temperature.magnitude, np.float32),
-            "filter": FAST_COMPRESSION_FILTER,
-            "strength": DEFAULT_COMPRESSION_LEVEL,
-            "chunks": prioritized_axes_heuristic(
-                np.asarray(temperature.magnitude, np.float32), (0,)
-            ),
-        }
+        template[f"{trg}/value"] = stage_compressed(
+            np.asarray(temperature.magnitude, np.float32), "voltages", (0,)
+        )
         template[f"{trg}/value/@units"] = f"{temperature.units}"
     else:
         logger.warning(f"apt_file.get_named_quantity(Temp) returned None")
@@ -453,14 +346,9 @@ def extract_data_from_apt_file(file_path: str, prefix: str, template: dict) -> d
     pressure = apt_file.get_named_quantity("Pres")
     if pressure is not None:
         template[f"{trg}/measurement"] = "pressure"
-        template[f"{trg}/value"] = {
-            "compress": np.asarray(pressure.magnitude, np.float32),
-            "filter": FAST_COMPRESSION_FILTER,
-            "strength": DEFAULT_COMPRESSION_LEVEL,
-            "chunks": prioritized_axes_heuristic(
-                np.asarray(pressure.magnitude, np.float32), (0,)
-            ),
-        }
+        template[f"{trg}/value"] = stage_compressed(
+            np.asarray(pressure.magnitude, np.float32), "voltages", (0,)
+        )
         template[f"{trg}/value/@units"] = f"{pressure.units}"
     else:
         logger.warning(f"apt_file.get_named_quantity(Pres) returned None")
@@ -474,19 +362,14 @@ def extract_data_from_apt_file(file_path: str, prefix: str, template: dict) -> d
 def extract_data_from_ato_file(file_path: str, prefix: str, template: dict) -> dict:
     """Add those required information which a ATO file has."""
     logger.debug(f"Extracting data from ATO file: {file_path}")
-    ato_file = ReadAtoFileFormat(file_path)
+    ato_file = open_reader(get_reader_spec("ato", "reconstruction"), file_path)
 
     trg = f"{prefix}/atom_probeID[atom_probe]/reconstruction/reconstructed_positions"
     xyz = ato_file.get_reconstructed_positions()
     if xyz is not None:
-        template[f"{trg}"] = {
-            "compress": np.asarray(xyz.magnitude, np.float32),
-            "filter": FAST_COMPRESSION_FILTER,
-            "strength": DEFAULT_COMPRESSION_LEVEL,
-            "chunks": prioritized_axes_heuristic(
-                np.asarray(xyz.magnitude, np.float32), (0, 1)
-            ),
-        }
+        template[f"{trg}"] = stage_compressed(
+            np.asarray(xyz.magnitude, np.float32), "positions", (0, 1)
+        )
         template[f"{trg}/@units"] = f"{xyz.units}"
     else:
         logger.warning(f"ato_file.get_reconstructed_positions() returned None")
@@ -495,14 +378,9 @@ def extract_data_from_ato_file(file_path: str, prefix: str, template: dict) -> d
     trg = f"{prefix}/atom_probeID[atom_probe]/mass_to_charge_conversion/mass_to_charge"
     m_z = ato_file.get_mass_to_charge_state_ratio()
     if m_z is not None:
-        template[f"{trg}"] = {
-            "compress": np.asarray(m_z.magnitude, np.float32),
-            "filter": FAST_COMPRESSION_FILTER,
-            "strength": DEFAULT_COMPRESSION_LEVEL,
-            "chunks": prioritized_axes_heuristic(
-                np.asarray(m_z.magnitude, np.float32), (0,)
-            ),
-        }
+        template[f"{trg}"] = stage_compressed(
+            np.asarray(m_z.magnitude, np.float32), "mass_to_charge", (0,)
+        )
         template[f"{trg}/@units"] = f"{m_z.units}"
     else:
         logger.warning(f"ato_file.get_mass_to_charge_state_ratio() returned None")
@@ -516,39 +394,39 @@ def extract_data_from_ato_file(file_path: str, prefix: str, template: dict) -> d
 def extract_data_from_csv_file(file_path: str, prefix: str, template: dict) -> dict:
     """Add those required information which a CSV file has."""
     logger.debug(f"Extracting data from CSV file: {file_path}")
-    csv_file = ReadCsvFileFormat(file_path)
+    # like the reader of ifes_apt_tc_data_modeling the first line is a header and
+    # the columns are x, y, z, and mass-to-charge, trailing columns are ignored
+    values = read_text_columns(file_path, 1, b",;")
+    if values is not None and np.shape(values)[1] >= 4:
+        csv_file = None
+        xyz = ureg.Quantity(np.ascontiguousarray(values[:, 0:3]), ureg.nanometer)
+    else:
+        csv_file = open_reader(get_reader_spec("csv", "reconstruction"), file_path)
+        xyz = csv_file.get_reconstructed_positions()
 
     trg = f"{prefix}/atom_probeID[atom_probe]/reconstruction/reconstructed_positions"
-    xyz = csv_file.get_reconstructed_positions()
     if xyz is not None:
-        template[f"{trg}"] = {
-            "compress": np.asarray(xyz.magnitude, np.float32),
-            "filter": FAST_COMPRESSION_FILTER,
-            "strength": DEFAULT_COMPRESSION_LEVEL,
-            "chunks": prioritized_axes_heuristic(
-                np.asarray(xyz.magnitude, np.float32), (0, 1)
-            ),
-        }
+        template[f"{trg}"] = stage_compressed(
+            np.asarray(xyz.magnitude, np.float32), "positions", (0, 1)
+        )
         template[f"{trg}/@units"] = f"{xyz.units}"
     else:
         logger.warning(f"csv_file.get_reconstructed_positions() returned None")
     del xyz
 
     trg = f"{prefix}/atom_probeID[atom_probe]/mass_to_charge_conversion/mass_to_charge"
-    m_z = csv_file.get_mass_to_charge_state_ratio()
+    if csv_file is None:
+        m_z = ureg.Quantity(np.ascontiguousarray(values[:, 3]), ureg.dalton)
+    else:
+        m_z = csv_file.get_mass_to_charge_state_ratio()
     if m_z is not None:
-        template[f"{trg}"] = {
-            "compress": np.asarray(m_z.magnitude, np.float32),
-            "filter": FAST_COMPRESSION_FILTER,
-            "strength": DEFAULT_COMPRESSION_LEVEL,
-            "chunks": prioritized_axes_heuristic(
-                np.asarray(m_z.magnitude, np.float32), (0,)
-            ),
-        }
+        template[f"{trg}"] = stage_compressed(
+            np.asarray(m_z.magnitude, np.float32), "mass_to_charge", (0,)
+        )
         template[f"{trg}/@units"] = f"{m_z.units}"
     else:
         logger.warning(f"csv_file.get_mass_to_charge_state_ratio() returned None")
-    del m_z
+    del m_z, values
 
     return template
 
@@ -556,19 +434,16 @@ def extract_data_from_csv_file(file_path: str, prefix: str, template: dict) -> d
 def extract_data_from_pyc_file(file_path: str, prefix: str, template: dict) -> dict:
     """Add those required information which a pyccapt/calibration HDF5 file has."""
     logger.debug(f"Extracting data from pyccapt/calibration HDF5 file: {file_path}")
-    pyc_file = ReadPyccaptCalibrationFileFormat(file_path)
+    pyc_file = open_reader(
+        get_reader_spec("pyccapt_calibration", "reconstruction"), file_path
+    )
 
     trg = f"{prefix}/atom_probeID[atom_probe]/reconstruction/reconstructed_positions"
     xyz = pyc_file.get_reconstructed_positions()
     if xyz is not None:
-        template[f"{trg}"] = {
-            "compress": np.asarray(xyz.magnitude, np.float32),
-            "filter": FAST_COMPRESSION_FILTER,
-            "strength": DEFAULT_COMPRESSION_LEVEL,
-            "chunks": prioritized_axes_heuristic(
-                np.asarray(xyz.magnitude, np.float32), (0, 1)
-            ),
-        }
+        template[f"{trg}"] = stage_compressed(
+            np.asarray(xyz.magnitude, np.float32), "positions", (0, 1)
+        )
         template[f"{trg}/@units"] = f"{xyz.units}"
     else:
         logger.warning(f"pyc_file.get_reconstructed_positions() returned None")
@@ -577,14 +452,9 @@ def extract_data_from_pyc_file(file_path: str, prefix: str, template: dict) -> d
     trg = f"{prefix}/atom_probeID[atom_probe]/mass_to_charge_conversion/mass_to_charge"
     m_z = pyc_file.get_mass_to_charge_state_ratio()
     if m_z is not None:
-        template[f"{trg}"] = {
-            "compress": np.asarray(m_z.magnitude, np.float32),
-            "filter": FAST_COMPRESSION_FILTER,
-            "strength": DEFAULT_COMPRESSION_LEVEL,
-            "chunks": prioritized_axes_heuristic(
-                np.asarray(m_z.magnitude, np.float32), (0,)
-            ),
-        }
+        template[f"{trg}"] = stage_compressed(
+            np.asarray(m_z.magnitude, np.float32), "mass_to_charge", (0,)
+        )
         template[f"{trg}/@units"] = f"{m_z.units}"
     else:
         logger.warning(f"pyc_file.get_mass_to_charge_state_ratio() returned None")
@@ -593,14 +463,9 @@ def extract_data_from_pyc_file(file_path: str, prefix: str, template: dict) -> d
     trg = f"{prefix}/atom_probeID[atom_probe]/voltage_and_bowl/raw_tof"
     raw_time_of_flight = pyc_file.get_raw_time_of_flight()
     if raw_time_of_flight is not None:
-        template[f"{trg}"] = {
-            "compress": np.asarray(raw_time_of_flight.magnitude, np.float32),
-            "filter": FAST_COMPRESSION_FILTER,
-            "strength": DEFAULT_COMPRESSION_LEVEL,
-            "chunks": prioritized_axes_heuristic(
-                np.asarray(raw_time_of_flight.magnitude, np.float32), (0,)
-            ),
-        }
+        template[f"{trg}"] = stage_compressed(
+            np.asarray(raw_time_of_flight.magnitude, np.float32), "mass_to_charge", (0,)
+        )
         template[f"{trg}/@units"] = f"{raw_time_of_flight.units}"
     else:
         logger.warning(f"pyc_file.get_raw_time_of_flight() returned None")
@@ -609,66 +474,51 @@ def extract_data_from_pyc_file(file_path: str, prefix: str, template: dict) -> d
     trg = f"{prefix}/atom_probeID[atom_probe]/voltage_and_bowl/calibrated_tof"
     calibrated_time_of_flight = pyc_file.get_calibrated_time_of_flight()
     if calibrated_time_of_flight is not None:
-        template[f"{trg}"] = {
-            "compress": np.asarray(calibrated_time_of_flight.magnitude, np.float32),
-            "filter": FAST_COMPRESSION_FILTER,
-            "strength": DEFAULT_COMPRESSION_LEVEL,
-            "chunks": prioritized_axes_heuristic(
-                np.asarray(calibrated_time_of_flight.magnitude, np.float32), (0,)
-            ),
-        }
+        template[f"{trg}"] = stage_compressed(
+            np.asarray(calibrated_time_of_flight.magnitude, np.float32),
+            "mass_to_charge",
+            (0,),
+        )
         template[f"{trg}/@units"] = f"{calibrated_time_of_flight.units}"
     else:
         logger.warning(f"pyc_file.get_calibrated_time_of_flight() returned None")
     del calibrated_time_of_flight
 
-    trg = f"{prefix}/measurement/eventID[event1]/instrument/pulser/standing_voltage"
-    standing_voltage = pyc_file.get_standing_voltage()
-    if standing_voltage is not None:
-        template[f"{trg}"] = {
-            "compress": np.asarray(standing_voltage.magnitude, np.float32),
-            "filter": FAST_COMPRESSION_FILTER,
-            "strength": DEFAULT_COMPRESSION_LEVEL,
-            "chunks": prioritized_axes_heuristic(
-                np.asarray(standing_voltage.magnitude, np.float32), (0,)
-            ),
-        }
-        template[f"{trg}/@units"] = f"{standing_voltage.units}"
-    else:
-        logger.warning(f"pyc_file.get_standing_voltage() returned None")
-    del standing_voltage
-
-    trg = f"{prefix}/measurement/eventID[event1]/instrument/pulser/pulse_voltage"
-    pulse_voltage = pyc_file.get_pulse_voltage()
-    if pulse_voltage is not None:
-        template[f"{trg}"] = {
-            "compress": np.asarray(pulse_voltage.magnitude, np.float32),
-            "filter": FAST_COMPRESSION_FILTER,
-            "strength": DEFAULT_COMPRESSION_LEVEL,
-            "chunks": prioritized_axes_heuristic(
-                np.asarray(pulse_voltage.magnitude, np.float32), (0,)
-            ),
-        }
-        template[f"{trg}/@units"] = f"{pulse_voltage.units}"
-    else:
-        logger.warning(f"pyc_file.get_pulse_voltage() returned None")
-    del pulse_voltage
-
-    trg = f"{prefix}/atom_probeID[atom_probe]/hit_finding/hit_positions"
-    hit_positions = pyc_file.get_detector_hit_positions()
-    if hit_positions is not None:
-        template[f"{trg}"] = {
-            "compress": np.asarray(hit_positions.magnitude, np.float32),
-            "filter": FAST_COMPRESSION_FILTER,
-            "strength": DEFAULT_COMPRESSION_LEVEL,
-            "chunks": prioritized_axes_heuristic(
-                np.asarray(hit_positions.magnitude, np.float32), (0, 1)
-            ),
-        }
-        template[f"{trg}/@units"] = f"{hit_positions.units}"
-    else:
-        logger.warning(f"pyc_file.get_detector_hit_positions() returned None")
-    del hit_positions
+    if not is_skipped("pulse_data"):
+        trg = f"{prefix}/measurement/eventID[event1]/instrument/pulser/standing_voltage"
+        standing_voltage = pyc_file.get_standing_voltage()
+        if standing_voltage is not None:
+            template[f"{trg}"] = stage_compressed(
+                np.asarray(standing_voltage.magnitude, np.float32), "voltages", (0,)
+            )
+            template[f"{trg}/@units"] = f"{standing_voltage.units}"
+        else:
+            logger.warning(f"pyc_file.get_standing_voltage() returned None")
+        del standing_voltage
+
+    if not is_skipped("pulse_data"):
+        trg = f"{prefix}/measurement/eventID[event1]/instrument/pulser/pulse_voltage"
+        pulse_voltage = pyc_file.get_pulse_voltage()
+        if pulse_voltage is not None:
+            template[f"{trg}"] = stage_compressed(
+                np.asarray(pulse_voltage.magnitude, np.float32), "voltages", (0,)
+            )
+            template[f"{trg}/@units"] = f"{pulse_voltage.units}"
+        else:
+            logger.warning(f"pyc_file.get_pulse_voltage() returned None")
+        del pulse_voltage
+
+    if not is_skipped("hit_positions"):
+        trg = f"{prefix}/atom_probeID[atom_probe]/hit_finding/hit_positions"
+        hit_positions = pyc_file.get_detector_hit_positions()
+        if hit_positions is not None:
+            template[f"{trg}"] = stage_compressed(
+                np.asarray(hit_positions.magnitude, np.float32), "positions", (0, 1)
+            )
+            template[f"{trg}/@units"] = f"{hit_positions.units}"
+        else:
+            logger.warning(f"pyc_file.get_detector_hit_positions() returned None")
+        del hit_positions
 
     # add pulse data for multiplicity analysis
 
@@ -680,19 +530,19 @@ def extract_data_from_cameca_hfive_file(
 ) -> dict:
     """Add those required information which a Cameca HDF5 file has."""
     logger.debug(f"Extracting data from Cameca HDF5 file: {file_path}")
-    hfive_file = ReadCamecaHfiveFileFormat(file_path)
+    # same arguments as the ranging extractor, the reader is then shared via the pool
+    hfive_file = open_reader(
+        get_reader_spec("cameca_hdf5", "reconstruction"),
+        file_path,
+        MAKE_RANGING_DEFINITIONS_UNIQUE,
+    )
 
     trg = f"{prefix}/atom_probeID[atom_probe]/reconstruction/reconstructed_positions"
     xyz = hfive_file.get_reconstructed_positions()
     if xyz is not None:
-        template[f"{trg}"] = {
-            "compress": np.asarray(xyz.magnitude, np.float32),
-            "filter": FAST_COMPRESSION_FILTER,
-            "strength": DEFAULT_COMPRESSION_LEVEL,
-            "chunks": prioritized_axes_heuristic(
-                np.asarray(xyz.magnitude, np.float32), (0, 1)
-            ),
-        }
+        template[f"{trg}"] = stage_compressed(
+            np.asarray(xyz.magnitude, np.float32), "positions", (0, 1)
+        )
         template[f"{trg}/@units"] = f"{xyz.units}"
     else:
         logger.warning(f"hfive_file.get_reconstructed_positions() returned None")
@@ -701,14 +551,9 @@ def extract_data_from_cameca_hfive_file(
     trg = f"{prefix}/atom_probeID[atom_probe]/mass_to_charge_conversion/mass_to_charge"
     m_z = hfive_file.get_mass_to_charge_state_ratio()
     if m_z is not None:
-        template[f"{trg}"] = {
-            "compress": np.asarray(m_z.magnitude, np.float32),
-            "filter": FAST_COMPRESSION_FILTER,
-            "strength": DEFAULT_COMPRESSION_LEVEL,
-            "chunks": prioritized_axes_heuristic(
-                np.asarray(m_z.magnitude, np.float32), (0,)
-            ),
-        }
+        template[f"{trg}"] = stage_compressed(
+            np.asarray(m_z.magnitude, np.float32), "mass_to_charge", (0,)
+        )
         template[f"{trg}/@units"] = f"{m_z.units}"
     else:
         logger.warning(f"hfive_file.get_mass_to_charge_state_ratio() returned None")
@@ -717,10 +562,38 @@ def extract_data_from_cameca_hfive_file(
     return template
 
 
+def add_voltage_curve(
+    trg: str,
+    voltage: np.ndarray,
+    evaporation_id: np.ndarray,
+    units: str,
+    template: dict,
+    *,
+    title: str = "Voltage curve",
+) -> dict:
+    """Add a voltage curve as an NXdata group at trg."""
+    template[f"{trg}title"] = title
+    template[f"{trg}@signal"] = "voltage"
+    template[f"{trg}@axes"] = "axis_evaporation_id"
+    template[f"{trg}@AXISNAME_indices[@axis_evaporation_id_indices]"] = np.uint32(0)
+    template[f"{trg}DATA[voltage]"] = stage_compressed(voltage, "voltages", (0,))
+    template[f"{trg}DATA[voltage]/@units"] = units
+    template[f"{trg}DATA[voltage]/@long_name"] = (
+        f"Standing voltage + pulse voltage ({units})"
+    )
+    template[f"{trg}AXISNAME[axis_evaporation_id]"] = stage_compressed(
+        evaporation_id, "ion_labels", (0,)
+    )
+    template[f"{trg}AXISNAME[axis_evaporation_id]/@long_name"] = (
+        "Next hit group offset"  # TODO
+    )
+    return template
+
+
 def extract_data_from_ops_file(file_path: str, prefix: str, template: dict) -> dict:
     """Add those required information which a PoSAP ops file has."""
     logger.debug(f"Extracting data from PoSAP OPS file: {file_path}")
-    ops_file = ReadOpsFileFormat(file_path)
+    ops_file = open_reader(get_reader_spec("ops", "reconstruction"), file_path)
 
     if "time_stamp" in ops_file.instrument:
         trg = f"{prefix}/start_time"
@@ -746,57 +619,43 @@ def extract_data_from_ops_file(file_path: str, prefix: str, template: dict) -> d
     ):
         logger.warning(f"ops_file voltage data shape mismatch")
         return template
-    del reference_shape
     if (
         not f"{ops_file.voltages['standing_voltage'].units}"
         == f"{ops_file.voltages['pulse_voltage'].units}"
     ):
         logger.warning(f"ops_file standing and pulse voltage unit mismatch")
         return template
-    voltage = np.zeros(
-        (np.shape(ops_file.voltages["standing_voltage"].magnitude)[0],),
-        np.float32,
+    # standing and pulse voltage are summed in place into the preallocated curve
+    voltage = np.empty(reference_shape, np.float32)
+    np.add(
+        ops_file.voltages["standing_voltage"].magnitude,
+        ops_file.voltages["pulse_voltage"].magnitude,
+        out=voltage,
+        casting="same_kind",
     )
-    for name in ["standing_voltage", "pulse_voltage"]:
-        voltage += ops_file.voltages[name].magnitude
-
-    template[f"{trg}title"] = "Voltage curve"
-    template[f"{trg}@signal"] = "voltage"
-    template[f"{trg}@axes"] = "axis_evaporation_id"
-    template[f"{trg}@AXISNAME_indices[@axis_evaporation_id_indices]"] = np.uint32(0)
-    template[f"{trg}DATA[voltage]"] = {
-        "compress": np.asarray(voltage, np.float32),
-        "filter": FAST_COMPRESSION_FILTER,
-        "strength": DEFAULT_COMPRESSION_LEVEL,
-        "chunks": prioritized_axes_heuristic(
-            np.asarray(voltage, np.float32),
-            (0,),
-        ),
-    }
-    template[f"{trg}DATA[voltage]/@units"] = (
-        f"{ops_file.voltages['standing_voltage'].units}"
-    )
-    template[f"{trg}DATA[voltage]/@long_name"] = (
-        f"Standing voltage + pulse voltage ({ops_file.voltages['standing_voltage'].units})"
-    )
-    template[f"{trg}AXISNAME[axis_evaporation_id]"] = {
-        "compress": np.asarray(
-            ops_file.voltages["next_hit_group_offset"].magnitude,
-            np.uint32,
-        ),
-        "filter": FAST_COMPRESSION_FILTER,
-        "strength": DEFAULT_COMPRESSION_LEVEL,
-        "chunks": prioritized_axes_heuristic(
-            np.asarray(
-                ops_file.voltages["next_hit_group_offset"].magnitude,
-                np.uint32,
-            ),
-            (0,),
-        ),
-    }
-    template[f"{trg}AXISNAME[axis_evaporation_id]/@long_name"] = (
-        "Next hit group offset"  # TODO
+    evaporation_id = ops_file.voltages["next_hit_group_offset"].magnitude.astype(
+        np.uint32, copy=False
     )
+    del reference_shape
+    units = f"{ops_file.voltages['standing_voltage'].units}"
+    add_voltage_curve(trg, voltage, evaporation_id, units, template)
+    # long curves are additionally decimated to an envelope preserving preview
+    # for the default plot, the full curve is kept above
+    selected = get_min_max_decimation_indices(voltage)
+    if np.shape(selected)[0] < np.shape(voltage)[0]:
+        logger.info(
+            f"ops_file voltage curve preview decimated from {np.shape(voltage)[0]} "
+            f"to {np.shape(selected)[0]} points"
+        )
+        add_voltage_curve(
+            f"{prefix}/measurement/DATA[voltage_curve_preview]/",
+            voltage[selected],
+            evaporation_id[selected],
+            units,
+            template,
+            title="Voltage curve (min/max-decimated preview)",
+        )
+    del selected
 
     return template
 
@@ -806,19 +665,16 @@ def extract_data_from_stuttgart_apyt_raw_file(
 ) -> dict:
     """Add those required information which a Stuttgart RAW file has."""
     logger.debug(f"Extracting data from Stuttgart RAW file: {file_path}")
-    apyt_file = ReadStuttgartApytRawFileFormat(file_path)
+    apyt_file = open_reader(
+        get_reader_spec("stuttgart_apyt_raw", "reconstruction"), file_path
+    )
 
     trg = f"{prefix}/measurement/eventID[event1]/instrument/pulser/standing_voltage"
     standing_voltage = apyt_file.get_base_voltage()
     if standing_voltage is not None:
-        template[f"{trg}"] = {
-            "compress": np.asarray(standing_voltage.magnitude, np.float32),
-            "filter": FAST_COMPRESSION_FILTER,
-            "strength": DEFAULT_COMPRESSION_LEVEL,
-            "chunks": prioritized_axes_heuristic(
-                np.asarray(standing_voltage.magnitude, np.float32), (0,)
-            ),
-        }
+        template[f"{trg}"] = stage_compressed(
+            np.asarray(standing_voltage.magnitude, np.float32), "voltages", (0,)
+        )
         template[f"{trg}/@units"] = f"{standing_voltage.units}"
     else:
         logger.warning(f"apyt_file.get_base_voltage() returned None")
@@ -827,14 +683,9 @@ def extract_data_from_stuttgart_apyt_raw_file(
     trg = f"{prefix}/measurement/eventID[event1]/instrument/pulser/pulse_voltage"
     pulse_voltage = apyt_file.get_pulse_voltage()
     if pulse_voltage is not None:
-        template[f"{trg}"] = {
-            "compress": np.asarray(pulse_voltage.magnitude, np.float32),
-            "filter": FAST_COMPRESSION_FILTER,
-            "strength": DEFAULT_COMPRESSION_LEVEL,
-            "chunks": prioritized_axes_heuristic(
-                np.asarray(pulse_voltage.magnitude, np.float32), (0,)
-            ),
-        }
+        template[f"{trg}"] = stage_compressed(
+            np.asarray(pulse_voltage.magnitude, np.float32), "voltages", (0,)
+        )
         template[f"{trg}/@units"] = f"{pulse_voltage.units}"
     else:
         logger.warning(f"apyt_file.get_pulse_voltage() returned None")
@@ -843,14 +694,9 @@ def extract_data_from_stuttgart_apyt_raw_file(
     trg = f"{prefix}/atom_probeID[atom_probe]/voltage_and_bowl/raw_tof"
     raw_time_of_flight = apyt_file.get_raw_time_of_flight()
     if raw_time_of_flight is not None:
-        template[f"{trg}"] = {
-            "compress": np.asarray(raw_time_of_flight.magnitude, np.float32),
-            "filter": FAST_COMPRESSION_FILTER,
-            "strength": DEFAULT_COMPRESSION_LEVEL,
-            "chunks": prioritized_axes_heuristic(
-                np.asarray(raw_time_of_flight.magnitude, np.float32), (0,)
-            ),
-        }
+        template[f"{trg}"] = stage_compressed(
+            np.asarray(raw_time_of_flight.magnitude, np.float32), "mass_to_charge", (0,)
+        )
         template[f"{trg}/@units"] = f"{raw_time_of_flight.units}"
     else:
         logger.warning(f"apyt_file.get_raw_time_of_flight() returned None")
@@ -864,7 +710,9 @@ def extract_data_from_stuttgart_apyt_mass_spectrum_file(
 ) -> dict:
     """Add those required information which an APyT _trimmed.txt file has."""
     logger.debug(f"Extracting data from APyT _trimmed.txt file: {file_path}")
-    apyt_file = ReadStuttgartApytSpectrumAlignFileFormat(file_path)
+    apyt_file = open_reader(
+        get_reader_spec("stuttgart_apyt_mass_spectrum", "reconstruction"), file_path
+    )
 
     trg = f"{prefix}/atom_probeID[atom_probe]/ranging/mass_to_charge_distribution/"
     m_z = apyt_file.get_complete_spectrum()
@@ -891,23 +739,13 @@ def extract_data_from_stuttgart_apyt_mass_spectrum_file(
     template[f"{trg}@signal"] = "intensity"
     template[f"{trg}@axes"] = "axis_mass_to_charge"
     template[f"{trg}@AXISNAME_indices[@axis_mass_to_charge_indices]"] = np.uint32(0)
-    template[f"{trg}DATA[intensity]"] = {
-        "compress": np.asarray(m_z[1].magnitude, np.uint32),
-        "filter": FAST_COMPRESSION_FILTER,
-        "strength": DEFAULT_COMPRESSION_LEVEL,
-        "chunks": prioritized_axes_heuristic(
-            np.asarray(m_z[1].magnitude, np.uint32), (0,)
-        ),
-    }
+    template[f"{trg}DATA[intensity]"] = stage_compressed(
+        np.asarray(m_z[1].magnitude, np.uint32), "histograms", (0,)
+    )
     template[f"{trg}DATA[intensity]/@long_name"] = "Intensity (1)"  # Counts (1)"
-    template[f"{trg}AXISNAME[axis_mass_to_charge]"] = {
-        "compress": np.asarray(m_z[0].magnitude, np.float32),
-        "filter": FAST_COMPRESSION_FILTER,
-        "strength": DEFAULT_COMPRESSION_LEVEL,
-        "chunks": prioritized_axes_heuristic(
-            np.asarray(m_z[0].magnitude, np.float32), (0,)
-        ),
-    }
+    template[f"{trg}AXISNAME[axis_mass_to_charge]"] = stage_compressed(
+        np.asarray(m_z[0].magnitude, np.float32), "histograms", (0,)
+    )
     template[f"{trg}AXISNAME[axis_mass_to_charge]/@units"] = f"{m_z[0].units}"
     template[f"{trg}AXISNAME[axis_mass_to_charge]/@long_name"] = (
         f"Mass-to-charge-state-ratio ({m_z[0].units})"
@@ -923,23 +761,34 @@ def extract_data_from_stuttgart_apyt_recon_file(
 ) -> dict:
     """Add those required information which a APyT _xyz.txt file has."""
     logger.debug(f"Extracting data from APyT _xyz.txt file: {file_path}")
-    apyt_file = ReadStuttgartApytReconstructionFileFormat(file_path)
+    # the first line is the number of ions, the second a header, the columns are
+    # the ion id in (0, 255], x, y, z, and optionally the volume per atom
+    values = read_text_columns(file_path, 2, b"")
+    with open(file_path) as fp:
+        number_of_events = fp.readline().strip()
+    if (
+        values is not None
+        and np.shape(values)[1] >= 4
+        and number_of_events == f"{np.shape(values)[0]}"
+        and np.all((values[:, 0] > 0) & (values[:, 0] <= 255))
+    ):
+        xyz = ureg.Quantity(np.ascontiguousarray(values[:, 1:4]), ureg.nanometer)
+    else:
+        apyt_file = open_reader(
+            get_reader_spec("stuttgart_apyt_reconstruction", "reconstruction"),
+            file_path,
+        )
+        xyz = apyt_file.get_reconstructed_positions()
 
     trg = f"{prefix}/atom_probeID[atom_probe]/reconstruction/reconstructed_positions"
-    xyz = apyt_file.get_reconstructed_positions()
     if xyz is not None:
-        template[f"{trg}"] = {
-            "compress": np.asarray(xyz.magnitude, np.float32),
-            "filter": FAST_COMPRESSION_FILTER,
-            "strength": DEFAULT_COMPRESSION_LEVEL,
-            "chunks": prioritized_axes_heuristic(
-                np.asarray(xyz.magnitude, np.float32), (0, 1)
-            ),
-        }
+        template[f"{trg}"] = stage_compressed(
+            np.asarray(xyz.magnitude, np.float32), "positions", (0, 1)
+        )
         template[f"{trg}/@units"] = f"{xyz.units}"
     else:
         logger.warning(f"apyt_file.get_reconstructed_positions() returned None")
-    del xyz
+    del xyz, values
 
     return template
 
@@ -958,14 +807,13 @@ class IfesReconstructionParser:
             "file_path": file_path,
             "entry_id": entry_id,
         }
-        for suffix in VALID_FILE_NAME_SUFFIX_RECON:
-            if file_path.lower().endswith(suffix):
-                self.meta["file_format"] = suffix
-                break
-        if self.meta["file_format"] is not None:
+        self.file_format = detect_file_format(file_path, "reconstruction")
+        if self.file_format is not None:
+            self.meta["file_format"] = self.file_format.matching_suffix(file_path)
             self.supported = True
         else:
             logger.warning(f"{file_path} is not a supported reconstruction file")
+        self.memory_plan = MemoryPlan(self.file_format, file_path)
 
     def parse(self, template: dict) -> dict:
         """Copy data from self into template the application definition instance.
@@ -977,34 +825,6 @@ class IfesReconstructionParser:
             return template
         prfx = f"/ENTRY[entry{self.meta['entry_id']}]"
         if self.meta["file_path"] != "" and self.meta["file_format"] is not None:
-            if self.meta["file_format"] == ".apt":
-                extract_data_from_apt_file(self.meta["file_path"], prfx, template)
-            if self.meta["file_format"] == ".epos":
-                extract_data_from_epos_file(self.meta["file_path"], prfx, template)
-            if self.meta["file_format"] == ".pos":
-                extract_data_from_pos_file(self.meta["file_path"], prfx, template)
-            if self.meta["file_format"] == ".ato":
-                extract_data_from_ato_file(self.meta["file_path"], prfx, template)
-            if self.meta["file_format"] == ".csv":
-                extract_data_from_csv_file(self.meta["file_path"], prfx, template)
-            if self.meta["file_format"] == ".h5":
-                extract_data_from_pyc_file(self.meta["file_path"], prfx, template)
-            if self.meta["file_format"] == ".hdf5":
-                extract_data_from_cameca_hfive_file(
-                    self.meta["file_path"], prfx, template
-                )
-            if self.meta["file_format"] == ".ops":
-                extract_data_from_ops_file(self.meta["file_path"], prfx, template)
-            if self.meta["file_format"] == ".raw":
-                extract_data_from_stuttgart_apyt_raw_file(
-                    self.meta["file_path"], prfx, template
-                )
-            if self.meta["file_format"] == "_trimmed.txt":
-                extract_data_from_stuttgart_apyt_mass_spectrum_file(
-                    self.meta["file_path"], prfx, template
-                )
-            if self.meta["file_format"] == "_xyz.txt":
-                extract_data_from_stuttgart_apyt_recon_file(
-                    self.meta["file_path"], prfx, template
-                )
+            with self.memory_plan.applied():
+                self.file_format.extract(self.meta["file_path"], prfx, template)
         return template
@@ -19,12 +19,17 @@
 
 import os
 from time import perf_counter_ns
-from typing import Any
+from typing import Any, cast
 
 import flatdict as fd
 from pynxtools.dataconverter.readers.base.reader import BaseReader
 
-from pynxtools_apm import SEPARATOR
+from pynxtools_apm import (
+    PROFILING_EVENTS,
+    READER_THREADS,
+    SEPARATOR,
+    USE_INDEXED_TEMPLATE,
+)
 from pynxtools_apm.concepts.nxs_concepts import NxApmAppDef
 
 # from pynxtools_apm.examples.deprecated.usa_madison_cameca_eln import (
@@ -36,9 +41,12 @@ from pynxtools_apm.parsers.oasis_config import NxApmNomadOasisConfigParser
 from pynxtools_apm.parsers.oasis_eln import NxApmNomadOasisElnSchemaParser
 from pynxtools_apm.utils.create_nx_default_plots import apm_default_plot_generator
 from pynxtools_apm.utils.custom_logging import logger
+from pynxtools_apm.utils.file_pool import FilePool
+from pynxtools_apm.utils.indexed_template import IndexedTemplate
 from pynxtools_apm.utils.io_case_logic import ApmUseCaseSelector
-from pynxtools_apm.utils.profiling import simple_profiling
+from pynxtools_apm.utils.profiling import StageProfiler, simple_profiling
 from pynxtools_apm.utils.remove_uninstantiated import remove_uninstantiated_sensors
+from pynxtools_apm.utils.stage_graph import StageGraph, get_available_cpus
 
 
 class APMReader(BaseReader):
@@ -61,7 +69,13 @@ class APMReader(BaseReader):
         """Read data from given file, return filled template dictionary apm."""
         logger.info(os.getcwd())
         tic = perf_counter_ns()
+        profiler = StageProfiler()
         template.clear()
+        # parsers and helpers fill the template via this view, an IndexedTemplate
+        # is a MutableMapping which they use like a dict
+        view: dict = template
+        if USE_INDEXED_TEMPLATE:
+            view = cast(dict, IndexedTemplate(template))
 
         entry_id = 1
 
@@ -69,32 +83,56 @@ class APMReader(BaseReader):
         logger.debug(
             "Identify information sources (RDM config, ELN, tech-partner files) to deal with..."
         )
-        case = ApmUseCaseSelector(file_paths)
+        with profiler.stage("case_selection", "Identify information sources"):
+            case = ApmUseCaseSelector(file_paths)
         if not case.is_valid:
             logger.warning(
                 "Such a combination of input-file(s, if any) is not supported"
             )
             return {}
 
+        # the parsers of the individual sources are independent of each other except
+        # for the workflow report which uses file aliases from the config
+        graph = StageGraph()
+
         if len(case.cfg) == 1:
             logger.debug("Parse (meta)data coming from a custom NOMAD OASIS RDM...")
-            nx_apm_cfg = NxApmNomadOasisConfigParser(case.cfg[0], entry_id, False)
-            nx_apm_cfg.parse(template)
+
+            def parse_config(private: dict):
+                with profiler.stage("config", f"Parse {os.path.basename(case.cfg[0])}"):
+                    nx_apm_cfg = NxApmNomadOasisConfigParser(
+                        case.cfg[0], entry_id, False
+                    )
+                    nx_apm_cfg.parse(private)
+                return nx_apm_cfg.flat_metadata
+
+            graph.add("config", parse_config)
 
         if len(case.eln) == 1:
             logger.debug("Parse (meta)data coming from an ELN exemplified for NOMAD")
-            nx_apm_eln = NxApmNomadOasisElnSchemaParser(case.eln[0], entry_id)
-            nx_apm_eln.parse(template)
 
-        case.report_workflow(
-            template,
-            entry_id,
-            nx_apm_cfg.flat_metadata if nx_apm_cfg else fd.FlatDict({}, "/"),
-        )
+            def parse_eln(private: dict):
+                with profiler.stage("eln", f"Parse {os.path.basename(case.eln[0])}"):
+                    nx_apm_eln = NxApmNomadOasisElnSchemaParser(case.eln[0], entry_id)
+                    nx_apm_eln.parse(private)
+
+            graph.add("eln", parse_eln)
 
         logger.debug("Parse NeXus application definition-specific content...")
-        nxs = NxApmAppDef(entry_id)
-        nxs.parse(template)
+
+        def parse_appdef(private: dict):
+            with profiler.stage("appdef", "Report workflow and NXapm-specific content"):
+                case.report_workflow(
+                    private,
+                    entry_id,
+                    graph.results.get("config", fd.FlatDict({}, "/")),
+                )
+                nxs = NxApmAppDef(entry_id)
+                nxs.parse(private)
+
+        graph.add(
+            "appdef", parse_appdef, ("config",) if "config" in graph.stages else ()
+        )
 
         # deprecated
         # if 1 <= len(case.apsuite) <= 2:
@@ -105,36 +143,70 @@ class APMReader(BaseReader):
 
         if len(case.reconstruction) == 1:
             logger.debug("Parse (meta)data from a reconstructed dataset file...")
-            nx_apm_recon = IfesReconstructionParser(case.reconstruction[0], entry_id)
-            nx_apm_recon.parse(template)
+
+            def parse_reconstruction(private: dict):
+                with profiler.stage(
+                    "reconstruction",
+                    f"Parse {os.path.basename(case.reconstruction[0])}",
+                ) as record:
+                    nx_apm_recon = IfesReconstructionParser(
+                        case.reconstruction[0], entry_id
+                    )
+                    record["memory_plan"] = nx_apm_recon.memory_plan.as_dict()
+                    nx_apm_recon.parse(private)
+
+            graph.add("reconstruction", parse_reconstruction)
 
         if len(case.ranging) == 1:
             logger.debug("Parse (meta)data from a ranging definitions file...")
-            nx_apm_range = IfesRangingDefinitionsParser(case.ranging[0], entry_id)
-            nx_apm_range.parse(template)
+
+            def parse_ranging(private: dict):
+                with profiler.stage(
+                    "ranging", f"Parse {os.path.basename(case.ranging[0])}"
+                ):
+                    nx_apm_range = IfesRangingDefinitionsParser(
+                        case.ranging[0], entry_id
+                    )
+                    nx_apm_range.parse(private)
+
+            graph.add("ranging", parse_ranging)
+
+        # with a single CPU the stages would only contend for it, inputs which serve
+        # several roles are parsed and hashed once, the pool is released thereafter
+        with FilePool(case.get_shared_file_paths()):
+            graph.run(view, min(READER_THREADS, get_available_cpus()))
+        # report the stages in the order added rather than in the order completed,
+        # concurrent stages share process-wide counters like peak RSS and bytes read
+        order = {name: idx for idx, name in enumerate(graph.stages)}
+        profiler.stages.sort(key=lambda record: order.get(record["name"], -1))
 
         # TODO deactivate for production run in the first iteration as we will run
         # two parsing rounds, the first with pynxtools-apm, the second appending eventually
         # other content, like voltage curves; if these exist, they should be the
         # default plot, so the following two lines need to be run after the second round
         logger.debug("Create NeXus default plottable data...")
-        apm_default_plot_generator(template, entry_id)
+        with profiler.stage("default_plots", "Create NeXus default plottable data"):
+            apm_default_plot_generator(view, entry_id)
 
         logger.debug("Naive removal of concepts that have missing values")
         # these are introduced via the "use" functor but might not be populated with instance data
-        remove_uninstantiated_sensors(template, entry_id)
+        with profiler.stage("cleanup", "Remove uninstantiated concepts"):
+            remove_uninstantiated_sensors(view, entry_id)
 
         debugging = False
         if debugging:
             logger.debug(
                 "Reporting state of template before passing to HDF5 writing..."
             )
-            for keyword, value in sorted(template.items()):
+            for keyword, value in sorted(view.items()):
                 logger.info(f"{keyword}{SEPARATOR}{type(value)}{SEPARATOR}{value}")
 
         logger.debug("Forward instantiated template to the NXS writer...")
         toc = perf_counter_ns()
-        simple_profiling(template, tic, toc, "pynxtools_apm", entry_id)
+        simple_profiling(view, tic, toc, "pynxtools_apm", entry_id)
+        if PROFILING_EVENTS:
+            profiler.to_template(view, entry_id)
+        profiler.store_json_if_requested()
 
         return template
 
@@ -0,0 +1,93 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Choose the chunk shape of a field by its expected read pattern and compression."""
+
+# prioritized_axes_heuristic cuts every array into chunks of about 1 MiB
+# uncompressed irrespective of how the field is read, the tuner instead targets
+# a size of the compressed chunk per read pattern, the uncompressed size follows
+# from the typical compression ratio of the field class
+# row_slab: slabs of consecutive ions with all columns like positions in H5Web,
+# small chunks keep the latency of random slabs low, the compression ratio is
+# practically constant for chunks with more than 16384 rows
+# full_column: fields which are read completely like m/z by NOMAD previews,
+# larger chunks reduce the number of chunks to index and to read
+# viewer: histograms which H5Web slices, image-like slices are kept intact via
+# prioritized_axes_heuristic with the priority of the axes
+# whole: small arrays are stored in a single chunk
+# chunks are never larger than the h5py chunk cache, otherwise every partial
+# read of a chunk would decompress it again
+
+import numpy as np
+from pynxtools.dataconverter.chunk import (
+    CHUNK_CONFIG_DEFAULT,
+    prioritized_axes_heuristic,
+)
+
+READ_PATTERNS = {
+    "positions": "row_slab",
+    "mass_to_charge": "full_column",
+    "voltages": "full_column",
+    "ion_labels": "full_column",
+    "histograms": "viewer",
+    "metadata": "whole",
+}
+TARGET_COMPRESSED_CHUNK_SIZE = {  # byte
+    "row_slab": 64 * 1024,
+    "full_column": 512 * 1024,
+}
+EXPECTED_COMPRESSION_RATIO = {
+    "positions": 4.0,
+    "mass_to_charge": 6.0,
+    "voltages": 8.0,
+    "ion_labels": 4.0,
+    "histograms": 8.0,
+    "metadata": 1.0,
+}
+MAX_CHUNK_SIZE = int(CHUNK_CONFIG_DEFAULT["rdcc_nbytes"])  # byte
+
+
+def tune_chunk_shape(
+    values: np.ndarray, field_class: str, axes: tuple[int, ...] = (0,)
+) -> tuple[int, ...] | bool:
+    """Get the chunks parameter of create_dataset for values of the field class."""
+    pattern = READ_PATTERNS.get(field_class, "viewer")
+    if (
+        pattern == "viewer"
+        or not isinstance(values, np.ndarray)
+        or values.ndim == 0
+        or values.size == 0
+    ):
+        return prioritized_axes_heuristic(values, axes)
+    if pattern == "whole" and values.nbytes <= MAX_CHUNK_SIZE:
+        return tuple(int(extent) for extent in values.shape)
+    # chunk along axis 0 only, each row is kept intact
+    row_size = values.itemsize * int(np.prod(values.shape[1:]))
+    if pattern == "whole" or row_size > MAX_CHUNK_SIZE:
+        return prioritized_axes_heuristic(values, axes)
+    target = min(
+        int(
+            TARGET_COMPRESSED_CHUNK_SIZE[pattern]
+            * EXPECTED_COMPRESSION_RATIO[field_class]
+        ),
+        MAX_CHUNK_SIZE,
+    )
+    rows = max(target // row_size, 1)
+    rows = 1 << (rows.bit_length() - 1)  # power of two, at most target
+    return (min(rows, int(values.shape[0])),) + tuple(
+        int(extent) for extent in values.shape[1:]
+    )
@@ -0,0 +1,177 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Choose the compression filter and strength of a field by its field class."""
+
+# compressing hundreds of million positions with gzip level 9 dominates the time
+# of a conversion, a lower level is many times faster but yields larger files, by
+# how much depends on the data, therefore each array is staged for the writer with
+# the filter and strength that the active policy defines for its field class, the
+# default policy standard keeps gzip level 9 for all fields, fastest, balanced and
+# archival are opt-in trade-offs, policies are presets of the table
+# COMPRESSION_POLICIES, the active policy is COMPRESSION_POLICY, the environment
+# variable COMPRESSION_POLICY_ENV_VAR takes precedence, use_compression_policy
+# overrides both for a single conversion
+# the pynxtools writer supports gzip with a strength and blosc2 with zstd at a
+# fixed level, there is no shuffle option for gzip but blosc2 byte-shuffles,
+# blosc2 is used only if pynxtools has blosc2 threads, otherwise gzip
+# the writer honours no other keys of a staged value, pre-filters like the byte
+# shuffle for slowly changing per pulse series can therefore not be requested,
+# get_hdf5_dataset_kwargs creates the dataset of a staged value like the writer
+# for arrays smaller than COMPRESSION_MIN_SIZE byte, e.g. nuclide hashes, ranges,
+# or charge state candidates, the chunk index and filter pipeline cost more time
+# and space than compression saves, these are staged as is and stored contiguous
+# and uncompressed, the environment variable COMPRESSION_MIN_SIZE_ENV_VAR takes
+# precedence, get_staged_values gets the array of a staged or an unstaged value
+
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import numpy as np
+
+from pynxtools_apm import COMPRESSION_MIN_SIZE, COMPRESSION_POLICY
+from pynxtools_apm.utils.chunk_tuner import tune_chunk_shape
+from pynxtools_apm.utils.custom_logging import logger
+from pynxtools_apm.utils.lazy_import import load_object
+
+COMPRESSION_POLICY_ENV_VAR = "PYNXTOOLS_APM_COMPRESSION_POLICY"
+COMPRESSION_MIN_SIZE_ENV_VAR = "PYNXTOOLS_APM_COMPRESSION_MIN_SIZE"
+# positions: reconstructed and hit positions
+# mass_to_charge: mass-to-charge-state ratios and times of flight per ion
+# voltages: voltages and other per pulse instrument series, slowly varying
+# ion_labels: per ion integer labels and counts, e.g. number of pulses
+# histograms: mass spectra and discretized reconstructions of the default plots
+# metadata: small arrays like nuclide lists of the ranging definitions
+FIELD_CLASSES = (
+    "positions",
+    "mass_to_charge",
+    "voltages",
+    "ion_labels",
+    "histograms",
+    "metadata",
+)
+COMPRESSION_POLICIES: dict[str, dict[str, dict]] = {
+    "standard": {
+        field_class: {"filter": "gzip", "strength": 9} for field_class in FIELD_CLASSES
+    },
+    "fastest": {
+        field_class: {"filter": "gzip", "strength": 1} for field_class in FIELD_CLASSES
+    },
+    "balanced": {
+        "positions": {"filter": "gzip", "strength": 4},
+        "mass_to_charge": {"filter": "gzip", "strength": 4},
+        "voltages": {"filter": "gzip", "strength": 1},
+        "ion_labels": {"filter": "gzip", "strength": 1},
+        "histograms": {"filter": "gzip", "strength": 4},
+        "metadata": {"filter": "gzip", "strength": 9},
+    },
+    "archival": {
+        "positions": {"filter": "blosc", "strength": 9},
+        "mass_to_charge": {"filter": "gzip", "strength": 9},
+        "voltages": {"filter": "blosc", "strength": 9},
+        "ion_labels": {"filter": "blosc", "strength": 9},
+        "histograms": {"filter": "gzip", "strength": 9},
+        "metadata": {"filter": "gzip", "strength": 9},
+    },
+}
+ACTIVE_COMPRESSION_POLICY: ContextVar[str] = ContextVar(
+    "ACTIVE_COMPRESSION_POLICY", default=""
+)
+
+
+def get_compression_policy() -> str:
+    """Get the name of the compression policy which the conversion uses."""
+    policy = ACTIVE_COMPRESSION_POLICY.get()
+    if policy == "":
+        policy = os.environ.get(COMPRESSION_POLICY_ENV_VAR, COMPRESSION_POLICY)
+    if policy not in COMPRESSION_POLICIES:
+        logger.warning(
+            f"Unknown compression policy {policy}, using {COMPRESSION_POLICY}"
+        )
+        return COMPRESSION_POLICY
+    return policy
+
+
+def get_compression_min_size() -> int:
+    """Get the size in byte below which arrays are stored uncompressed."""
+    min_size = os.environ.get(COMPRESSION_MIN_SIZE_ENV_VAR, "")
+    if min_size == "":
+        return COMPRESSION_MIN_SIZE
+    if not min_size.isdigit():
+        logger.warning(
+            f"Invalid {COMPRESSION_MIN_SIZE_ENV_VAR} {min_size}, "
+            f"using {COMPRESSION_MIN_SIZE}"
+        )
+        return COMPRESSION_MIN_SIZE
+    return int(min_size)
+
+
+@contextmanager
+def use_compression_policy(policy: str):
+    """Stage all fields with the compression policy within the context."""
+    if policy not in COMPRESSION_POLICIES:
+        raise ValueError(
+            f"Unknown compression policy {policy}, use one of "
+            f"{list(COMPRESSION_POLICIES)}"
+        )
+    token = ACTIVE_COMPRESSION_POLICY.set(policy)
+    try:
+        yield policy
+    finally:
+        ACTIVE_COMPRESSION_POLICY.reset(token)
+
+
+def stage_compressed(
+    values: np.ndarray, field_class: str, axes: tuple[int, ...] = (0,)
+) -> dict | np.ndarray:
+    """Wrap values into a template value which the writer stores compressed."""
+    if values.nbytes < get_compression_min_size():
+        return values
+    settings = COMPRESSION_POLICIES[get_compression_policy()][field_class]
+    staged = {
+        "compress": values,
+        "filter": settings["filter"],
+        "strength": settings["strength"],
+        "chunks": tune_chunk_shape(values, field_class, axes),
+    }
+    return staged
+
+
+def get_staged_values(value):
+    """Get the values of a template value, staged with stage_compressed or not."""
+    if isinstance(value, dict):
+        return value.get("compress")
+    return value
+
+
+def get_hdf5_dataset_kwargs(staged: dict) -> dict:
+    """Translate a staged template value into keyword arguments of create_dataset."""
+    kwargs: dict = {"chunks": staged.get("chunks", True)}
+    if staged.get("filter") == "blosc":
+        blosc2 = load_object("hdf5plugin:Blosc2")
+        kwargs.update(
+            blosc2(
+                cname="zstd",
+                clevel=staged.get("strength", 9),
+                filters=blosc2.SHUFFLE,
+            )
+        )
+    else:
+        kwargs["compression"] = "gzip"
+        kwargs["compression_opts"] = staged.get("strength", 9)
+    return kwargs
@@ -18,16 +18,15 @@
 """Generator for NXapm default plots."""
 
 import numpy as np
-from pynxtools.dataconverter.chunk import prioritized_axes_heuristic
 
 from pynxtools_apm import (
-    DEFAULT_COMPRESSION_LEVEL,
-    FAST_COMPRESSION_FILTER,
+    CURVE_PREVIEW_MAX_POINTS,
     MASS_SPECTRUM_DEFAULT_BINNING,
     NAIVE_GRID_DEFAULT_MAX_SIZE,
     NAIVE_GRID_DEFAULT_VOXEL_SIZE,
     get_pynxtools_apm_version,
 )
+from pynxtools_apm.utils.compression_policy import get_staged_values, stage_compressed
 from pynxtools_apm.utils.custom_logging import logger
 
 
@@ -61,10 +60,34 @@ def icenter(imi, imx, resolution):
     return int(np.ceil((imx - imi) / resolution) / 2) + 1
 
 
+def get_min_max_decimation_indices(
+    values: np.ndarray, max_points: int = CURVE_PREVIEW_MAX_POINTS
+) -> np.ndarray:
+    """Get sorted indices of the minimum and maximum of values per bucket."""
+    # a line plot of the minima and maxima of max_points / 2 consecutive buckets
+    # has the same envelope as the plot of all values, buckets are views on values
+    n_values = np.shape(values)[0]
+    if n_values <= max_points:
+        return np.arange(n_values)
+    bucket_size = int(np.ceil(n_values / max(max_points // 2, 1)))
+    n_full = n_values // bucket_size
+    buckets = values[: n_full * bucket_size].reshape(n_full, bucket_size)
+    offsets = np.arange(n_full) * bucket_size
+    indices = [
+        offsets + np.argmin(buckets, axis=1),
+        offsets + np.argmax(buckets, axis=1),
+    ]
+    if n_full * bucket_size < n_values:
+        remainder = values[n_full * bucket_size :]
+        indices.append(n_full * bucket_size + np.asarray([np.argmin(remainder)]))
+        indices.append(n_full * bucket_size + np.asarray([np.argmax(remainder)]))
+    return np.unique(np.concatenate(indices))
+
+
 def create_default_plot_reconstruction(template: dict, entry_id: int) -> dict:
     """Compute on-the-fly, add, and give path to discretized reconstruction."""
     trg = f"/ENTRY[entry{entry_id}]/atom_probeID[atom_probe]/reconstruction/"
-    xyz = template[f"{trg}reconstructed_positions"]["compress"]
+    xyz = get_staged_values(template[f"{trg}reconstructed_positions"])
 
     logger.debug(f"\tEnter histogram computation, np.shape(xyz) {np.shape(xyz)}")
     # make the bounding box a quadric prism, discretized using cubic voxel edge in nm
@@ -146,23 +169,13 @@ def create_default_plot_reconstruction(template: dict, entry_id: int) -> dict:
 
     # mind that histogram does not follow Cartesian conventions so a transpose
     # might be necessary, for now we implement the transpose in the application definition
-    template[f"{trg}intensity"] = {
-        "compress": np.asarray(hist3d[0], np.uint32),
-        "filter": FAST_COMPRESSION_FILTER,
-        "strength": DEFAULT_COMPRESSION_LEVEL,
-        "chunks": prioritized_axes_heuristic(
-            np.asarray(hist3d[0], np.uint32), (0, 1, 2)
-        ),
-    }
+    template[f"{trg}intensity"] = stage_compressed(
+        np.asarray(hist3d[0], np.uint32), "histograms", (0, 1, 2)
+    )
     for col, dim in enumerate(dims):
-        template[f"{trg}AXISNAME[axis_{dim}]"] = {
-            "compress": np.asarray(hist3d[1][col][1::], np.float32),
-            "filter": FAST_COMPRESSION_FILTER,
-            "strength": DEFAULT_COMPRESSION_LEVEL,
-            "chunks": prioritized_axes_heuristic(
-                np.asarray(hist3d[1][col][1::], np.float32), (0,)
-            ),
-        }
+        template[f"{trg}AXISNAME[axis_{dim}]"] = stage_compressed(
+            np.asarray(hist3d[1][col][1::], np.float32), "histograms", (0,)
+        )
         template[f"{trg}AXISNAME[axis_{dim}]/@units"] = "nm"
         template[f"{trg}AXISNAME[axis_{dim}]/@long_name"] = f"{dim} (nm)"
     logger.debug(
@@ -174,7 +187,7 @@ def create_default_plot_reconstruction(template: dict, entry_id: int) -> dict:
 def create_default_plot_mass_spectrum(template: dict, entry_id: int) -> dict:
     """Compute on-the-fly, add, and give path to discretized reconstruction."""
     trg = f"/ENTRY[entry{entry_id}]/atom_probeID[atom_probe]/mass_to_charge_conversion/"
-    m_z = template[f"{trg}mass_to_charge"]["compress"]
+    m_z = get_staged_values(template[f"{trg}mass_to_charge"])
 
     logger.debug(f"\tEnter mass spectrum computation, np.shape(m_z) {np.shape(m_z)}")
     # the next three in u
@@ -226,20 +239,13 @@ def create_default_plot_mass_spectrum(template: dict, entry_id: int) -> dict:
     template[f"{trg}@signal"] = "intensity"
     template[f"{trg}@axes"] = "axis_mass_to_charge"
     template[f"{trg}@AXISNAME_indices[@axis_mass_to_charge_indices]"] = np.uint32(0)
-    template[f"{trg}DATA[intensity]"] = {
-        "compress": np.asarray(hist1d[0], np.uint32),
-        "strength": DEFAULT_COMPRESSION_LEVEL,
-        "chunks": prioritized_axes_heuristic(np.asarray(hist1d[0], np.uint32), (0,)),
-    }
+    template[f"{trg}DATA[intensity]"] = stage_compressed(
+        np.asarray(hist1d[0], np.uint32), "histograms", (0,)
+    )
     template[f"{trg}DATA[intensity]/@long_name"] = "Intensity (1)"  # Counts (1)"
-    template[f"{trg}AXISNAME[axis_mass_to_charge]"] = {
-        "compress": np.asarray(hist1d[1][1::], np.float32),
-        "filter": FAST_COMPRESSION_FILTER,
-        "strength": DEFAULT_COMPRESSION_LEVEL,
-        "chunks": prioritized_axes_heuristic(
-            np.asarray(hist1d[1][1::], np.float32), (0,)
-        ),
-    }
+    template[f"{trg}AXISNAME[axis_mass_to_charge]"] = stage_compressed(
+        np.asarray(hist1d[1][1::], np.float32), "histograms", (0,)
+    )
     del hist1d
     template[f"{trg}AXISNAME[axis_mass_to_charge]/@units"] = "Da"
     template[f"{trg}AXISNAME[axis_mass_to_charge]/@long_name"] = (
@@ -260,22 +266,23 @@ def apm_default_plot_generator(template: dict, entry_id: int) -> dict:
     has_valid_m_z = False
     trg = f"/ENTRY[entry{entry_id}]/atom_probeID[atom_probe]/mass_to_charge_conversion/mass_to_charge"
     if trg in template:
-        if isinstance(template[trg], dict):
-            if "compress" in template[trg]:
-                if isinstance(template[trg]["compress"], np.ndarray):
-                    has_valid_m_z = True
+        if isinstance(get_staged_values(template[trg]), np.ndarray):
+            has_valid_m_z = True
     has_valid_xyz = False
     trg = f"/ENTRY[entry{entry_id}]/atom_probeID[atom_probe]/reconstruction/reconstructed_positions"
     if trg in template:
-        if isinstance(template[trg], dict):
-            if "compress" in template[trg]:
-                if isinstance(template[trg]["compress"], np.ndarray):
-                    has_valid_xyz = True
+        if isinstance(get_staged_values(template[trg]), np.ndarray):
+            has_valid_xyz = True
     logger.debug(f"m_z, xyz: {has_valid_m_z}, {has_valid_xyz}")
 
     if (has_valid_m_z is False) and (has_valid_xyz is False):
-        # NEW ISSUE: fall-back solution to plot something else, however
-        # currently POS, EPOS and APT provide always xyz, and m_z data
+        # currently POS, EPOS and APT provide always xyz, and m_z data, OPS files
+        # only a voltage curve, long curves have a decimated preview
+        for name in ("voltage_curve_preview", "voltage_curve"):
+            trg = f"/ENTRY[entry{entry_id}]/measurement/DATA[{name}]/"
+            if f"{trg}DATA[voltage]" in template:
+                decorate_path_to_default_plot(template, trg[:-1])
+                break
         return template
 
     # generate default plottable and add path
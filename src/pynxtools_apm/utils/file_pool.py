@@ -0,0 +1,124 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Share readers and checksums of input files across the stages of one read."""
+
+# some inputs serve several roles, a Cameca HDF5 file is e.g. a reconstruction
+# and a ranging definitions file, each parser would construct its own reader,
+# which opens the file and parses header, index and ranging definitions, and the
+# workflow report would hash the file once per role, a FilePool instead keeps one
+# reader per reader class, file and arguments and one checksum per file for the
+# duration of a read, stages which run concurrently wait for the stage which
+# constructs the reader instead of constructing it a second time
+# only readers of files in shared_file_paths are kept, readers of single-role
+# files are released by their extractor as before to not raise peak memory,
+# checksums are small and kept for all files, when the pool is closed all readers
+# are closed, if they have a close method, and all references are dropped
+# readers of ifes_apt_tc_data_modeling open their HDF5 files by path, sharing a
+# reader shares its open-once parsing and its cached content across roles
+
+import threading
+from collections.abc import Callable, Iterable
+from contextvars import ContextVar
+from typing import Any
+
+from pynxtools_apm.utils.custom_logging import logger
+from pynxtools_apm.utils.get_checksum import get_sha256_of_file_content
+from pynxtools_apm.utils.lazy_import import load_object
+
+
+class FilePool:
+    """Objects per input file which the stages of one read share."""
+
+    def __init__(self, shared_file_paths: Iterable[str] = ()):
+        self.shared_file_paths = set(shared_file_paths)
+        self.lock = threading.Lock()
+        self.entries: dict[tuple, list] = {}  # key: [lock, is_set, value]
+        self.is_closed = False
+
+    def get(self, key: tuple, factory: Callable[[], Any]) -> Any:
+        """Get the object of key, factory creates it on first use."""
+        with self.lock:
+            if self.is_closed:
+                raise ValueError("FilePool is closed")
+            entry = self.entries.setdefault(key, [threading.Lock(), False, None])
+        with entry[0]:
+            if not entry[1]:
+                entry[2] = factory()
+                entry[1] = True
+            return entry[2]
+
+    def get_reader(self, reader: str, file_path: str, *args) -> Any:
+        """Get the reader object of the file, shared if the file has several roles."""
+        if file_path not in self.shared_file_paths:
+            return load_object(reader)(file_path, *args)
+        return self.get(
+            ("reader", reader, file_path, args),
+            lambda: load_object(reader)(file_path, *args),
+        )
+
+    def get_checksum(self, file_path: str) -> str:
+        """Get the SHA256 checksum of the file content."""
+        return self.get(("checksum", file_path), lambda: compute_checksum(file_path))
+
+    def close(self):
+        """Close all readers which have a close method and drop all references."""
+        with self.lock:
+            self.is_closed = True
+            entries = self.entries
+            self.entries = {}
+        for key, (_, is_set, value) in entries.items():
+            if is_set and callable(getattr(value, "close", None)):
+                try:
+                    value.close()
+                except Exception as exc:
+                    logger.warning(f"Closing {key[1:]} failed: {exc}")
+        logger.debug(f"FilePool released {len(entries)} objects")
+
+    def __enter__(self):
+        self.token = ACTIVE_FILE_POOL.set(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        ACTIVE_FILE_POOL.reset(self.token)
+        self.close()
+
+
+ACTIVE_FILE_POOL: ContextVar[FilePool | None] = ContextVar(
+    "ACTIVE_FILE_POOL", default=None
+)
+
+
+def compute_checksum(file_path: str) -> str:
+    with open(file_path, "rb") as fp:
+        return get_sha256_of_file_content(fp)
+
+
+def open_reader(reader: str, file_path: str, *args) -> Any:
+    """Construct the reader of the file or get it from the active pool."""
+    pool = ACTIVE_FILE_POOL.get()
+    if pool is None:
+        return load_object(reader)(file_path, *args)
+    return pool.get_reader(reader, file_path, *args)
+
+
+def get_file_checksum(file_path: str) -> str:
+    """Compute the checksum of the file or get it from the active pool."""
+    pool = ACTIVE_FILE_POOL.get()
+    if pool is None:
+        return compute_checksum(file_path)
+    return pool.get_checksum(file_path)
@@ -0,0 +1,383 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Registry of file formats that the reconstruction and ranging parsers support."""
+
+# each format declares its file name suffixes, optionally a magic signature, the
+# extractor which maps its content on the template, cost hints, and capabilities
+# extractors are module:function and readers module:class specifications resolved
+# on first use such that the registry can be imported without importing any of the
+# parsers or readers, some readers import heavy dependencies while a conversion
+# typically needs only one of them
+# further formats can be registered by other packages through entry points of the
+# group FILE_FORMAT_ENTRY_POINT_GROUP, each entry point has to resolve to a
+# FileFormat or an iterable of FileFormat instances, e.g. in the pyproject.toml
+# [project.entry-points.'pynxtools_apm.formats']
+# camecaroot = "pynxtools_apm_camecaroot.formats:CAMECAROOT_FORMATS"
+
+import importlib.metadata
+import os
+
+from pynxtools_apm.utils.custom_logging import logger
+from pynxtools_apm.utils.lazy_import import load_object
+
+FILE_FORMAT_ENTRY_POINT_GROUP = "pynxtools_apm.formats"
+FILE_FORMAT_ROLES = ("reconstruction", "ranging")
+HDF5_MAGIC = b"\x89HDF\r\n\x1a\n"
+
+# reconstruction extractors have the signature (file_path, prefix, template)
+# ranging extractors have the signature (file_path, template, entry_id)
+RECON = "pynxtools_apm.parsers.ifes_reconstruction"
+RANGE = "pynxtools_apm.parsers.ifes_ranging"
+IFES = "ifes_apt_tc_data_modeling"
+
+
+class FileFormat:
+    """Declaration of a file format and how to map its content on the template.
+
+    ram_per_byte is the estimated peak main memory that parsing takes per byte
+    of file size, streamable flags formats with fixed-size records that can be
+    read in chunks instead of at once. For formats with fixed-size records,
+    record_size is the number of bytes per ion in the file and bytes_per_ion
+    the number of bytes per ion that each group of fields occupies in the
+    template, optional_fields are those groups which can be skipped. reader
+    is the class with which the extractor opens the file.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        role: str,
+        suffixes: tuple[str, ...],
+        extractor: str,
+        *,
+        magic: bytes = b"",
+        ram_per_byte: float = 1.0,
+        streamable: bool = False,
+        capabilities: tuple[str, ...] = (),
+        record_size: int = 0,
+        bytes_per_ion: dict[str, int] | None = None,
+        optional_fields: tuple[str, ...] = (),
+        reader: str = "",
+    ):
+        if role not in FILE_FORMAT_ROLES:
+            raise ValueError(f"Unknown role {role} of file format {name} !")
+        self.name = name
+        self.role = role
+        self.suffixes = suffixes
+        self.extractor = extractor
+        self.magic = magic
+        self.ram_per_byte = ram_per_byte
+        self.streamable = streamable
+        self.capabilities = capabilities
+        self.record_size = record_size
+        self.bytes_per_ion = bytes_per_ion if bytes_per_ion is not None else {}
+        self.optional_fields = optional_fields
+        self.reader = reader
+
+    def matching_suffix(self, file_path: str) -> str:
+        """Get the longest suffix of this format with which file_path ends."""
+        matches = [sfx for sfx in self.suffixes if file_path.lower().endswith(sfx)]
+        return max(matches, key=len) if len(matches) > 0 else ""
+
+    def matches_magic(self, file_path: str) -> bool:
+        """Check the magic signature, files that cannot be opened are not refuted."""
+        if self.magic == b"":
+            return True
+        try:
+            with open(file_path, "rb") as fp:
+                return fp.read(len(self.magic)) == self.magic
+        except OSError:
+            return True
+
+    def estimate_ram(self, file_path: str, skipped: tuple[str, ...] = ()) -> int:
+        """Estimate peak main memory in byte that parsing file_path takes."""
+        if self.record_size > 0 and len(self.bytes_per_ion) > 0:
+            n_ions = os.path.getsize(file_path) // self.record_size
+            sizes = [
+                size for name, size in self.bytes_per_ion.items() if name not in skipped
+            ]
+            # all fields stay in the template until it is written, in addition
+            # readers hold a copy of the largest column of a field while converting
+            return n_ions * (sum(sizes) + max(sizes, default=0))
+        return int(os.path.getsize(file_path) * self.ram_per_byte)
+
+    def extract(self, *args):
+        """Map content of a file of this format on the template."""
+        return load_object(self.extractor)(*args)
+
+
+FILE_FORMATS: list[FileFormat] = [
+    FileFormat(
+        "apt",
+        "reconstruction",
+        (".apt",),
+        f"{RECON}:extract_data_from_apt_file",
+        ram_per_byte=2.0,
+        capabilities=("reconstruction", "mass_to_charge", "pulses", "voltages"),
+        optional_fields=("hit_positions", "pulse_data"),
+        reader=f"{IFES}.apt.apt6_reader:ReadAptFileFormat",
+    ),
+    FileFormat(
+        "pos",
+        "reconstruction",
+        (".pos",),
+        f"{RECON}:extract_data_from_pos_file",
+        ram_per_byte=2.0,
+        streamable=True,
+        capabilities=("reconstruction", "mass_to_charge"),
+        record_size=16,
+        bytes_per_ion={"reconstructed_positions": 12, "mass_to_charge": 4},
+        reader=f"{IFES}.pos.pos_reader:ReadPosFileFormat",
+    ),
+    FileFormat(
+        "epos",
+        "reconstruction",
+        (".epos",),
+        f"{RECON}:extract_data_from_epos_file",
+        ram_per_byte=2.0,
+        streamable=True,
+        capabilities=("reconstruction", "mass_to_charge", "pulses", "voltages"),
+        record_size=44,
+        bytes_per_ion={
+            "reconstructed_positions": 12,
+            "mass_to_charge": 4,
+            "raw_tof": 4,
+            "pulse_data": 16,
+            "hit_positions": 8,
+        },
+        optional_fields=("hit_positions", "pulse_data"),
+        reader=f"{IFES}.epos.epos_reader:ReadEposFileFormat",
+    ),
+    FileFormat(
+        "ato",
+        "reconstruction",
+        (".ato",),
+        f"{RECON}:extract_data_from_ato_file",
+        ram_per_byte=2.0,
+        streamable=True,
+        capabilities=("reconstruction", "mass_to_charge"),
+        # records of ATO v5 have 40B, those of v3 56B, i.e. the estimate is an upper bound
+        record_size=40,
+        bytes_per_ion={"reconstructed_positions": 12, "mass_to_charge": 4},
+        reader=f"{IFES}.ato.ato_reader:ReadAtoFileFormat",
+    ),
+    FileFormat(
+        "csv",
+        "reconstruction",
+        (".csv",),
+        f"{RECON}:extract_data_from_csv_file",
+        ram_per_byte=4.0,
+        capabilities=("reconstruction", "mass_to_charge"),
+        reader=f"{IFES}.csv.csv_reader:ReadCsvFileFormat",
+    ),
+    FileFormat(
+        "pyccapt_calibration",
+        "reconstruction",
+        (".h5",),
+        f"{RECON}:extract_data_from_pyc_file",
+        magic=HDF5_MAGIC,
+        ram_per_byte=2.0,
+        capabilities=("reconstruction", "mass_to_charge", "voltages"),
+        optional_fields=("hit_positions", "pulse_data"),
+        reader=f"{IFES}.pyccapt.pyccapt_reader:ReadPyccaptCalibrationFileFormat",
+    ),
+    FileFormat(
+        "cameca_hdf5",
+        "reconstruction",
+        (".hdf5",),
+        f"{RECON}:extract_data_from_cameca_hfive_file",
+        magic=HDF5_MAGIC,
+        ram_per_byte=2.0,
+        capabilities=("reconstruction", "mass_to_charge"),
+        reader=f"{IFES}.cameca.cameca_reader:ReadCamecaHfiveFileFormat",
+    ),
+    FileFormat(
+        "ops",
+        "reconstruction",
+        (".ops",),
+        f"{RECON}:extract_data_from_ops_file",
+        ram_per_byte=3.0,
+        capabilities=("voltages",),
+        reader=f"{IFES}.ops.ops_reader:ReadOpsFileFormat",
+    ),
+    FileFormat(
+        "stuttgart_apyt_raw",
+        "reconstruction",
+        (".raw",),
+        f"{RECON}:extract_data_from_stuttgart_apyt_raw_file",
+        ram_per_byte=2.0,
+        capabilities=("detector_hits", "voltages"),
+        reader=f"{IFES}.stuttgart.raw_reader:ReadStuttgartApytRawFileFormat",
+    ),
+    FileFormat(
+        "stuttgart_apyt_mass_spectrum",
+        "reconstruction",
+        ("_trimmed.txt",),
+        f"{RECON}:extract_data_from_stuttgart_apyt_mass_spectrum_file",
+        ram_per_byte=4.0,
+        capabilities=("mass_to_charge",),
+        reader=f"{IFES}.stuttgart.apyt_reader:ReadStuttgartApytSpectrumAlignFileFormat",
+    ),
+    FileFormat(
+        "stuttgart_apyt_reconstruction",
+        "reconstruction",
+        ("_xyz.txt",),
+        f"{RECON}:extract_data_from_stuttgart_apyt_recon_file",
+        ram_per_byte=4.0,
+        capabilities=("reconstruction",),
+        reader=f"{IFES}.stuttgart.apyt_reader:ReadStuttgartApytReconstructionFileFormat",
+    ),
+    FileFormat(
+        "rrng",
+        "ranging",
+        (".rrng",),
+        f"{RANGE}:extract_data_from_rrng_file",
+        capabilities=("ranging_definitions",),
+        reader=f"{IFES}.rrng.rrng_reader:ReadRrngFileFormat",
+    ),
+    FileFormat(
+        "rng",
+        "ranging",
+        (".rng",),
+        f"{RANGE}:extract_data_from_rng_file",
+        capabilities=("ranging_definitions",),
+        reader=f"{IFES}.rng.rng_reader:ReadRngFileFormat",
+    ),
+    FileFormat(
+        "env",
+        "ranging",
+        (".env",),
+        f"{RANGE}:extract_data_from_env_file",
+        capabilities=("ranging_definitions",),
+        reader=f"{IFES}.env.env_reader:ReadEnvFileFormat",
+    ),
+    FileFormat(
+        "fig_txt",
+        "ranging",
+        (".fig.txt",),
+        f"{RANGE}:extract_data_from_fig_txt_file",
+        capabilities=("ranging_definitions",),
+        reader=f"{IFES}.fig.fig_reader:ReadFigTxtFileFormat",
+    ),
+    FileFormat(
+        "pyccapt_ranging",
+        "ranging",
+        ("range_.h5",),
+        f"{RANGE}:extract_data_from_pyccapt_file",
+        magic=HDF5_MAGIC,
+        capabilities=("ranging_definitions",),
+        reader=f"{IFES}.pyccapt.pyccapt_reader:ReadPyccaptRangingFileFormat",
+    ),
+    FileFormat(
+        "imago_analysis",
+        "ranging",
+        (".analysis",),
+        f"{RANGE}:extract_data_from_imago_file",
+        capabilities=("ranging_definitions",),
+        reader=f"{IFES}.imago.imago_reader:ReadImagoAnalysisFileFormat",
+    ),
+    FileFormat(
+        "cameca_hdf5",
+        "ranging",
+        (".hdf5",),
+        f"{RANGE}:extract_data_from_cameca_hfive_file",
+        magic=HDF5_MAGIC,
+        capabilities=("ranging_definitions",),
+        reader=f"{IFES}.cameca.cameca_reader:ReadCamecaHfiveFileFormat",
+    ),
+    FileFormat(
+        "analysisset",
+        "ranging",
+        (".analysisset",),
+        f"{RANGE}:extract_data_from_analysisset_file",
+        capabilities=("ranging_definitions",),
+        reader=f"{IFES}.analysisset.analysisset_reader:ReadAnalysissetFileFormat",
+    ),
+]
+FILE_FORMAT_PLUGINS_LOADED = False
+
+
+def register_file_format(file_format: FileFormat):
+    """Add file_format, replaces an existent format with the same name and role."""
+    for idx, registered in enumerate(FILE_FORMATS):
+        if registered.name == file_format.name and registered.role == file_format.role:
+            FILE_FORMATS[idx] = file_format
+            return
+    FILE_FORMATS.append(file_format)
+
+
+def load_file_format_plugins():
+    """Register formats from entry points of other packages, only once."""
+    global FILE_FORMAT_PLUGINS_LOADED
+    if FILE_FORMAT_PLUGINS_LOADED:
+        return
+    FILE_FORMAT_PLUGINS_LOADED = True
+    for entry_point in importlib.metadata.entry_points(
+        group=FILE_FORMAT_ENTRY_POINT_GROUP
+    ):
+        try:
+            declared = entry_point.load()
+        except Exception as exc:  # a broken plugin must not break the reader
+            logger.warning(f"Unable to load file format plugin {entry_point} {exc} !")
+            continue
+        for file_format in (
+            [declared] if isinstance(declared, FileFormat) else list(declared)
+        ):
+            if isinstance(file_format, FileFormat):
+                register_file_format(file_format)
+                logger.info(f"Registered file format {file_format.name} from plugin")
+
+
+def get_file_formats(role: str = "", plugins: bool = True) -> list[FileFormat]:
+    """Get all registered formats, of a specific role if role is not empty."""
+    if plugins:
+        load_file_format_plugins()
+    return [fmt for fmt in FILE_FORMATS if role == "" or fmt.role == role]
+
+
+def get_file_name_suffixes(role: str = "", plugins: bool = True) -> list[str]:
+    """Get all unique suffixes of the registered formats in order of registration."""
+    suffixes: list[str] = []
+    for file_format in get_file_formats(role, plugins):
+        for suffix in file_format.suffixes:
+            if suffix not in suffixes:
+                suffixes.append(suffix)
+    return suffixes
+
+
+def get_reader_spec(name: str, role: str) -> str:
+    """Get the module:class specification of the reader of a registered format."""
+    for file_format in get_file_formats(role):
+        if file_format.name == name and file_format.reader != "":
+            return file_format.reader
+    raise ValueError(f"No reader for file format {name} of role {role} !")
+
+
+def detect_file_format(file_path: str, role: str = "") -> FileFormat | None:
+    """Identify the format of file_path via the longest matching suffix and magic."""
+    candidates = []
+    for file_format in get_file_formats(role):
+        suffix = file_format.matching_suffix(file_path)
+        if suffix != "":
+            candidates.append((len(suffix), file_format))
+    # stable sort, ties are resolved in favour of the earlier registered format
+    for _, file_format in sorted(candidates, key=lambda item: -item[0]):
+        if file_format.matches_magic(file_path):
+            return file_format
+        logger.warning(f"{file_path} does not have the signature of {file_format.name}")
+    return None
@@ -17,68 +17,318 @@
 #
 """Utility functions for generation of atom probe NeXus datasets for dev purposes."""
 
-# MK::2023/05/04 the code in this file can currently not be used when
-# developers have an environment which uses ase==3.19.0 and numpy>=1.2x
+# synthetic datasets of arbitrary size are used for benchmarking the reader,
+# all random numbers are drawn from generators seeded with synthesis_id
+# such that the same synthesis_id yields byte-identical files
+# the reconstruction is a cylinder carved out of an fcc lattice, the lattice
+# sites of one lattice constant thick slab of the cylinder are computed once
+# and then repeated along z, the first n_ions sites are taken, i.e. the ions are
+# ordered by z like in a real measurement where the specimen evaporates from
+# the apex downwards
+# ions are generated in chunks of at most SYNTHETIC_CHUNK_SIZE ions which are
+# written to disk before the next chunk is generated, i.e. the memory needed is
+# independent of n_ions, each chunk samples the ion type of all its ions at once
+# via a binary search of uniform random numbers in the cumulated composition
 
 import datetime
 import hashlib
+import os
+from collections.abc import Iterator
 
-import ase
 import numpy as np
-from ase.data import atomic_masses, atomic_numbers, chemical_symbols
-from ase.lattice.cubic import FaceCenteredCubic
+from ase.data import atomic_masses, chemical_symbols
+from ifes_apt_tc_data_modeling.apt.apt6_headers import AptFileHeaderMetadata
+from ifes_apt_tc_data_modeling.apt.apt6_sections import AptFileSectionMetadata
+from ifes_apt_tc_data_modeling.apt.apt6_utils import string_to_typed_nparray
 from ifes_apt_tc_data_modeling.utils.utils import (
-    MAX_NUMBER_OF_ATOMS_PER_ION,
-    MQ_EPSILON,
     create_nuclide_hash,
     nuclide_hash_to_human_readable_name,
     nuclide_hash_to_nuclide_list,
 )
-from pynxtools.dataconverter.chunk import prioritized_axes_heuristic
-
-# do not use ase directly any longer for NIST isotopes, instead this syntactic equivalent
-# from ifes_apt_tc_data_modeling.utils.nist_isotope_data \
-#     import isotopes
-from pynxtools_apm import (
-    DEFAULT_COMPRESSION_FILTER,
-    DEFAULT_COMPRESSION_LEVEL,
-    get_pynxtools_apm_version,
-)
+
+from pynxtools_apm import get_pynxtools_apm_version
+from pynxtools_apm.parsers.ifes_ranging import add_unknown_iontype
+from pynxtools_apm.utils.compression_policy import stage_compressed
 from pynxtools_apm.utils.custom_logging import logger
-from pynxtools_apm.utils.load_ranging import add_unknown_iontype
 
 # parameter affecting reconstructed positions and size
-CRYSTAL_ORIENTATION = [[1, 0, 0], [0, 1, 0], [0, 0, 1]]
-# MK::add analysis how large aggregate has to be
-RECON_SIZE = (50, 50, 300)
-RECON_ATOM_SPACING = 5.0
-RECON_HEIGHT = 300.0  # angstroem
-RECON_RADIUS = 50.0  # angstroem
+RECON_ATOM_SPACING = 5.0  # angstroem, lattice constant of the fcc lattice
+RECON_ASPECT_RATIO = 6.0  # height over radius of the cylinder
+FCC_BASIS = ((0.0, 0.0, 0.0), (0.5, 0.5, 0.0), (0.5, 0.0, 0.5), (0.0, 0.5, 0.5))
+SYNTHETIC_CHUNK_SIZE = 1 << 22  # ions
+MAX_COMPARISON_CATEGORIES = 16  # sample from more categories via binary search
 MAX_COMPONENTS = 5  # how many different molecular ions in one dataset/entry
-MAX_ATOMS = 10  # determine power-law fraction of n_atoms per ion
+MAX_ATOMS = 3  # determine power-law fraction of n_atoms per ion
 MULTIPLES_FACTOR = 0.6  # controls how likely multiple ions are synthesized
 # the higher this factor the more uniformly and more likely multiplicity > 1
 MAX_CHARGE_STATE = 4  # highest allowed charge_state of an ion
 MAX_ATOMIC_NUMBER = 94  # do not include heavier atoms than Plutonium
 MAX_USERS = 4
+RANGE_HALF_WIDTH = 0.1  # Da
+DEFAULT_FLIGHT_PATH = 0.1  # m
+DEFAULT_STANDING_VOLTAGE = (2000.0, 8000.0)  # V, at the first and the last ion
+DALTON_PER_ELEMENTARY_CHARGE = 1.036426965e-8  # kg/C
+APT_SECTION_HEADER_SIZE = 148  # byte
+POS_DTYPE = np.dtype([("xyz", ">f4", (3,)), ("m_z", ">f4")])
+EPOS_DTYPE = np.dtype(
+    [
+        ("xyz", ">f4", (3,)),
+        ("m_z", ">f4"),
+        ("tof", ">f4"),
+        ("vdc", ">f4"),
+        ("vp", ">f4"),
+        ("det", ">f4", (2,)),
+        ("delta_pulse", ">u4"),
+        ("ions_per_pulse", ">u4"),
+    ]
+)
+# independent random streams per purpose such that e.g. writing an ePOS file
+# does not change which ion types are sampled
+COMPOSITION_STREAM = 0
+ION_TYPE_STREAM = 1
+PULSE_STREAM = 2
+
+
+def sample_categories(rng, weights, n_samples: int) -> np.ndarray:
+    """Sample n_samples indices into weights with probabilities proportional to weights."""
+    cdf = np.cumsum(weights, dtype=np.float64)
+    cdf /= cdf[-1]
+    unifrnd = rng.random(n_samples)
+    if len(cdf) > MAX_COMPARISON_CATEGORIES:
+        categories = np.searchsorted(cdf, unifrnd, side="right")
+        # guard against rounding of the last value of the cdf below 1.0
+        return np.minimum(categories, len(cdf) - 1)
+    # for a few categories counting the exceeded cdf values is branch-free
+    # and therefore faster than the binary search
+    categories = np.zeros(n_samples, np.uint8)
+    for value in cdf[:-1]:
+        np.add(categories, unifrnd >= value, out=categories, casting="unsafe")
+    return categories
+
+
+def get_cylinder_slab(n_ions: int, spacing: float = RECON_ATOM_SPACING):
+    """Sites in angstroem of a slab of the fcc lattice in the cylinder, sorted by z."""
+    density = len(FCC_BASIS) / spacing**3
+    radius = max(
+        (n_ions / (density * np.pi * RECON_ASPECT_RATIO)) ** (1.0 / 3.0), spacing
+    )
+    cells = np.arange(-int(np.ceil(radius / spacing)), int(np.ceil(radius / spacing)))
+    cell_x, cell_y = np.meshgrid(cells, cells, indexing="ij")
+    slab = []
+    for basis in FCC_BASIS:
+        x = (cell_x.ravel() + basis[0]) * spacing
+        y = (cell_y.ravel() + basis[1]) * spacing
+        inside = x**2 + y**2 <= radius**2
+        slab.append(
+            np.column_stack(
+                (x[inside], y[inside], np.full(np.sum(inside), basis[2] * spacing))
+            )
+        )
+    sites = np.concatenate(slab).astype(np.float32)
+    return sites[np.argsort(sites[:, 2], kind="stable")]
+
+
+def iter_cylinder_lattice(
+    n_ions: int,
+    chunk_size: int = SYNTHETIC_CHUNK_SIZE,
+    spacing: float = RECON_ATOM_SPACING,
+) -> Iterator[np.ndarray]:
+    """Positions in nm of the first n_ions sites in an upright cylinder, in chunks."""
+    slab = get_cylinder_slab(n_ions, spacing)
+    n_slabs = int(np.ceil(n_ions / len(slab)))
+    slabs_per_chunk = max(chunk_size // len(slab), 1)
+    for first in range(0, n_slabs, slabs_per_chunk):
+        last = min(first + slabs_per_chunk, n_slabs)
+        xyz = np.empty((last - first, len(slab), 3), np.float32)
+        xyz[:] = slab[np.newaxis, :, :]
+        xyz[:, :, 2] += (np.arange(first, last, dtype=np.float32) * spacing)[
+            :, np.newaxis
+        ]
+        xyz = xyz.reshape((-1, 3))[0 : n_ions - first * len(slab)]
+        xyz *= 0.1  # from angstroem to nm
+        yield xyz
+
+
+def get_cylinder_lattice(n_ions: int, spacing: float = RECON_ATOM_SPACING):
+    """Positions in nm of the first n_ions fcc lattice sites in an upright cylinder."""
+    return np.concatenate(
+        list(iter_cylinder_lattice(n_ions, SYNTHETIC_CHUNK_SIZE, spacing))
+    )
+
+
+def write_pos(file_path: str, chunks):
+    """Write chunks of positions and mass-to-charge-state ratio values as POS file."""
+    buffer = np.empty(0, POS_DTYPE)
+    with open(file_path, "wb") as fp:
+        for xyz, m_z in chunks:
+            if len(buffer) < len(m_z):
+                buffer = np.empty(len(m_z), POS_DTYPE)
+            records = buffer[0 : len(m_z)]
+            records["xyz"] = xyz
+            records["m_z"] = m_z
+            records.tofile(fp)
+
+
+def write_epos(file_path: str, chunks, n_ions: int, rng):
+    """Write chunks of positions, mass-to-charge-state ratio and emulated raw data."""
+    buffer = np.empty(0, EPOS_DTYPE)
+    with open(file_path, "wb") as fp:
+        first = 0
+        for xyz, m_z in chunks:
+            if len(buffer) < len(m_z):
+                buffer = np.empty(len(m_z), EPOS_DTYPE)
+            records = buffer[0 : len(m_z)]
+            records["xyz"] = xyz
+            records["m_z"] = m_z
+            # linear voltage ramp over the measurement, laser pulsing only
+            vdc = np.arange(first, first + len(m_z), dtype=np.float32)
+            vdc *= (DEFAULT_STANDING_VOLTAGE[1] - DEFAULT_STANDING_VOLTAGE[0]) / max(
+                n_ions - 1, 1
+            )
+            vdc += DEFAULT_STANDING_VOLTAGE[0]
+            records["vdc"] = vdc
+            records["vp"] = 0.0
+            # time of flight in ns from m/q = 2 e U (t / L)^2
+            records["tof"] = np.sqrt(
+                m_z * np.float32(DALTON_PER_ELEMENTARY_CHARGE * 0.5) / vdc
+            ) * np.float32(DEFAULT_FLIGHT_PATH * 1.0e9)
+            # detector hit positions in mm as a scaled projection of the positions
+            np.multiply(xyz[:, 0:2], 2.0, out=records["det"])
+            # pulses since the previous ion, uniform instead of geometric as the
+            # latter takes longer to sample than all other columns together
+            records["delta_pulse"] = rng.integers(
+                1, 200, size=len(m_z), dtype=np.uint32
+            )
+            records["ions_per_pulse"] = 1
+            records.tofile(fp)
+            first += len(m_z)
+
+
+def get_apt_section_header(
+    section: str, record_size: int, unit: str, n_ions: int, header_size: int
+) -> np.ndarray:
+    """Create header of a section of an APT file with 32-bit float records."""
+    header = np.zeros(1, AptFileSectionMetadata.get_numpy_struct())
+    header["cSignature"] = string_to_typed_nparray("SEC\0", 4, np.uint8)
+    header["iHeaderSize"] = header_size
+    header["iHeaderVersion"] = 2
+    header["wcSectionType"] = string_to_typed_nparray(section, 32, np.uint16)
+    header["iSectionVersion"] = 1
+    header["eRelationshipType"] = 1  # one record per ion
+    header["eRecordType"] = 1  # fixed size
+    header["eRecordDataType"] = 3  # IEEE float
+    header["iDataTypeSize"] = 32
+    header["iRecordSize"] = record_size
+    header["wcDataUnit"] = string_to_typed_nparray(unit, 16, np.uint16)
+    header["llRecordCount"] = n_ions
+    header["llByteCount"] = n_ions * record_size
+    return header
+
+
+def write_apt(file_path: str, chunks, n_ions: int):
+    """Write the Position and the Mass section of an AMETEK APT(6) file."""
+    header = np.zeros(1, AptFileHeaderMetadata.get_numpy_struct())
+    header["cSignature"] = string_to_typed_nparray("APT\0", 4, np.uint8)
+    header["iHeaderSize"] = header.itemsize
+    header["iHeaderVersion"] = 2
+    header["wcFilename"] = string_to_typed_nparray(
+        os.path.basename(file_path)[0:256], 256, np.uint16
+    )
+    header["ftCreationTime"] = 0  # keep files of the same seed byte-identical
+    header["llIonCount"] = n_ions
+    # the sections are not interleaved, the Position section is written while
+    # the mass-to-charge-state ratio values are written behind the end of the
+    # Position section, the bounds preceding the positions are written at the end
+    position_offset = header.itemsize + APT_SECTION_HEADER_SIZE
+    mass_offset = position_offset + 6 * 4 + n_ions * 12
+    bounds = np.asarray([np.inf, -np.inf] * 3, "<f4")
+    with open(file_path, "wb") as fp:
+        header.tofile(fp)
+        get_apt_section_header(
+            "Position", 12, "nm", n_ions, APT_SECTION_HEADER_SIZE + 6 * 4
+        ).tofile(fp)
+        fp.seek(mass_offset)
+        get_apt_section_header("Mass", 4, "Da", n_ions, APT_SECTION_HEADER_SIZE).tofile(
+            fp
+        )
+        positions_written = 0
+        masses_written = 0
+        for xyz, m_z in chunks:
+            fp.seek(position_offset + 6 * 4 + positions_written)
+            np.asarray(xyz, "<f4").tofile(fp)
+            positions_written += len(m_z) * 12
+            fp.seek(mass_offset + APT_SECTION_HEADER_SIZE + masses_written)
+            np.asarray(m_z, "<f4").tofile(fp)
+            masses_written += len(m_z) * 4
+            # reducing each column separately is faster than along axis 0
+            if len(m_z) > 0:
+                for dim in range(3):
+                    bounds[2 * dim] = min(bounds[2 * dim], np.min(xyz[:, dim]))
+                    bounds[2 * dim + 1] = max(bounds[2 * dim + 1], np.max(xyz[:, dim]))
+        if n_ions == 0:
+            bounds[:] = 0.0
+        fp.seek(position_offset)
+        bounds.tofile(fp)
+
+
+def write_rrng(file_path: str, composition: list):
+    """Write one range per ion of composition as RRNG file."""
+    symbols = sorted({symbol for ion in composition for symbol in ion[0]})
+    lines = ["[Ions]", f"Number={len(symbols)}"]
+    lines.extend(f"Ion{idx}={symbol}" for idx, symbol in enumerate(symbols, start=1))
+    lines.extend(["[Ranges]", f"Number={len(composition)}"])
+    for idx, ion in enumerate(composition, start=1):
+        counts = " ".join(
+            f"{symbol}:{ion[0].count(symbol)}" for symbol in sorted(set(ion[0]))
+        )
+        lines.append(
+            f"Range{idx}={ion[2] - RANGE_HALF_WIDTH:.4f} "
+            f"{ion[2] + RANGE_HALF_WIDTH:.4f} Vol:0.01000 {counts} Color:33FFFF"
+        )
+    with open(file_path, "w", encoding="utf8") as fp:
+        fp.write("\n".join(lines) + "\n")
+
+
+def write_rng(file_path: str, composition: list):
+    """Write one range per ion of composition as Oak Ridge RNG file."""
+    symbols = sorted({symbol for ion in composition for symbol in ion[0]})
+    lines = [f"{len(symbols)} {len(composition)}"]
+    for symbol in symbols:
+        lines.extend([symbol, "0.2 0.8 1.0"])
+    lines.append(f"------------------- {' '.join(symbols)}")
+    for ion in composition:
+        counts = " ".join(str(ion[0].count(symbol)) for symbol in symbols)
+        lines.append(
+            f". {ion[2] - RANGE_HALF_WIDTH:.4f} {ion[2] + RANGE_HALF_WIDTH:.4f} {counts}"
+        )
+    with open(file_path, "w", encoding="utf8") as fp:
+        fp.write("\n".join(lines) + "\n")
 
 
 class ApmCreateExampleData:
     """A synthesized dataset meant to be used for development purposes only!."""
 
-    def __init__(self, synthesis_id):
+    def __init__(
+        self,
+        synthesis_id: int,
+        n_ions: int = 100000,
+        chunk_size: int = SYNTHETIC_CHUNK_SIZE,
+    ):
         """Construct class."""
-        raise NotImplementedError()
         # assure PRNG yields a deterministic sequence
-        np.random.seed(seed=synthesis_id)
+        self.synthesis_id = synthesis_id
+        self.rng = np.random.default_rng(seed=(synthesis_id, COMPOSITION_STREAM))
 
         self.n_entries = 1
-        logger.debug("Generating one random example NXem entry...")
+        self.n_ions = n_ions
+        self.chunk_size = chunk_size
+        logger.debug("Generating one random example NXapm entry...")
         self.entry_id = 1
         # reconstructed dataset and mass-to-charge state ratio values
         # like what is traditionally available via the POS file format
-        self.xyz: list[float] = []
-        self.m_z: list[float] = []
+        self.xyz = np.empty((0, 3), np.float32)
+        self.m_z = np.empty((0,), np.float32)
+        self.nrm_composition: list = []
 
         # synthesizing realistic datasets for atom probe tomography
         # would require a physical model of the field evaporation process,
@@ -95,100 +345,28 @@ class ApmCreateExampleData:
         #     no tails in peaks are modelled as this depends on the pulser, physics
         #     and is in fact not yet well understood physically for general materials
 
-    def create_reconstructed_positions(self):
-        """Create aggregate of specifically oriented
-
-        crystallographic unit cells and take the positions
-        in this lattice to carve out a portion of the
-        point cloud representing the reconstruction positions."""
-        # https://wiki.fysik.dtu.dk/ase/ase/lattice.html#module-ase.lattice
-        # ase length units in angstroem!
-        # https://wiki.fysik.dtu.dk/ase/ase/units.html#units
-
-        # assumptions:
-        # identity orientation, no periodic boundary conditions
-        raise NotImplementedError()
-        logger.debug(f"Using the following version of ase {ase.__version__}")
-        xyz = np.asarray(
-            FaceCenteredCubic(
-                directions=CRYSTAL_ORIENTATION,
-                size=RECON_SIZE,
-                symbol="Cu",
-                latticeconstant=RECON_ATOM_SPACING,
-                pbc=(0, 0, 0),
-            ).get_positions(),
-            np.float32,
-        )
-        # Cu will be ignored, only the lattice with positions is relevant
-        centre_of_mass = np.asarray(
-            [np.mean(xyz[:, 0]), np.mean(xyz[:, 1]), np.mean(xyz[:, 2])], np.float32
-        )
-        # logger.debug("Centre of mass of ASE lattice is (with coordinates in angstroem)")
-        # logger.debug(centre_of_mass)
-        xyz = xyz - centre_of_mass
-        centre_of_mass = np.asarray(
-            [np.mean(xyz[:, 0]), np.mean(xyz[:, 1]), np.mean(xyz[:, 2])], np.float32
-        )
-        # logger.debug("Updated centre of mass")
-        # logger.debug(centre_of_mass)
-        # axis_aligned_bbox = np.asarray([np.min(xyz[:, 0]), np.max(xyz[:, 0]),
-        #                                 np.min(xyz[:, 1]), np.max(xyz[:, 1]),
-        #                                 np.min(xyz[:, 2]), np.max(xyz[:, 2])])
-        # displace origin
-        origin = centre_of_mass
-        # logger.debug("Building a cylinder of radius " + str(RECON_RADIUS * 0.1) + " nm"
-        #       + " and height " + str(RECON_HEIGHT * 0.1) + " nm")
-        mask = None
-        mask = xyz[:, 2] <= (origin[2] + 0.5 * RECON_HEIGHT)
-        mask &= xyz[:, 2] >= (origin[2] - 0.5 * RECON_HEIGHT)
-        mask &= (
-            (xyz[:, 0] - origin[0]) ** 2 + (xyz[:, 1] - origin[1]) ** 2
-        ) <= RECON_RADIUS**2
-        self.xyz = xyz[mask]
-        shift = [0.0, 0.0, 0.5 * RECON_HEIGHT]
-        for idx in np.arange(0, 3):
-            self.xyz[:, idx] += shift[idx]
-        self.xyz *= 0.1  # from angstroem to nm
-        logger.debug("Created a geometry for a reconstructed dataset, shape is")
-        logger.debug(np.shape(self.xyz))
-        # self.aabb3d = np.asarray([np.min(self.xyz[:, 0]), np.max(self.xyz[:, 0]),
-        #                           np.min(self.xyz[:, 1]), np.max(self.xyz[:, 1]),
-        #                           np.min(self.xyz[:, 2]), np.max(self.xyz[:, 2])])
-
     def place_atoms_from_periodic_table(self):
         """Sample elements from the periodic table
 
         create (hypothetical) charged molecular ions from them
         and evaluate their mass-to-charge-state ratio to be used
         as values in the example dataset."""
-        raise NotImplementedError()
-
         # uniform random model for how many different ions
         # !! warning: for real world datasets this depends on real specimen composition
-        self.n_components = int(np.random.uniform(low=1, high=MAX_COMPONENTS))
-        # logger.debug("Number of ions in the composition is " + str(self.n_components))
+        self.n_components = int(self.rng.integers(low=1, high=MAX_COMPONENTS + 1))
 
         # power law model for multiplicity of molecular ions
         # !! warning: for real world datasets depends on evaporation physics
-        self.n_ivec = np.asarray(
-            np.linspace(1, MAX_ATOMS, num=MAX_ATOMS, endpoint=True), np.float64
-        )
-        accept_reject = MULTIPLES_FACTOR**self.n_ivec
-        accept_reject = np.cumsum(accept_reject) / np.sum(accept_reject)
-        unifrnd = np.random.uniform(low=0.0, high=1.0, size=(self.n_components,))
-        self.multiplicity = np.ones((self.n_components,))
-        for idx in np.arange(0, len(accept_reject) - 1):
-            mask = unifrnd[:] >= accept_reject[idx]
-            mask &= unifrnd[:] < accept_reject[idx + 1]
-            self.multiplicity[mask] = self.n_ivec[idx]
-        self.multiplicity = np.asarray(self.multiplicity, np.uint32)
+        n_ivec = np.arange(1, MAX_ATOMS + 1)
+        self.multiplicity = n_ivec[
+            sample_categories(self.rng, MULTIPLES_FACTOR**n_ivec, self.n_components)
+        ]
 
         # uniform model for distribution of charge states
         # !! warning: for real world datasets actual ion charge depends
         # on (evaporation) physics, very complicated in fact a topic of current research
-        self.charge_state = np.asarray(
-            np.random.uniform(low=1, high=MAX_CHARGE_STATE, size=(self.n_components,)),
-            np.uint32,
+        self.charge_state = self.rng.integers(
+            low=1, high=MAX_CHARGE_STATE + 1, size=self.n_components
         )
 
         # compose for each component randomly sampled hypothetical molecular ions
@@ -197,80 +375,74 @@ class ApmCreateExampleData:
         # !! often research in many groups is strongly focused on specific
         # materials and abundance, toxic nature of some elements forbids
         # experiments with these, like Plutonium or, also reason for synthetic data
-        value_to_pse_symbol_lookup = {}
-        for key, val in atomic_numbers.items():
-            if key != "X":
-                value_to_pse_symbol_lookup[val] = key
-
         composition = []  # list of tuples, one for each composition
         for idx in np.arange(0, self.n_components):
-            nuclide_hash = []
-            mass_sum = 0.0
-            # sample atoms for building the ion
-            sampled_elements = np.asarray(
-                np.random.uniform(
-                    low=1, high=MAX_ATOMIC_NUMBER, size=(self.multiplicity[idx],)
-                ),
-                np.uint32,
+            sampled_elements = self.rng.integers(
+                low=1, high=MAX_ATOMIC_NUMBER + 1, size=self.multiplicity[idx]
             )
-
-            for val in sampled_elements:
-                symbol = value_to_pse_symbol_lookup[val]
-                nuclide_hash.append(symbol)
-                mass_sum += atomic_masses[atomic_numbers[symbol]]
-
+            nuclide_hash = [chemical_symbols[val] for val in sampled_elements]
+            mass_sum = float(np.sum(atomic_masses[sampled_elements]))
             composition.append(
                 (
                     nuclide_hash,
-                    self.charge_state[idx],
+                    int(self.charge_state[idx]),
                     mass_sum / self.charge_state[idx],
-                    np.float64(np.random.uniform(low=1, high=100)),
+                    self.rng.uniform(low=1.0, high=100.0),
                 )
             )
 
-        weighting_factor_sum = 0.0
-        for idx in np.arange(0, self.n_components):
-            weighting_factor_sum += composition[idx][3]
-
         # normalize all compositions
-        # (weighting_factor_sum)
-        self.nrm_composition = []
-        # logger.debug(composition)
-        for idx in np.arange(0, self.n_components):
-            self.nrm_composition.append(
-                (
-                    composition[idx][0],
-                    composition[idx][1],
-                    composition[idx][2],
-                    composition[idx][3] / weighting_factor_sum,
-                )
-            )
-
+        weighting_factor_sum = np.sum([ion[3] for ion in composition])
+        self.nrm_composition = [
+            (ion[0], ion[1], ion[2], ion[3] / weighting_factor_sum)
+            for ion in composition
+        ]
         self.nrm_composition.sort(key=lambda a: a[3])  # sort asc. for composition
-        accept_reject = [0.0]
-        for idx in self.nrm_composition:
-            accept_reject.append(idx[3])
-        accept_reject = np.cumsum(accept_reject)
-        assert self.xyz != [], (
-            "self.xyz must not be an empty dataset, create a geometry first"
-        )
-        # logger.debug(f"Accept/reject sampling m/q values for {np.shape(self.xyz)[0])} ions")
-
-        unifrnd = np.random.uniform(low=0.0, high=1.0, size=(np.shape(self.xyz)[0],))
-        self.m_z = np.empty((np.shape(self.xyz)[0],))
-        self.m_z[:] = np.nan
-        for idx in np.arange(0, len(accept_reject) - 1):
-            mask = unifrnd[:] >= accept_reject[idx]
-            mask &= unifrnd[:] < accept_reject[idx + 1]
-            self.m_z[mask] = self.nrm_composition[idx][2]
-            # logger.debug(self.nrm_composition[idx])
-            # logger.debug(np.sum(mask) / np.shape(self.xyz)[0])
-        # logger.debug(np.shape(self.m_z))
-        # assert np.sum(self.m_z == np.nan) == 0, "Not all m/q values defined"
+
+    def iter_ions(self) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+        """Positions and mass-to-charge-state ratio values in chunks of ions."""
+        if len(self.nrm_composition) == 0:
+            self.place_atoms_from_periodic_table()
+        # each pass yields the same ions
+        rng = np.random.default_rng(seed=(self.synthesis_id, ION_TYPE_STREAM))
+        weights = [ion[3] for ion in self.nrm_composition]
+        m_z_lookup = np.asarray([ion[2] for ion in self.nrm_composition], np.float32)
+        for xyz in iter_cylinder_lattice(self.n_ions, self.chunk_size):
+            yield (xyz, m_z_lookup[sample_categories(rng, weights, len(xyz))])
+
+    def create(self):
+        """Create positions and mass-to-charge-state ratio values of all ions."""
+        chunks = list(self.iter_ions())
+        self.xyz = np.concatenate([chunk[0] for chunk in chunks])
+        self.m_z = np.concatenate([chunk[1] for chunk in chunks])
+        logger.debug(f"Created a reconstructed dataset of shape {np.shape(self.xyz)}")
+
+    def write(self, file_path: str):
+        """Write the dataset in the file format of the suffix of file_path."""
+        if len(self.nrm_composition) == 0:
+            self.place_atoms_from_periodic_table()
+        suffix = os.path.splitext(file_path)[1].lower()
+        if suffix == ".pos":
+            write_pos(file_path, self.iter_ions())
+        elif suffix == ".epos":
+            write_epos(
+                file_path,
+                self.iter_ions(),
+                self.n_ions,
+                np.random.default_rng(seed=(self.synthesis_id, PULSE_STREAM)),
+            )
+        elif suffix == ".apt":
+            write_apt(file_path, self.iter_ions(), self.n_ions)
+        elif suffix == ".rrng":
+            write_rrng(file_path, self.nrm_composition)
+        elif suffix == ".rng":
+            write_rng(file_path, self.nrm_composition)
+        else:
+            raise ValueError(f"Writing {suffix} files is not supported.")
+        logger.info(f"Wrote {self.n_ions} synthetic ions to {file_path}")
 
     def composition_to_ranging_definitions(self, template: dict) -> dict:
         """Create ranging definitions based on composition."""
-        raise NotImplementedError()
         assert len(self.nrm_composition) > 0, "Composition is not defined"
         trg = f"/ENTRY[entry{self.entry_id}]/atom_probeID[atom_probe]/ranging/"
         template[f"{trg}programID[program1]/program"] = "pynxtools-apm"
@@ -291,10 +463,12 @@ class ApmCreateExampleData:
             template[f"{path}nuclide_hash"] = np.asarray(ivec, np.uint16)
             template[f"{path}charge_state"] = np.int8(tpl[1])
             template[f"{path}mass_to_charge_range"] = np.reshape(
-                np.asarray([tpl[2], tpl[2] + MQ_EPSILON], np.float32), (1, 2)
+                np.asarray(
+                    [tpl[2] - RANGE_HALF_WIDTH, tpl[2] + RANGE_HALF_WIDTH], np.float32
+                ),
+                (1, 2),
             )
             template[f"{path}mass_to_charge_range/@units"] = "Da"
-            nuclide_list = np.zeros((MAX_NUMBER_OF_ATOMS_PER_ION, 2), np.uint16)
             nuclide_list = nuclide_hash_to_nuclide_list(ivec)
             template[f"{path}nuclide_list"] = np.asarray(nuclide_list, np.uint16)
             template[f"{path}name"] = nuclide_hash_to_human_readable_name(ivec, tpl[1])
@@ -308,7 +482,6 @@ class ApmCreateExampleData:
 
     def emulate_entry(self, template: dict) -> dict:
         """Copy data in entry section."""
-        raise NotImplementedError()
         # check if required fields exists and are valid
         # logger.debug("Parsing entry...")
         trg = f"/ENTRY[entry{self.entry_id}]/"
@@ -325,23 +498,22 @@ class ApmCreateExampleData:
               """
         template[f"{trg}experiment_description"] = msg
         identifier_experiment = str(
-            f"R{np.random.choice(100, 1)[0]}-{np.random.choice(100000, 1)[0]}"
+            f"R{self.rng.choice(100, 1)[0]}-{self.rng.choice(100000, 1)[0]}"
         )
         # template[f"{trg}identifier_experiment"] = identifier_experiment
         template[f"{trg}run_number"] = identifier_experiment.split("-")[1]
         template[f"{trg}operation_mode"] = str(
-            np.random.choice(["apt", "fim", "apt_fim"], 1)[0]
+            self.rng.choice(["apt", "fim", "apt_fim"], 1)[0]
         )
         return template
 
     def emulate_user(self, template: dict) -> dict:
         """Copy data in user section."""
-        raise NotImplementedError()
         # check if required fields exists and are valid
         # logger.debug("Parsing user...")
         prefix = f"/ENTRY[entry{self.entry_id}]/"
         user_names = np.unique(
-            np.random.choice(
+            self.rng.choice(
                 [
                     "Sherjeel",
                     "MarkusK",
@@ -364,7 +536,7 @@ class ApmCreateExampleData:
                     "Christoph",
                     "Claudia",
                 ],
-                1 + np.random.choice(MAX_USERS, 1),
+                1 + self.rng.choice(MAX_USERS, 1),
             )
         )
         user_id = 1
@@ -376,7 +548,6 @@ class ApmCreateExampleData:
 
     def emulate_specimen(self, template: dict) -> dict:
         """Copy data in specimen section."""
-        raise NotImplementedError()
         # check if required fields exists and are valid
         # logger.debug("Parsing specimen...")
         trg = f"/ENTRY[entry{self.entry_id}]/specimen/"
@@ -391,9 +562,7 @@ class ApmCreateExampleData:
         logger.debug(f"Unique elements are: {list(unique_elements)}")
         template[f"{trg}atom_types"] = ", ".join(list(unique_elements))
 
-        specimen_name = str(
-            f"Mocked atom probe specimen {np.random.choice(1000, 1)[0]}"
-        )
+        specimen_name = str(f"Mocked atom probe specimen {self.rng.choice(1000, 1)[0]}")
         template[f"{trg}name"] = specimen_name
         template[f"{trg}sample_history"] = "n/a"
         template[f"{trg}preparation_date"] = (
@@ -407,38 +576,33 @@ class ApmCreateExampleData:
 
     def emulate_control_software(self, template: dict) -> dict:
         """Copy data in control software section."""
-        raise NotImplementedError()
         # logger.debug("Parsing control software...")
-        # trg = f"/ENTRY[entry{self.entry_id}]/atom_probeID[atom_probe]/control_software/"
-        # template[f"{trg}programID[program1]/program"] = "IVAS"
-        # template[f"{trg}programID[program1]/program/@version"] = str(
-        #    f"3.{np.random.choice(9, 1)[0]}.{np.random.choice(9, 1)[0]}"
-        # )
+        trg = f"/ENTRY[entry{self.entry_id}]/atom_probeID[atom_probe]/control_software/"
+        template[f"{trg}programID[program1]/program"] = "IVAS"
+        template[f"{trg}programID[program1]/program/@version"] = str(
+            f"3.{self.rng.choice(9, 1)[0]}.{self.rng.choice(9, 1)[0]}"
+        )
         return template
 
     def emulate_instrument_header(self, template: dict) -> dict:
         """Copy data in instrument_header section."""
-        raise NotImplementedError()
         # check if required fields exists and are valid
         # logger.debug("Parsing instrument header...")
         trg = f"/ENTRY[entry{self.entry_id}]/atom_probeID[atom_probe]/measurement/instrument/"
-        template[f"{trg}name"] = str(f"test instrument {np.random.choice(100, 1)[0]}")
-        template[f"{trg}flight_path"] = np.float64(
-            np.random.normal(loc=1.0, scale=0.05)
-        )
+        template[f"{trg}name"] = str(f"test instrument {self.rng.choice(100, 1)[0]}")
+        template[f"{trg}flight_path"] = np.float64(self.rng.normal(loc=1.0, scale=0.05))
         template[f"{trg}flight_path/@units"] = "m"
         return template
 
     def emulate_fabrication(self, template: dict) -> dict:
         """Copy data in fabrication section."""
-        raise NotImplementedError()
         # logger.debug("Parsing fabrication...")
         trg = f"/ENTRY[entry{self.entry_id}]/atom_probeID[atom_probe]/measurement/instrument/fabrication/"
         template[f"{trg}vendor"] = str(
-            np.random.choice(["AMETEK/Cameca", "customized"], 1)[0]
+            self.rng.choice(["AMETEK/Cameca", "customized"], 1)[0]
         )
         template[f"{trg}model"] = str(
-            np.random.choice(
+            self.rng.choice(
                 [
                     "LEAP3000",
                     "LEAP4000",
@@ -457,38 +621,34 @@ class ApmCreateExampleData:
 
     def emulate_analysis_chamber(self, template: dict) -> dict:
         """Copy data in analysis_chamber section."""
-        raise NotImplementedError()
         # logger.debug("Parsing analysis chamber...")
         trg = f"/ENTRY[entry{self.entry_id}]/measurement/eventID[eventid]/instrument/analysis_chamber/pressure_sensor/"
         template[f"{trg}measurement"] = "pressure"
         template[f"{trg}value"] = np.float64(
-            np.random.normal(loc=1.0e-10, scale=0.2e-11)
+            self.rng.normal(loc=1.0e-10, scale=0.2e-11)
         )
         template[f"{trg}value/@units"] = "torr"
         return template
 
     def emulate_reflectron(self, template: dict) -> dict:
         """Copy data in reflectron section."""
-        raise NotImplementedError()
         # logger.debug("Parsing reflectron...")
         trg = f"/ENTRY[entry{self.entry_id}]/measurement/instrument/reflectron/"
-        template[f"{trg}applied"] = bool(np.random.choice([0, 1], 1)[0])
+        template[f"{trg}applied"] = bool(self.rng.choice([0, 1], 1)[0])
         return template
 
     def emulate_local_electrode(self, template: dict) -> dict:
         """Copy data in local_electrode section."""
-        raise NotImplementedError()
         # logger.debug("Parsing local electrode...")
         trg = f"/ENTRY[entry{self.entry_id}]/measurement/instrument/local_electrode/"
-        template[f"{trg}name"] = str(f"electrode {np.random.choice(1000, 1)[0]}")
+        template[f"{trg}name"] = str(f"electrode {self.rng.choice(1000, 1)[0]}")
         return template
 
     def emulate_detector(self, template: dict) -> dict:
         """Copy data in ion_detector section."""
-        raise NotImplementedError()
         # logger.debug("Parsing detector...")
         trg = f"/ENTRY[entry{self.entry_id}]//measurement/instrument/ion_detector/"
-        detector_model_type = str(np.random.choice(["cameca", "mcp", "custom"], 1)[0])
+        detector_model_type = str(self.rng.choice(["cameca", "mcp", "custom"], 1)[0])
         # template[f"{trg}type"] = detector_model_type
         template[f"{trg}fabrication/vendor"] = detector_model_type
         template[f"{trg}fabrication/model"] = detector_model_type
@@ -499,62 +659,60 @@ class ApmCreateExampleData:
 
     def emulate_stage_lab(self, template: dict) -> dict:
         """Copy data in stage lab section."""
-        raise NotImplementedError()
         # logger.debug("Parsing stage lab...")
         trg = f"/ENTRY[entry{self.entry_id}]/measurement/eventID[event1]/instrument/stage/temperatur_sensor/"
         template[f"{trg}measurement"] = "temperature"
-        template[f"{trg}value"] = np.float64(10 + np.random.choice(50, 1)[0])
+        template[f"{trg}value"] = np.float64(10 + self.rng.choice(50, 1)[0])
         template[f"{trg}value/@units"] = "K"
         return template
 
     def emulate_specimen_monitoring(self, template: dict) -> dict:
         """Copy data in specimen_monitoring section."""
-        raise NotImplementedError()
         # logger.debug("Parsing specimen monitoring...")
         trg = f"/ENTRY[entry{self.entry_id}]/measurement/eventID[eventid]/instrument/control/"
-        eta = np.min((np.random.normal(loc=0.6, scale=0.1), 1.0))
+        eta = np.min((self.rng.normal(loc=0.6, scale=0.1), 1.0))
         template[f"{trg}target_detection_rate"] = np.float64(eta)
         trg = f"/ENTRY[entry{self.entry_id}]/specimen/"
-        template[f"{trg}initial_radius"] = np.float64(RECON_RADIUS * 0.1)
+        template[f"{trg}initial_radius"] = np.float64(
+            np.max(np.hypot(self.xyz[:, 0], self.xyz[:, 1]))
+        )
         template[f"{trg}initial_radius/@units"] = "nm"
-        template[f"{trg}shank_angle"] = np.float64(0.0)  # = np.random.choice(10, 1)[0]
+        template[f"{trg}shank_angle"] = np.float64(0.0)  # = self.rng.choice(10, 1)[0]
         template[f"{trg}shank_angle/@units"] = "degree"
         return template
 
     def emulate_pulser(self, template: dict) -> dict:
         """Copy data in pulser section."""
-        raise NotImplementedError()
         # logger.debug("Parsing pulser...")
         trg = f"/ENTRY[entry{self.entry_id}]/measurement/eventID[eventid]/instrument/pulser/"
-        pulse_mode = np.random.choice(["laser", "voltage", "laser_and_voltage"], 1)[0]
+        pulse_mode = self.rng.choice(["laser", "voltage", "laser_and_voltage"], 1)[0]
         template[f"{trg}pulse_mode"] = pulse_mode
         template[f"{trg}pulse_fraction"] = np.float64(
-            np.random.normal(loc=0.1, scale=0.02)
+            self.rng.normal(loc=0.1, scale=0.02)
         )
         template[f"{trg}pulse_frequency"] = np.float64(
-            np.random.normal(loc=250, scale=10)
+            self.rng.normal(loc=250, scale=10)
         )
         template[f"{trg}pulse_frequency/@units"] = "kHz"
         if pulse_mode != "voltage":
             trg = f"/ENTRY[entry{self.entry_id}]/measurement/eventID[eventid]/instrument/pulser/sourceID[source1]/"
             template[f"{trg}name"] = "laser"
             template[f"{trg}wavelength"] = np.float64(
-                (30 + np.random.choice(30, 1)) * 1.0e-8
+                (30 + self.rng.choice(30, 1)[0]) * 1.0e-8
             )
             template[f"{trg}wavelength/@units"] = "m"
             template[f"{trg}pulse_energy"] = np.float64(
-                np.random.normal(loc=1.2e-11, scale=0.2e-12)
+                self.rng.normal(loc=1.2e-11, scale=0.2e-12)
             )
             template[f"{trg}pulse_energy/@units"] = "J"
             template[f"{trg}power"] = np.float64(
-                np.random.normal(loc=2.0e-8, scale=0.2e-9)
+                self.rng.normal(loc=2.0e-8, scale=0.2e-9)
             )
             template[f"{trg}power/@units"] = "W"
         return template
 
     def emulate_reconstruction(self, template: dict) -> dict:
         """Copy data in reconstruction section."""
-        raise NotImplementedError()
         # logger.debug("Parsing reconstruction...")
         trg = f"/ENTRY[entry{self.entry_id}]/atom_probeID[atom_probe]/reconstruction/"
         src = f"/ENTRY[entry{self.entry_id}]/atom_probeID[atom_probe]/control_software/"
@@ -565,7 +723,7 @@ class ApmCreateExampleData:
             f"{src}programID[program1]/program/@version"
         ]
         template[f"{trg}config/protocol"] = str(
-            np.random.choice(["bas", "geiser", "gault", "cameca", "other"], 1)[0]
+            self.rng.choice(["bas", "geiser", "gault", "cameca", "other"], 1)[0]
         )
         template[f"{trg}config/comment"] = "n/a"
         template[f"{trg}config/crystallographic_calibration"] = "n/a"
@@ -573,7 +731,6 @@ class ApmCreateExampleData:
 
     def emulate_ranging(self, template: dict) -> dict:
         """Copy data in ranging section."""
-        raise NotImplementedError()
         # logger.debug("Parsing ranging...")
         trg = f"/ENTRY[entry{self.entry_id}]/atom_probeID[atom_probe]/ranging/"
         src = f"/ENTRY[entry{self.entry_id}]/atom_probeID[atom_probe]/control_software/"
@@ -587,7 +744,6 @@ class ApmCreateExampleData:
 
     def emulate_random_input_from_eln(self, template: dict) -> dict:
         """Emulate random input as could come from an ELN."""
-        raise NotImplementedError()
         self.emulate_entry(template)
         self.emulate_user(template)
         self.emulate_specimen(template)
@@ -614,16 +770,11 @@ class ApmCreateExampleData:
 
     def synthesize(self, template: dict) -> dict:
         """Hand-over instantiated dataset to dataconverter template."""
-        raise NotImplementedError()
         # heavy data, synthetic/mocked dataset
         for entry_id in np.arange(1, self.n_entries + 1):
-            self.entry_id = entry_id
+            self.entry_id = int(entry_id)
             logger.debug(f"Generating entry {self.entry_id}...")
-
-            self.xyz = []
-            self.m_z = []
-            self.create_reconstructed_positions()
-            self.place_atoms_from_periodic_table()
+            self.create()
             self.composition_to_ranging_definitions(template)
 
             # metadata
@@ -632,24 +783,15 @@ class ApmCreateExampleData:
             # heavy numerical data, here the synthesized "measurement" data
             prefix = f"/ENTRY[entry{self.entry_id}]/atom_probeID[atom_probe]/"
             trg = f"{prefix}reconstruction/"
-            template[f"{trg}reconstructed_positions"] = {
-                "compress": np.asarray(self.xyz, np.float32),
-                "strength": DEFAULT_COMPRESSION_LEVEL,
-                "chunks": prioritized_axes_heuristic(
-                    np.asarray(self.xyz, np.float32), (0, 1)
-                ),
-            }
+            template[f"{trg}reconstructed_positions"] = stage_compressed(
+                self.xyz, "positions", (0, 1)
+            )
             template[f"{trg}reconstructed_positions/@units"] = "nm"
 
             trg = f"{prefix}mass_to_charge_conversion/"
-            template[f"{trg}mass_to_charge"] = {
-                "compress": np.asarray(self.m_z, np.float32),
-                "filter": DEFAULT_COMPRESSION_FILTER,
-                "strength": DEFAULT_COMPRESSION_LEVEL,
-                "chunks": prioritized_axes_heuristic(
-                    np.asarray(self.m_z, np.float32), (0,)
-                ),
-            }
+            template[f"{trg}mass_to_charge"] = stage_compressed(
+                self.m_z, "mass_to_charge", (0,)
+            )
             template[f"{trg}mass_to_charge/@units"] = "Da"
 
         return template
@@ -20,14 +20,17 @@
 import hashlib
 
 DEFAULT_CHECKSUM_ALGORITHM = "sha256"
+# hashlib releases the GIL while hashing a block, large blocks let other threads
+# parse while a file is hashed instead of contending for the GIL every 4 KiB
+CHECKSUM_BLOCK_SIZE = 1 << 20  # byte
 
 
 def get_sha256_of_file_content(file_hdl) -> str:
     """Compute a hash of given file, here SHA256."""
     file_hdl.seek(0)
-    # Read and update hash string value in blocks of 4K
+    # Read and update hash string value in blocks of CHECKSUM_BLOCK_SIZE
     sha256_hash = hashlib.sha256()
-    for byte_block in iter(lambda: file_hdl.read(4096), b""):
+    for byte_block in iter(lambda: file_hdl.read(CHECKSUM_BLOCK_SIZE), b""):
         sha256_hash.update(byte_block)
     return str(sha256_hash.hexdigest())
 
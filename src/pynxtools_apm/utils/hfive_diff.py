@@ -0,0 +1,178 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Structural diff of a NeXus/HDF5 file against a reference file or hash artifact."""
+
+# the comparison is staged from cheap to expensive, first the node sets are compared,
+# then the structural signature (kind, dtype, shape) of the nodes in both sets,
+# only the nodes that still match are hashed, the reference can either be
+# a YAML artifact created with HdfFiveBaseParser.store_hashes or another HDF5 file
+
+import h5py
+import yaml
+
+from pynxtools_apm.parsers.hfive_base import HdfFiveBaseParser, get_sha256_of_dataset
+from pynxtools_apm.utils.custom_logging import logger
+from pynxtools_apm.utils.get_checksum import get_sha256_of_bytes_object
+
+DIFF_CATEGORIES = ("missing", "unexpected", "structure", "content")
+
+
+def split_hash_value(value: str) -> tuple[str, str]:
+    """Split a store_hashes value into its structural signature and its checksum."""
+    if value == "grp":
+        return ("grp", "")
+    signature, checksum = value.rsplit("__", 1)
+    return (signature, checksum)
+
+
+class HdfFiveNodeCatalog:
+    """Structural signatures of all nodes of an HDF5 file with hashing on demand."""
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.parser = HdfFiveBaseParser(
+            file_path=file_path, hashing=False, malformed=False
+        )
+        self.parser.get_content()
+        self.signatures: dict[str, str] = {}
+        with h5py.File(self.file_path, "r") as h5r:
+            for key in self.parser.groups:
+                self.signatures[key] = "grp"
+            for key, ifo in self.parser.datasets.items():
+                if ifo[0] == "IS_FIELD_IN_COMPOUND_DATASET":
+                    dst_path, field_name = key.rsplit("/#", 1)
+                    dtype = h5r[dst_path].dtype.fields[field_name][0]
+                    self.signatures[key] = f"dst__{dtype}"
+                elif ifo[0] == "IS_COMPOUND_DATASET":
+                    self.signatures[key] = f"dst__{h5r[key].dtype}"
+                else:
+                    h5obj = h5r[key]
+                    self.signatures[key] = (
+                        f"dst__{h5obj.ndim}__{h5obj.shape}__{h5obj.dtype.name}"
+                    )
+            for key, ifo in self.parser.attributes.items():
+                val = ifo[4]
+                if isinstance(val, str):
+                    self.signatures[key] = "att__str"
+                else:
+                    self.signatures[key] = (
+                        f"att__{val.ndim}__{val.shape}__{val.dtype.name}"
+                    )
+
+    def get_checksums(self, keys) -> dict[str, str]:
+        """Compute the checksum of the payload of each node in keys."""
+        checksums: dict[str, str] = {}
+        with h5py.File(self.file_path, "r") as h5r:
+            for key in keys:
+                if key in self.parser.groups:
+                    checksums[key] = ""
+                elif key in self.parser.datasets:
+                    if self.parser.datasets[key][0] == "IS_FIELD_IN_COMPOUND_DATASET":
+                        dst_path, field_name = key.rsplit("/#", 1)
+                        checksums[key] = get_sha256_of_dataset(
+                            h5r[dst_path], field_name
+                        )
+                    else:
+                        checksums[key] = get_sha256_of_dataset(h5r[key])
+                else:
+                    val = self.parser.attributes[key][4]
+                    checksums[key] = get_sha256_of_bytes_object(
+                        val.encode("utf-8") if isinstance(val, str) else bytes(val)
+                    )
+        return checksums
+
+
+class HdfFiveDiff:
+    """Categorized delta between a test HDF5 file and a reference."""
+
+    def __init__(
+        self,
+        test_file_path: str,
+        reference_file_path: str,
+        blacklist_by_key=(),
+        blacklist_by_suffix=(),
+    ):
+        self.test_file_path = test_file_path
+        self.reference_file_path = reference_file_path
+        self.blacklist_by_key = set(blacklist_by_key)
+        self.blacklist_by_suffix = tuple(blacklist_by_suffix)
+        self.delta: dict = {category: {} for category in DIFF_CATEGORIES}
+
+    def is_blacklisted(self, key: str) -> bool:
+        return key in self.blacklist_by_key or key.endswith(self.blacklist_by_suffix)
+
+    def compare(self) -> dict:
+        """Compare node sets, then signatures, then checksums of the remaining nodes."""
+        test = HdfFiveNodeCatalog(self.test_file_path)
+        ref_checksums: dict[str, str] = {}
+        if self.reference_file_path.endswith((".yaml", ".yml")):
+            with open(self.reference_file_path) as fp:
+                ref_artifact = yaml.safe_load(fp)
+            ref_signatures: dict[str, str] = {}
+            for key, value in ref_artifact.items():
+                ref_signatures[key], ref_checksums[key] = split_hash_value(value)
+            ref = None
+        else:
+            ref = HdfFiveNodeCatalog(self.reference_file_path)
+            ref_signatures = ref.signatures
+
+        test_keys = {key for key in test.signatures if not self.is_blacklisted(key)}
+        ref_keys = {key for key in ref_signatures if not self.is_blacklisted(key)}
+        self.delta = {category: {} for category in DIFF_CATEGORIES}
+        for key in sorted(ref_keys - test_keys):
+            self.delta["missing"][key] = ref_signatures[key]
+        for key in sorted(test_keys - ref_keys):
+            self.delta["unexpected"][key] = test.signatures[key]
+        matching: list[str] = []
+        for key in sorted(ref_keys & test_keys):
+            if ref_signatures[key] == test.signatures[key]:
+                if ref_signatures[key] != "grp":
+                    matching.append(key)
+            else:
+                self.delta["structure"][key] = {
+                    "reference": ref_signatures[key],
+                    "test": test.signatures[key],
+                }
+
+        test_checksums = test.get_checksums(matching)
+        if ref is not None:
+            ref_checksums = ref.get_checksums(matching)
+        for key in matching:
+            if ref_checksums[key] != test_checksums[key]:
+                self.delta["content"][key] = {
+                    "reference": ref_checksums[key],
+                    "test": test_checksums[key],
+                }
+        return self.delta
+
+    def is_equal(self) -> bool:
+        return all(len(self.delta[category]) == 0 for category in DIFF_CATEGORIES)
+
+    def report(self):
+        logger.info(f"Diff of {self.test_file_path} against {self.reference_file_path}")
+        for category in DIFF_CATEGORIES:
+            logger.info(f"{category}: {len(self.delta[category])}")
+            for key, ifo in self.delta[category].items():
+                logger.info(f"{category}, {key}, {ifo}")
+
+    def store_delta(self, **kwargs):
+        """Generate yaml file with the categorized delta."""
+        with open(
+            kwargs.get("file_path", f"{self.test_file_path}.diff.yaml"), "w"
+        ) as fp:
+            yaml.dump(self.delta, fp, default_flow_style=False, sort_keys=True)
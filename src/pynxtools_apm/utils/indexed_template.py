@@ -0,0 +1,205 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Template wrapper which indexes its keys by path segments."""
+
+# the pynxtools template is a flat dict, queries like all keys below a group or
+# all keys ending with a specific concept therefore scan every key,
+# IndexedTemplate forwards all reads and writes to the wrapped template and in
+# addition keeps two tries of path segments, one of the segments in order to
+# answer prefix queries and one of the segments in reverse order to answer suffix
+# queries, both with a cost proportional to the number of matching keys
+# prefix and suffix queries match whole segments only, i.e. the prefix
+# /ENTRY[entry1]/measurement matches /ENTRY[entry1]/measurement/... but not
+# /ENTRY[entry1]/measurement_old
+
+from collections.abc import MutableMapping
+
+import numpy as np
+
+
+def get_payload_nbytes(value) -> int:
+    """Estimate how many bytes a template value contributes to the NeXus file."""
+    if isinstance(value, dict):
+        return get_payload_nbytes(value.get("compress"))
+    if isinstance(value, np.ndarray | np.generic):
+        return int(value.nbytes)
+    if isinstance(value, str):
+        return len(value)
+    if value is None:
+        return 0
+    return 8
+
+
+def split_path(path: str) -> list[str]:
+    """Split a template path into segments, trailing slashes are ignored."""
+    return path.rstrip("/").split("/")
+
+
+class PathTrieNode:
+    """Node of a trie of path segments with aggregated statistics of its subtree."""
+
+    def __init__(self):
+        self.children: dict[str, PathTrieNode] = {}
+        self.key: str | None = None
+        self.n_keys = 0
+        self.n_bytes = 0
+
+    def find(self, segments: list[str]):
+        node = self
+        for segment in segments:
+            node = node.children.get(segment)
+            if node is None:
+                return None
+        return node
+
+    def insert(self, segments: list[str], key: str, n_bytes: int):
+        node = self
+        node.n_keys += 1
+        node.n_bytes += n_bytes
+        for segment in segments:
+            if segment not in node.children:
+                node.children[segment] = PathTrieNode()
+            node = node.children[segment]
+            node.n_keys += 1
+            node.n_bytes += n_bytes
+        node.key = key
+
+    def remove(self, segments: list[str], n_bytes: int):
+        """Remove the key at segments, prune nodes without keys."""
+        node = self
+        node.n_keys -= 1
+        node.n_bytes -= n_bytes
+        for segment in segments:
+            child = node.children[segment]
+            child.n_keys -= 1
+            child.n_bytes -= n_bytes
+            if child.n_keys == 0:
+                del node.children[segment]
+                return
+            node = child
+        node.key = None
+
+    def collect(self) -> list[str]:
+        """Get the keys of all nodes of the subtree."""
+        keys: list[str] = []
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if node.key is not None:
+                keys.append(node.key)
+            stack.extend(reversed(node.children.values()))
+        return keys
+
+
+class IndexedTemplate(MutableMapping):
+    """Drop-in wrapper for a template with prefix and suffix queries.
+
+    All reads and writes are forwarded to the wrapped template, the wrapper
+    only observes which keys are instantiated. Iterating over the wrapper
+    iterates over a snapshot of the keys such that keys can be deleted during
+    iteration. Values which are modified in place after their assignment are
+    not reflected in the subtree statistics.
+    """
+
+    def __init__(self, template: dict):
+        self.template = template
+        self.forward = PathTrieNode()
+        self.backward = PathTrieNode()
+        self.n_bytes: dict[str, int] = {}
+        for key in list(template):
+            self.index(key, template[key])
+
+    def index(self, key: str, value):
+        segments = split_path(key)
+        n_bytes = get_payload_nbytes(value)
+        self.forward.insert(segments, key, n_bytes)
+        self.backward.insert(segments[::-1], key, n_bytes)
+        self.n_bytes[key] = n_bytes
+
+    def unindex(self, key: str):
+        segments = split_path(key)
+        n_bytes = self.n_bytes.pop(key)
+        self.forward.remove(segments, n_bytes)
+        self.backward.remove(segments[::-1], n_bytes)
+
+    def __getitem__(self, key):
+        return self.template[key]
+
+    def __setitem__(self, key, value):
+        self.template[key] = value
+        if key in self.n_bytes:
+            self.unindex(key)
+        # the pynxtools template silently ignores None values
+        if key in self.template:
+            self.index(key, self.template[key])
+
+    def __delitem__(self, key):
+        del self.template[key]
+        if key in self.n_bytes:
+            self.unindex(key)
+
+    def __contains__(self, key):
+        return key in self.template
+
+    def __iter__(self):
+        return iter(list(self.n_bytes))
+
+    def __len__(self):
+        return len(self.n_bytes)
+
+    def get(self, key, default=None):
+        return self.template.get(key, default)
+
+    def items(self):
+        return self.template.items()
+
+    def keys(self):
+        return self.template.keys()
+
+    def clear(self):
+        self.template.clear()
+        self.forward = PathTrieNode()
+        self.backward = PathTrieNode()
+        self.n_bytes = {}
+
+    def keys_with_prefix(self, prefix: str) -> list[str]:
+        """Get all keys which are equal to or below prefix."""
+        node = self.forward.find(split_path(prefix))
+        return node.collect() if node is not None else []
+
+    def keys_with_suffix(self, suffix: str) -> list[str]:
+        """Get all keys whose last segments are the segments of suffix."""
+        segments = split_path(suffix)
+        if segments[0] == "":
+            segments = segments[1:]
+        node = self.backward.find(segments[::-1])
+        return node.collect() if node is not None else []
+
+    def subtree_stats(self, prefix: str = "/", depth: int = 1) -> dict:
+        """Count keys and payload bytes in the subtrees depth levels below prefix."""
+        node = self.forward.find(split_path(prefix))
+        if node is None:
+            return {}
+        level = [(prefix.rstrip("/"), node)]
+        for _ in range(depth):
+            level = [
+                (f"{path}/{segment}", child)
+                for path, parent in level
+                for segment, child in parent.children.items()
+            ]
+        return {path: (child.n_keys, child.n_bytes) for path, child in level}
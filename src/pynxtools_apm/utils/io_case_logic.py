@@ -18,34 +18,18 @@
 """Utility class to analyze which vendor/community files are passed to apm reader."""
 
 from pynxtools_apm.concepts.mapping_functors_pint import var_path_to_specific_path
-from pynxtools_apm.utils.get_checksum import (
-    DEFAULT_CHECKSUM_ALGORITHM,
-    get_sha256_of_file_content,
-)
+from pynxtools_apm.utils.file_pool import get_file_checksum
+from pynxtools_apm.utils.format_registry import get_file_name_suffixes
+from pynxtools_apm.utils.get_checksum import DEFAULT_CHECKSUM_ALGORITHM
 
-VALID_FILE_NAME_SUFFIX_RECON: list[str] = [
-    ".apt",
-    ".pos",
-    ".epos",
-    ".ato",
-    ".csv",
-    ".h5",
-    ".hdf5",
-    ".ops",
-    ".raw",
-    "_trimmed.txt",
-    "_xyz.txt",
-]
-VALID_FILE_NAME_SUFFIX_RANGE: list[str] = [
-    ".rrng",
-    ".rng",
-    ".env",
-    ".fig.txt",
-    "range_.h5",
-    ".analysis",
-    ".hdf5",
-    ".analysisset",
-]
+# suffixes of the formats built into pynxtools-apm, ApmUseCaseSelector additionally
+# considers formats registered via plugins, see utils/format_registry.py
+VALID_FILE_NAME_SUFFIX_RECON: list[str] = get_file_name_suffixes(
+    "reconstruction", plugins=False
+)
+VALID_FILE_NAME_SUFFIX_RANGE: list[str] = get_file_name_suffixes(
+    "ranging", plugins=False
+)
 VALID_FILE_NAME_SUFFIX_CONFIG: list[str] = [".yaml", ".yml", "db.yaml"]
 VALID_FILE_NAME_SUFFIX_CAMECA: list[str] = [
     # ".cameca",  # deprecated
@@ -80,9 +64,11 @@ class ApmUseCaseSelector:
         self.reconstruction: list[str] = []
         self.ranging: list[str] = []
         self.is_valid = False
+        self.recon_suffixes = get_file_name_suffixes("reconstruction")
+        self.range_suffixes = get_file_name_suffixes("ranging")
         self.supported_file_name_suffixes = (
-            VALID_FILE_NAME_SUFFIX_RECON
-            + VALID_FILE_NAME_SUFFIX_RANGE
+            self.recon_suffixes
+            + self.range_suffixes
             + VALID_FILE_NAME_SUFFIX_CONFIG
             + VALID_FILE_NAME_SUFFIX_CAMECA
         )
@@ -98,23 +84,17 @@ class ApmUseCaseSelector:
         for suffix in self.supported_file_name_suffixes:
             self.case[suffix] = []
         for fpath in file_paths:
-            for suffix in self.supported_file_name_suffixes:
-                if suffix not in [".h5", "range_.h5"]:
-                    if (fpath.lower().endswith(suffix)) and (
-                        fpath not in self.case[suffix]
-                    ):
-                        self.case[suffix].append(fpath)
-                        break
-                else:
-                    if fpath.lower().endswith("range_.h5"):
-                        self.case["range_.h5"].append(fpath)
-                        break
-                    if fpath.lower().endswith(".h5"):
-                        self.case[".h5"].append(fpath)
-                        break
-                # HDF5 files need special treatment, this already shows that magic numbers
-                # should better have been used or signatures to avoid having to have as
-                # complicated content checks as we had to implement e.g. for the em reader
+            matches = [
+                suffix
+                for suffix in self.supported_file_name_suffixes
+                if fpath.lower().endswith(suffix)
+            ]
+            if len(matches) == 0:
+                continue
+            # longest suffix wins, e.g. range_.h5 (ranging) over .h5 (reconstruction)
+            suffix = max(matches, key=len)
+            if fpath not in self.case[suffix]:
+                self.case[suffix].append(fpath)
 
     def check_validity_of_file_combinations(self):
         """Check if this combination of types of files is supported."""
@@ -123,31 +103,23 @@ class ApmUseCaseSelector:
         other_input = 0  # generic ELN, Oasis-specific configurations
         apsuite_input = 0  # manual yaml files composed from IVAS/AP Suite
         for suffix, value in self.case.items():
-            if suffix not in [".h5", "range_.h5"]:
-                if suffix in VALID_FILE_NAME_SUFFIX_RECON:
-                    recon_input += len(value)
-                elif suffix in VALID_FILE_NAME_SUFFIX_RANGE:
-                    range_input += len(value)
-                elif suffix in VALID_FILE_NAME_SUFFIX_CONFIG:
-                    other_input += len(value)
-                elif suffix in VALID_FILE_NAME_SUFFIX_CAMECA:
-                    apsuite_input += len(value)
-                else:
-                    continue
-            else:
-                if suffix == "range_.h5":
-                    range_input += len(value)
-                if suffix == ".h5":
-                    recon_input += len(value)
+            if suffix in self.recon_suffixes:
+                recon_input += len(value)
+            elif suffix in self.range_suffixes:
+                range_input += len(value)
+            elif suffix in VALID_FILE_NAME_SUFFIX_CONFIG:
+                other_input += len(value)
+            elif suffix in VALID_FILE_NAME_SUFFIX_CAMECA:
+                apsuite_input += len(value)
         # logger.debug(f"{recon_input}, {range_input}, {other_input}")
 
         # if 1 <= other_input <= 2:  # and (recon_input == 1) and (range_input == 1)
         self.is_valid = True
         self.reconstruction: list[str] = []
         self.ranging: list[str] = []
-        for suffix in VALID_FILE_NAME_SUFFIX_RECON:
+        for suffix in self.recon_suffixes:
             self.reconstruction += self.case[suffix]
-        for suffix in VALID_FILE_NAME_SUFFIX_RANGE:
+        for suffix in self.range_suffixes:
             self.ranging += self.case[suffix]
         yml: list[str] = []
         for suffix in VALID_FILE_NAME_SUFFIX_CONFIG:
@@ -166,6 +138,10 @@ class ApmUseCaseSelector:
         if len(self.apsuite) > 0:
             logger.info(f"IVAS/AP Suite: {self.apsuite}\n")
 
+    def get_shared_file_paths(self) -> list[str]:
+        """Get the input files which serve several roles, e.g. Cameca HDF5."""
+        return [fpath for fpath in self.reconstruction if fpath in self.ranging]
+
     def get_file_path_alias(self, fpath: str, tweaks: fd.FlatDict) -> str:
         """Identify if an alias for the file with fpath exists, return empty string if not."""
         if "file_path_aliasing" in tweaks:
@@ -186,21 +162,19 @@ class ApmUseCaseSelector:
                 "/ENTRY[entry*]/atom_probeID[atom_probe]/reconstruction/results",
                 identifier,
             )
-            with open(fpath, "rb") as fp:
-                template[f"{prfx}/checksum"] = get_sha256_of_file_content(fp)
-                alias = self.get_file_path_alias(fpath, oasis_specific)
-                template[f"{prfx}/file_name"] = alias if alias != "" else fpath
-                template[f"{prfx}/algorithm"] = DEFAULT_CHECKSUM_ALGORITHM
+            template[f"{prfx}/checksum"] = get_file_checksum(fpath)
+            alias = self.get_file_path_alias(fpath, oasis_specific)
+            template[f"{prfx}/file_name"] = alias if alias != "" else fpath
+            template[f"{prfx}/algorithm"] = DEFAULT_CHECKSUM_ALGORITHM
         for fpath in self.ranging:
             prfx = var_path_to_specific_path(
                 "/ENTRY[entry*]/atom_probeID[atom_probe]/ranging/source",
                 identifier,
             )
-            with open(fpath, "rb") as fp:
-                template[f"{prfx}/checksum"] = get_sha256_of_file_content(fp)
-                alias = self.get_file_path_alias(fpath, oasis_specific)
-                template[f"{prfx}/file_name"] = alias if alias != "" else fpath
-                template[f"{prfx}/algorithm"] = DEFAULT_CHECKSUM_ALGORITHM
+            template[f"{prfx}/checksum"] = get_file_checksum(fpath)
+            alias = self.get_file_path_alias(fpath, oasis_specific)
+            template[f"{prfx}/file_name"] = alias if alias != "" else fpath
+            template[f"{prfx}/algorithm"] = DEFAULT_CHECKSUM_ALGORITHM
         # FAU/Erlangen's pyccapt control and calibration file have not functional
         # distinction which makes it non-trivial to decide if a given HDF5 qualifies
         # as control or calibration file TODO::for this reason it is currently ignored
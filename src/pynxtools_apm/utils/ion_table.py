@@ -0,0 +1,212 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Array-backed table of the ion types of a ranging definitions file."""
+
+# ranging readers return a list of NxIon objects, each with pint quantities and a
+# dict with the charge state model, an IonTable converts such a list once into
+# structured arrays, one record per ion type in ions and one per charge state
+# candidate in candidates, an ion type can have several mass-to-charge-state
+# ranges, these are rows of ranges, records refer to their ranges and candidates
+# via offset and count, the table is serialized into the NXion groups of the
+# template and can label mass-to-charge-state ratios with ion types
+# ion types are numbered from 1 in the order of the list, 0 is the unknown type
+# every ion type with more than one candidate adds five small datasets to its
+# charge_state_analysis group, these are below COMPRESSION_MIN_SIZE and are
+# therefore stored contiguous without a chunk index and filter pipeline
+
+import numpy as np
+from ifes_apt_tc_data_modeling.utils.definitions import MAX_NUMBER_OF_ATOMS_PER_ION
+
+from pynxtools_apm.utils.compression_policy import stage_compressed
+from pynxtools_apm.utils.template_paths import charge_state_analysis_paths, ion_paths
+
+ION_DTYPE = np.dtype(
+    [
+        ("nuclide_hash", np.uint16, (MAX_NUMBER_OF_ATOMS_PER_ION,)),
+        ("charge_state", np.int8),
+        ("range_offset", np.uint32),
+        ("n_ranges", np.uint32),
+        ("candidate_offset", np.uint32),
+        ("n_cand", np.uint32),
+        ("min_abundance", np.float64),
+        ("min_half_life", np.float64),
+        ("sacrifice_isotopic_uniqueness", np.bool_),
+    ]
+)
+CANDIDATE_DTYPE = np.dtype(
+    [
+        ("nuclide_hash", np.uint16, (MAX_NUMBER_OF_ATOMS_PER_ION,)),
+        ("charge_state", np.int8),
+        ("mass", np.float64),
+        ("natural_abundance_product", np.float64),
+        ("shortest_half_life", np.float64),
+    ]
+)
+
+
+class IonTable:
+    """Ion types with their ranges and charge state candidates as arrays."""
+
+    __slots__ = ("ions", "ranges", "range_units", "candidates", "names")
+
+    def __init__(
+        self,
+        ions: np.ndarray,
+        ranges: np.ndarray,
+        candidates: np.ndarray,
+        names: list[str],
+        range_units: str = "Da",
+    ):
+        self.ions = ions
+        self.ranges = ranges
+        self.candidates = candidates
+        self.names = names
+        self.range_units = range_units
+
+    def __len__(self) -> int:
+        return len(self.ions)
+
+    @classmethod
+    def from_nx_ions(cls, ion_lst: list) -> "IonTable":
+        """Convert NxIon objects of a ranging definitions reader."""
+        ions = np.zeros((len(ion_lst),), ION_DTYPE)
+        units = ion_lst[0].ranges.units if len(ion_lst) > 0 else None
+        ranges = [
+            ion.ranges.magnitude
+            if ion.ranges.units == units
+            else ion.ranges.to(units).magnitude
+            for ion in ion_lst
+        ]
+        models = [ion.charge_state_model for ion in ion_lst]
+        ions["nuclide_hash"] = [ion.nuclide_hash for ion in ion_lst]
+        ions["charge_state"] = [ion.charge_state for ion in ion_lst]
+        ions["n_ranges"] = [len(ion_ranges) for ion_ranges in ranges]
+        ions["range_offset"] = np.cumsum(ions["n_ranges"]) - ions["n_ranges"]
+        ions["n_cand"] = [model.get("n_cand", 0) for model in models]
+        ions["candidate_offset"] = np.cumsum(ions["n_cand"]) - ions["n_cand"]
+        candidates = np.zeros((int(np.sum(ions["n_cand"])),), CANDIDATE_DTYPE)
+        for idx in np.flatnonzero(ions["n_cand"]):
+            model = models[idx]
+            for field in ("min_abundance", "min_half_life"):
+                ions[field][idx] = model[field]
+            ions["sacrifice_isotopic_uniqueness"][idx] = model[
+                "sacrifice_isotopic_uniqueness"
+            ]
+            offset = ions["candidate_offset"][idx]
+            cands = candidates[offset : offset + ions["n_cand"][idx]]
+            for field in CANDIDATE_DTYPE.names:
+                cands[field] = np.reshape(model[field], cands[field].shape)
+        return cls(
+            ions,
+            np.reshape(np.concatenate([np.empty((0, 2))] + ranges), (-1, 2)),
+            candidates,
+            [ion.name for ion in ion_lst],
+            f"{units}" if units is not None else "Da",
+        )
+
+    def get_ranges(self, ion_idx: int) -> np.ndarray:
+        """Get the (n_ranges, 2) mass-to-charge-state ranges of the ion with index."""
+        offset = int(self.ions[ion_idx]["range_offset"])
+        return self.ranges[offset : offset + int(self.ions[ion_idx]["n_ranges"])]
+
+    def get_candidates(self, ion_idx: int) -> np.ndarray:
+        """Get the charge state candidates of the ion with index."""
+        offset = int(self.ions[ion_idx]["candidate_offset"])
+        return self.candidates[offset : offset + int(self.ions[ion_idx]["n_cand"])]
+
+    def label(self, mass_to_charge: np.ndarray) -> np.ndarray:
+        """Get the ion type of each mass-to-charge-state ratio, 0 if unranged."""
+        # ranges of later ion types take precedence like in the order of the file
+        labels = np.zeros(np.shape(mass_to_charge), np.uint8)
+        range_ion_type = np.repeat(
+            np.arange(1, len(self.ions) + 1), self.ions["n_ranges"]
+        )
+        for (mqmin, mqmax), ion_type in zip(self.ranges, range_ion_type):
+            labels[(mass_to_charge >= mqmin) & (mass_to_charge <= mqmax)] = ion_type
+        return labels
+
+    def get_nuclide_lists(self) -> np.ndarray:
+        """Get the (n_ions, MAX_NUMBER_OF_ATOMS_PER_ION, 2) NXion nuclide lists."""
+        # vectorized nuclide_hash_to_nuclide_list, a hash is protons + 256 * neutrons
+        hashes = self.ions["nuclide_hash"]
+        n_protons = hashes % 256
+        n_neutrons = hashes // 256
+        nuclide_lists = np.zeros(hashes.shape + (2,), np.uint16)
+        nuclide_lists[..., 0] = np.where(
+            (hashes != 0) & (n_neutrons > 0) & (n_neutrons < 255),
+            n_protons + n_neutrons,
+            0,
+        )
+        nuclide_lists[..., 1] = np.where(hashes != 0, n_protons, 0)
+        return nuclide_lists
+
+    def to_template(self, template: dict, entry_id: int, first_ion_id: int = 1):
+        """Write the NXion groups of all ion types starting at ion first_ion_id."""
+        hashes = self.ions["nuclide_hash"]
+        nuclide_lists = self.get_nuclide_lists()
+        ranges = np.asarray(self.ranges, np.float32)
+        for ion_idx, (charge_state, range_offset, n_ranges, n_cand) in enumerate(
+            zip(
+                self.ions["charge_state"].tolist(),
+                self.ions["range_offset"].tolist(),
+                self.ions["n_ranges"].tolist(),
+                self.ions["n_cand"].tolist(),
+            )
+        ):
+            ion_id = first_ion_id + ion_idx
+            ion_ranges = ranges[range_offset : range_offset + n_ranges]
+            keys = ion_paths(entry_id, ion_id)
+            template[keys["nuclide_hash"]] = stage_compressed(
+                hashes[ion_idx], "metadata", (0,)
+            )
+            template[keys["charge_state"]] = np.int8(charge_state)
+            template[keys["mass_to_charge_range"]] = ion_ranges
+            template[keys["mass_to_charge_range/@units"]] = self.range_units
+            template[keys["nuclide_list"]] = stage_compressed(
+                nuclide_lists[ion_idx], "metadata", (0, 1)
+            )
+            template[keys["name"]] = self.names[ion_idx]
+            if n_cand == 0:
+                continue
+            record = self.ions[ion_idx]
+            keys = charge_state_analysis_paths(entry_id, ion_id)
+            template[keys["config/nuclides"]] = hashes[ion_idx]
+            template[keys["config/mass_to_charge_range"]] = ion_ranges
+            template[keys["config/mass_to_charge_range/@units"]] = self.range_units
+            template[keys["config/min_abundance"]] = np.float64(record["min_abundance"])
+            template[keys["config/min_half_life"]] = np.float64(record["min_half_life"])
+            template[keys["config/min_half_life/@units"]] = "s"
+            template[keys["config/sacrifice_isotopic_uniqueness"]] = bool(
+                record["sacrifice_isotopic_uniqueness"]
+            )
+            cands = self.get_candidates(ion_idx)
+            # for a charge state model nuclide_hash is a 2d matrix not a 1d vector!
+            template[keys["nuclide_hash"]] = stage_compressed(
+                cands["nuclide_hash"], "metadata", (0, 1)
+            )
+            if n_cand == 1:
+                template[keys["charge_state"]] = np.int8(cands["charge_state"][0])
+                for field in CANDIDATE_DTYPE.names[2:]:
+                    template[keys[field]] = np.float64(cands[field][0])
+            else:
+                for field in CANDIDATE_DTYPE.names[1:]:
+                    template[keys[field]] = stage_compressed(
+                        cands[field], "metadata", (0,)
+                    )
+            template[keys["mass/@units"]] = "Da"
+            template[keys["shortest_half_life/@units"]] = "s"
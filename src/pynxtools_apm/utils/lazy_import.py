@@ -0,0 +1,28 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Resolve classes or functions from module:attribute specifications on first use."""
+
+import importlib
+from functools import cache
+
+
+@cache
+def load_object(spec: str):
+    """Import the module of spec and return its attribute, e.g. package.module:Class."""
+    module_name, attribute_name = spec.split(":", 1)
+    return getattr(importlib.import_module(module_name), attribute_name)
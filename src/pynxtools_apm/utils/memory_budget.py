@@ -0,0 +1,125 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Estimate the peak memory of parsing a file and decide what to parse in budget."""
+
+# the peak memory of a conversion is dominated by the reconstruction file because
+# all its fields are kept in the template until the writer runs, before parsing
+# MemoryPlan estimates this peak from the file size and the record layout of the
+# format, if the estimate exceeds the budget optional heavy fields like the hit
+# positions and the pulse data are not read, extractors query is_skipped for this
+# the budget is MEMORY_BUDGET byte, the environment variable MEMORY_BUDGET_ENV_VAR
+# takes precedence, if both are 0 the budget is a fraction of the available memory
+
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from pynxtools_apm import MEMORY_BUDGET
+from pynxtools_apm.utils.custom_logging import logger
+from pynxtools_apm.utils.format_registry import FileFormat
+
+MEMORY_BUDGET_ENV_VAR = "PYNXTOOLS_APM_MEMORY_BUDGET"
+MEMORY_BUDGET_AVAILABLE_FRACTION = 0.8
+MEMORY_DECISIONS = ("full", "skip_optional", "over_budget", "unknown")
+SKIPPED_FIELDS: ContextVar[tuple[str, ...]] = ContextVar("SKIPPED_FIELDS", default=())
+
+
+def get_available_memory() -> int:
+    """Get the main memory in byte this process can use, 0 if unknown."""
+    available = 0
+    try:
+        available = os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, OSError, ValueError):
+        pass
+    # containers like those of NOMAD workers are typically limited via cgroups
+    for cgroup_limit in (
+        "/sys/fs/cgroup/memory.max",
+        "/sys/fs/cgroup/memory/memory.limit_in_bytes",
+    ):
+        try:
+            with open(cgroup_limit) as fp:
+                limit = fp.read().strip()
+        except OSError:
+            continue
+        if limit.isdigit() and (available == 0 or int(limit) < available):
+            available = int(limit)
+    return available
+
+
+def get_memory_budget() -> int:
+    """Get the memory budget in byte, 0 if no budget is enforced."""
+    budget = os.environ.get(MEMORY_BUDGET_ENV_VAR, "")
+    if budget.isdigit():
+        return int(budget)
+    if MEMORY_BUDGET > 0:
+        return MEMORY_BUDGET
+    return int(get_available_memory() * MEMORY_BUDGET_AVAILABLE_FRACTION)
+
+
+def is_skipped(field: str) -> bool:
+    """Check if the active memory plan skips the optional field."""
+    return field in SKIPPED_FIELDS.get()
+
+
+class MemoryPlan:
+    """Decision which fields of a file to parse given the memory budget."""
+
+    def __init__(
+        self, file_format: FileFormat | None, file_path: str, budget: int | None = None
+    ):
+        self.budget = budget if budget is not None else get_memory_budget()
+        self.estimate = 0
+        self.skipped: tuple[str, ...] = ()
+        self.decision = "unknown"
+        if file_format is None or not os.path.isfile(file_path):
+            return
+        self.estimate = file_format.estimate_ram(file_path)
+        if self.budget <= 0 or self.estimate <= self.budget:
+            self.decision = "full"
+            return
+        if len(file_format.optional_fields) > 0:
+            self.skipped = file_format.optional_fields
+            self.estimate = file_format.estimate_ram(file_path, self.skipped)
+            if self.estimate <= self.budget:
+                self.decision = "skip_optional"
+            else:
+                self.decision = "over_budget"
+        else:
+            self.decision = "over_budget"
+        logger.warning(
+            f"Parsing {file_path} takes an estimated {self.estimate} B which exceeds "
+            f"the budget of {self.budget} B, decision {self.decision} skips "
+            f"{list(self.skipped)}"
+        )
+
+    def as_dict(self) -> dict:
+        return {
+            "estimate": self.estimate,
+            "budget": self.budget,
+            "decision": self.decision,
+            "skipped_fields": list(self.skipped),
+        }
+
+    @contextmanager
+    def applied(self):
+        """Make extractors skip the fields of this plan within the context."""
+        token = SKIPPED_FIELDS.set(self.skipped)
+        try:
+            yield self
+        finally:
+            SKIPPED_FIELDS.reset(token)
@@ -0,0 +1,262 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Compress the chunks of gzip datasets in a thread pool and write them directly."""
+
+# HDF5 applies the filters of a chunked dataset chunk by chunk in the writing
+# thread, the deflate of zlib releases the GIL however, chunks are therefore
+# shuffled and deflated in a thread pool like the HDF5 filter pipeline would do
+# and the resulting bytes are written with write_direct_chunk, the file is a
+# standard HDF5 file which every client reads with the usual gzip and shuffle
+# filters, at most CHUNKS_IN_FLIGHT_PER_WORKER chunks per worker are pending
+# the pynxtools writer creates the datasets of the template itself, therefore
+# the parallel compression is applied after a conversion, repack_nexus_file, also
+# available as the console script pynxtools-apm-repack, recompresses the large
+# gzip datasets of a written NeXus file, e.g. after a conversion with the fastest
+# compression policy, with a stronger gzip level on all cores
+
+import os
+import zlib
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import click
+import h5py
+import numpy as np
+
+from pynxtools_apm.utils.custom_logging import logger
+from pynxtools_apm.utils.stage_graph import get_available_cpus
+
+CHUNKS_IN_FLIGHT_PER_WORKER = 4
+REPACK_MIN_SIZE = 64 * 1024 * 1024  # byte, smaller datasets are copied as is
+
+
+def shuffle_bytes(data: bytes, itemsize: int) -> bytes:
+    """Group the i-th bytes of all items like the HDF5 shuffle filter."""
+    if itemsize <= 1:
+        return data
+    return np.frombuffer(data, np.uint8).reshape(-1, itemsize).T.tobytes()
+
+
+def unshuffle_bytes(data: bytes, itemsize: int) -> bytes:
+    """Invert shuffle_bytes."""
+    if itemsize <= 1:
+        return data
+    return np.frombuffer(data, np.uint8).reshape(itemsize, -1).T.tobytes()
+
+
+def encode_chunk(data: bytes, itemsize: int, strength: int, shuffle: bool) -> bytes:
+    if shuffle:
+        data = shuffle_bytes(data, itemsize)
+    return zlib.compress(data, strength)
+
+
+def iter_chunk_offsets(
+    shape: tuple[int, ...], chunks: tuple[int, ...]
+) -> Iterator[tuple[int, ...]]:
+    """Iterate over the offsets of all chunks in C order."""
+    for index in np.ndindex(
+        *(int(np.ceil(extent / chunk)) for extent, chunk in zip(shape, chunks))
+    ):
+        yield tuple(idx * chunk for idx, chunk in zip(index, chunks))
+
+
+def get_chunk_bytes(
+    values: np.ndarray, offset: tuple[int, ...], chunks: tuple[int, ...]
+) -> bytes:
+    """Get the uncompressed bytes of the chunk, edge chunks are padded with zeros."""
+    slab = values[
+        tuple(slice(start, start + chunk) for start, chunk in zip(offset, chunks))
+    ]
+    if slab.shape != chunks:
+        padded = np.zeros(chunks, values.dtype)
+        padded[tuple(slice(0, extent) for extent in slab.shape)] = slab
+        slab = padded
+    return np.ascontiguousarray(slab).tobytes()
+
+
+def write_chunks(dst: h5py.Dataset, tasks: Iterator, max_workers: int):
+    """Write (offset, callable) tasks whose callables return the filtered chunk."""
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending: deque[tuple[tuple[int, ...], Future]] = deque()
+        for offset, func in tasks:
+            pending.append((offset, executor.submit(func)))
+            if len(pending) >= max_workers * CHUNKS_IN_FLIGHT_PER_WORKER:
+                offset, future = pending.popleft()
+                dst.id.write_direct_chunk(offset, future.result())
+        while pending:
+            offset, future = pending.popleft()
+            dst.id.write_direct_chunk(offset, future.result())
+
+
+def write_compressed_chunks(
+    h5grp: h5py.Group,
+    name: str,
+    values: np.ndarray,
+    chunks: tuple[int, ...],
+    strength: int,
+    *,
+    shuffle: bool = False,
+    max_workers: int | None = None,
+) -> h5py.Dataset:
+    """Create a gzip dataset whose chunks are compressed in a thread pool."""
+    if max_workers is None:
+        max_workers = get_available_cpus()
+    dst = h5grp.create_dataset(
+        name,
+        shape=values.shape,
+        dtype=values.dtype,
+        chunks=chunks,
+        compression="gzip",
+        compression_opts=strength,
+        shuffle=shuffle,
+    )
+    itemsize = values.dtype.itemsize
+    tasks = (
+        (
+            offset,
+            lambda offset=offset: encode_chunk(
+                get_chunk_bytes(values, offset, chunks), itemsize, strength, shuffle
+            ),
+        )
+        for offset in iter_chunk_offsets(values.shape, chunks)
+    )
+    write_chunks(dst, tasks, max_workers)
+    return dst
+
+
+def is_repackable(dst: h5py.Dataset, min_size: int) -> bool:
+    """Check if the dataset uses only gzip and optionally shuffle and is large."""
+    return (
+        dst.chunks is not None
+        and dst.compression == "gzip"
+        and dst.scaleoffset is None
+        and not dst.fletcher32
+        and dst.dtype.kind in "biuf"
+        and dst.size * dst.dtype.itemsize >= min_size
+    )
+
+
+def recompress_dataset(
+    src: h5py.Dataset, h5grp: h5py.Group, name: str, strength: int, max_workers: int
+) -> h5py.Dataset:
+    """Copy a gzip dataset with all chunks decompressed and compressed in a pool."""
+    dst = h5grp.create_dataset(
+        name,
+        shape=src.shape,
+        dtype=src.dtype,
+        chunks=src.chunks,
+        compression="gzip",
+        compression_opts=strength,
+        shuffle=src.shuffle,
+    )
+    itemsize = src.dtype.itemsize
+    shuffle = src.shuffle
+
+    def recode(filter_mask: int, data: bytes) -> bytes:
+        # a set bit in filter_mask means that the filter was skipped for the chunk
+        if shuffle:
+            if not filter_mask & 0b10:
+                data = zlib.decompress(data)
+            if not filter_mask & 0b01:
+                data = unshuffle_bytes(data, itemsize)
+        elif not filter_mask & 0b01:
+            data = zlib.decompress(data)
+        return encode_chunk(data, itemsize, strength, shuffle)
+
+    def iter_tasks():
+        # chunks which were never written are not stored and stay unallocated
+        for index in range(src.id.get_num_chunks()):
+            offset = src.id.get_chunk_info(index).chunk_offset
+            filter_mask, data = src.id.read_direct_chunk(offset)
+            yield (
+                offset,
+                lambda filter_mask=filter_mask, data=data: recode(filter_mask, data),
+            )
+
+    write_chunks(dst, iter_tasks(), max_workers)
+    for key, value in src.attrs.items():
+        dst.attrs[key] = value
+    return dst
+
+
+def repack_nexus_file(
+    source_file_path: str,
+    target_file_path: str,
+    strength: int = 9,
+    min_size: int = REPACK_MIN_SIZE,
+    max_workers: int | None = None,
+):
+    """Copy a NeXus file, recompress large gzip datasets with strength in parallel."""
+    if max_workers is None:
+        max_workers = get_available_cpus()
+    with (
+        h5py.File(source_file_path, "r") as h5r,
+        h5py.File(target_file_path, "w") as h5w,
+    ):
+
+        def copy_group(src: h5py.Group, trg: h5py.Group):
+            for key, value in src.attrs.items():
+                trg.attrs[key] = value
+            for name in src:
+                link = src.get(name, getlink=True)
+                if isinstance(link, h5py.SoftLink | h5py.ExternalLink):
+                    trg[name] = link
+                    continue
+                obj = src[name]
+                if isinstance(obj, h5py.Group):
+                    copy_group(obj, trg.create_group(name))
+                elif is_repackable(obj, min_size):
+                    logger.debug(f"Recompressing {obj.name} with gzip {strength}")
+                    recompress_dataset(obj, trg, name, strength, max_workers)
+                else:
+                    src.copy(obj, trg, name)
+
+        copy_group(h5r, h5w)
+
+
+@click.command()
+@click.argument("source_file_path", type=click.Path(exists=True, dir_okay=False))
+@click.argument("target_file_path", type=click.Path(dir_okay=False))
+@click.option(
+    "--strength",
+    type=click.IntRange(0, 9),
+    default=9,
+    show_default=True,
+    help="gzip level of the recompressed datasets.",
+)
+@click.option(
+    "--min-size",
+    type=click.IntRange(0),
+    default=REPACK_MIN_SIZE,
+    show_default=True,
+    help="Datasets with fewer bytes are copied as is.",
+)
+@click.option(
+    "--max-workers",
+    type=click.IntRange(1),
+    default=None,
+    help="Number of compression threads, by default the available cores.",
+)
+def repack(source_file_path, target_file_path, strength, min_size, max_workers):
+    """Copy a NeXus file and recompress its large gzip datasets in parallel."""
+    if os.path.abspath(source_file_path) == os.path.abspath(target_file_path):
+        raise click.BadParameter("has to differ from SOURCE_FILE_PATH")
+    repack_nexus_file(
+        source_file_path, target_file_path, strength, min_size, max_workers
+    )
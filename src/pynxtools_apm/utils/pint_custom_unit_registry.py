@@ -17,6 +17,9 @@
 #
 """A customized unit registry for handling units with pint."""
 
+from functools import lru_cache
+
+import numpy as np
 import pint
 
 try:
@@ -40,3 +43,53 @@ def is_not_special_unit(qnt: pint.Quantity) -> bool:
     if len(f"{qnt.units}") > 0:
         return True
     return False
+
+
+@lru_cache(maxsize=1024)
+def get_unit(unit: str) -> pint.Unit:
+    """Parse a unit string, cached as the same strings are parsed for every entry."""
+    return ureg.Unit(unit)
+
+
+# (src_unit, trg_unit) -> (factor, offset) such that trg = factor * src + offset,
+# None for units where this affine relation does not hold (e.g. logarithmic units)
+UNIT_CONVERSION_CACHE: dict[tuple, tuple[float, float] | None] = {}
+
+
+def get_unit_conversion(src_unit, trg_unit) -> tuple[float, float] | None:
+    """Get factor and offset of the conversion between two units."""
+    key = (src_unit, trg_unit)
+    if key not in UNIT_CONVERSION_CACHE:
+        offset = ureg.Quantity(0.0, src_unit).to(trg_unit).magnitude
+        factor = ureg.Quantity(1.0, src_unit).to(trg_unit).magnitude - offset
+        probe = ureg.Quantity(10.0, src_unit).to(trg_unit).magnitude
+        if np.isclose(probe, 10.0 * factor + offset, rtol=1.0e-12, atol=0.0):
+            if offset == 0.0:
+                # exact factor as pint computes it for multiplicative units
+                factor = ureg.Quantity(1.0, src_unit).to(trg_unit).magnitude
+            UNIT_CONVERSION_CACHE[key] = (factor, offset)
+        else:
+            UNIT_CONVERSION_CACHE[key] = None
+    return UNIT_CONVERSION_CACHE[key]
+
+
+def convert_to(magnitude, src_unit, trg_unit) -> pint.Quantity:
+    """Same as ureg.Quantity(magnitude, src_unit).to(trg_unit) but memoized."""
+    if isinstance(magnitude, (list, tuple)):
+        magnitude = np.asarray(magnitude)
+    if isinstance(magnitude, np.ndarray):
+        is_numeric = magnitude.dtype.kind in "iuf"
+    else:
+        is_numeric = isinstance(magnitude, (int, float, np.integer, np.floating))
+        is_numeric = is_numeric and not isinstance(magnitude, bool)
+    if not is_numeric:
+        return ureg.Quantity(magnitude, src_unit).to(trg_unit)
+    if src_unit == trg_unit:
+        return ureg.Quantity(magnitude, trg_unit)
+    conversion = get_unit_conversion(src_unit, trg_unit)
+    if conversion is None:
+        return ureg.Quantity(magnitude, src_unit).to(trg_unit)
+    factor, offset = conversion
+    if offset == 0.0:
+        return ureg.Quantity(magnitude * factor, trg_unit)
+    return ureg.Quantity(magnitude * factor + offset, trg_unit)
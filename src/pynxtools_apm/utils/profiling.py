@@ -17,11 +17,152 @@
 #
 """Simple profiling"""
 
+# StageProfiler measures each stage of a conversion, i.e. parsing the config, the
+# ELN, the reconstruction, etc., with PROFILING_EVENTS every stage is reported as
+# an NXcs_profiling_event with only the fields which that base class defines,
+# these values differ between runs, which is why they are opt-in, otherwise the
+# checksums of the reference conversions would change with every run
+# costs of individual fields are collected by the map functor for the stage that
+# is currently active, this is tracked via a context variable such that functors
+# do not need to know about the profiler and cost nothing if no stage is active
+# if the environment variable PROFILING_JSON_ENV_VAR names a file path the stages
+# including CPU time, bytes read, field costs and memory plans are stored as JSON
+
+import json
+import os
 import platform
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from time import perf_counter_ns, process_time_ns
 
 import numpy as np
 from pynxtools.dataconverter.chunk import BLOSC_NTHREADS
 
+HAS_RESOURCE: bool
+try:
+    import resource
+
+    HAS_RESOURCE = True
+except ImportError:  # not available on Windows
+    HAS_RESOURCE = False
+
+from pynxtools_apm import SEPARATOR
+from pynxtools_apm.utils.custom_logging import logger
+
+PROFILING_JSON_ENV_VAR = "PYNXTOOLS_APM_PROFILING_JSON"
+CURRENT_FIELD_COSTS: ContextVar[dict | None] = ContextVar(
+    "CURRENT_FIELD_COSTS", default=None
+)
+
+
+def get_field_costs() -> dict | None:
+    """Get the field costs of the active stage, None if no stage is active."""
+    return CURRENT_FIELD_COSTS.get()
+
+
+def add_field_cost(field_costs: dict, field: str, elapsed_ns: int):
+    """Accumulate number of calls and elapsed time in ns for field."""
+    count, total = field_costs.get(field, (0, 0))
+    field_costs[field] = (count + 1, total + elapsed_ns)
+
+
+def get_peak_rss() -> int:
+    """Get the peak resident set size of this process in byte, 0 if unknown."""
+    if not HAS_RESOURCE:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in KiB on Linux but in byte on macOS
+    return int(peak) if platform.system() == "Darwin" else int(peak) * 1024
+
+
+def get_bytes_read() -> int | None:
+    """Get the number of bytes this process has read so far, None if unknown."""
+    try:
+        with open("/proc/self/io") as fp:
+            for line in fp:
+                if line.startswith("rchar:"):
+                    return int(line.split(":")[1])
+    except OSError:
+        pass
+    return None
+
+
+class StageProfiler:
+    """Wall time, CPU time, peak RSS increase, and bytes read of each stage."""
+
+    def __init__(self):
+        self.stages: list[dict] = []
+
+    @contextmanager
+    def stage(self, name: str, description: str = ""):
+        record: dict = {
+            "name": name,
+            "description": description if description != "" else name,
+            "start_time": datetime.now().astimezone().isoformat(),
+        }
+        field_costs: dict = {}
+        token = CURRENT_FIELD_COSTS.set(field_costs)
+        peak_rss = get_peak_rss()
+        bytes_read = get_bytes_read()
+        cpu_tic = process_time_ns()
+        tic = perf_counter_ns()
+        try:
+            yield record
+        finally:
+            toc = perf_counter_ns()
+            cpu_toc = process_time_ns()
+            CURRENT_FIELD_COSTS.reset(token)
+            record["end_time"] = datetime.now().astimezone().isoformat()
+            record["elapsed_time"] = (toc - tic) / 1.0e9
+            record["cpu_time"] = (cpu_toc - cpu_tic) / 1.0e9
+            record["peak_resident_memory"] = get_peak_rss()
+            record["peak_resident_memory_increase"] = (
+                record["peak_resident_memory"] - peak_rss
+            )
+            if bytes_read is not None:
+                record["bytes_read"] = get_bytes_read() - bytes_read
+            record["field_costs"] = {
+                field: {"count": count, "elapsed_time": total / 1.0e9}
+                for field, (count, total) in sorted(
+                    field_costs.items(), key=lambda item: -item[1][1]
+                )
+            }
+            self.stages.append(record)
+
+    def to_template(self, template: dict, entry_id: int = 1) -> dict:
+        """Add one NXcs_profiling_event per stage, further metrics are JSON only."""
+        for event_id, record in enumerate(self.stages, start=1):
+            trg = f"/ENTRY[entry{entry_id}]/profiling/eventID[event{event_id}]"
+            template[f"{trg}/description"] = record["description"]
+            template[f"{trg}/start_time"] = record["start_time"]
+            template[f"{trg}/end_time"] = record["end_time"]
+            template[f"{trg}/elapsed_time"] = np.float64(record["elapsed_time"])
+            template[f"{trg}/elapsed_time/@units"] = "s"
+            template[f"{trg}/max_processes"] = np.uint32(1)
+            template[f"{trg}/max_threads"] = (
+                np.uint32(BLOSC_NTHREADS) if BLOSC_NTHREADS >= 1 else np.uint32(1)
+            )
+            template[f"{trg}/max_gpus"] = np.uint32(0)
+            if record["peak_resident_memory"] > 0:
+                template[f"{trg}/max_resident_memory_snapshot"] = np.asarray(
+                    [record["peak_resident_memory"]], np.uint64
+                )
+                template[f"{trg}/max_resident_memory_snapshot/@units"] = "B"
+        return template
+
+    def store_json(self, file_path: str):
+        """Store all stages including the costs of each field as JSON."""
+        with open(file_path, "w") as fp:
+            json.dump({"stages": self.stages}, fp, indent=2)
+
+    def store_json_if_requested(self):
+        file_path = os.environ.get(PROFILING_JSON_ENV_VAR, "")
+        if file_path != "":
+            self.store_json(file_path)
+            logger.info(f"Stored profiling of {len(self.stages)} stages in {file_path}")
+
+
 # try:
 #     from cpuinfo import get_cpu_info
 #
@@ -56,6 +197,11 @@ def simple_profiling(
     template[f"{trg}/max_gpus"] = np.uint32(0)
     template[f"{trg}/template_filling_elapsed_time"] = np.float64((toc - tic) / 1.0e9)
     template[f"{trg}/template_filling_elapsed_time/@units"] = "s"
+    if hasattr(template, "subtree_stats"):
+        for path, (n_keys, n_bytes) in template.subtree_stats(
+            f"/ENTRY[entry{entry_id}]", 1
+        ).items():
+            logger.info(f"{path}{SEPARATOR}{n_keys} keys{SEPARATOR}{n_bytes} B")
     # template[f"{trg}/PROGRAM[program]/program"] = "pynxtools-apm"
     # template[f"{trg}/PROGRAM[program]/program/@version"] = get_pynxtools_apm_version()
 
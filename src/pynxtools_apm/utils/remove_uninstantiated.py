@@ -19,17 +19,31 @@
 
 import re
 
+from pynxtools_apm.utils.template_paths import index_keys_by_suffix
+
+SENSOR_MEASUREMENT_SUFFIXES = (
+    "/analysis_chamber/pressure_sensor/measurement",
+    "/stage/temperature_sensor/measurement",
+)
+SENSOR_MEASUREMENT_PATTERN = re.compile(
+    r"/ENTRY\[entry[0-9]+\]/measurement/eventID\[event[0-9]+\]/instrument"
+    r"/(analysis_chamber/pressure_sensor|stage/temperature_sensor)/measurement"
+)
+
 
 def remove_uninstantiated_sensors(template: dict, entry_id: int = 1) -> dict:
     """Deletes sensors that have been added by the use functor but have no values."""
-    for key in template:
-        if not key.endswith("/measurement"):
-            continue
-        for rgx in [
-            r"/ENTRY\[entry[0-9]+\]/measurement/eventID\[event[0-9]+\]/instrument/analysis_chamber/pressure_sensor/measurement",
-            r"/ENTRY\[entry[0-9]+\]/measurement/eventID\[event[0-9]+\]/instrument/stage/temperature_sensor/measurement",
-        ]:
-            match = re.search(rgx, key)
-            if match and key.replace("/measurement", "/value") not in template:
-                del template[key]
+    # only keys with a sensor suffix are matched against the pattern, deletions are
+    # collected first as template must not change size while it is iterated
+    candidates = index_keys_by_suffix(template, SENSOR_MEASUREMENT_SUFFIXES)
+    to_delete = []
+    for keys in candidates.values():
+        for key in keys:
+            if (
+                SENSOR_MEASUREMENT_PATTERN.search(key)
+                and key.replace("/measurement", "/value") not in template
+            ):
+                to_delete.append(key)
+    for key in to_delete:
+        del template[key]
     return template
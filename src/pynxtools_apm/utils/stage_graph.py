@@ -0,0 +1,97 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Run stages of a parsing pipeline concurrently in threads in dependency order."""
+
+# each stage writes into a private dict instead of the shared template, once all
+# stages completed the private dicts are merged into the template in the order in
+# which the stages were added, i.e. the template is the same as if the stages had
+# run one after another irrespective of which stage finished first, stages
+# must therefore not read from the template what other stages of the graph write,
+# values which a stage passes on to its dependents are returned from the stage
+# a dependency has to be added before its dependents, every stage is submitted
+# in this order and waits for its dependencies first, as the pool starts tasks in
+# the order of submission a waiting stage never blocks one of its dependencies
+
+import os
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import copy_context
+from typing import Any
+
+from pynxtools_apm.utils.custom_logging import logger
+
+
+def get_available_cpus() -> int:
+    """Get the number of CPUs this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+class StageGraph:
+    """Directed acyclic graph of stages which write into private templates."""
+
+    def __init__(self):
+        self.stages: dict[str, tuple[Callable[[dict], object], tuple[str, ...]]] = {}
+        self.results: dict[str, Any] = {}
+
+    def add(
+        self,
+        name: str,
+        func: Callable[[dict], object],
+        depends_on: tuple[str, ...] = (),
+    ):
+        """Add a stage func(private_template) which runs after all depends_on."""
+        if name in self.stages:
+            raise ValueError(f"Stage {name} was already added.")
+        for dependency in depends_on:
+            if dependency not in self.stages:
+                raise ValueError(f"Stage {name} depends on unknown stage {dependency}.")
+        self.stages[name] = (func, depends_on)
+
+    def run(self, template: dict, max_workers: int = 1) -> dict:
+        """Run all stages, with max_workers <= 1 one after another, and merge."""
+        private: dict[str, dict] = {name: {} for name in self.stages}
+        if max_workers <= 1:
+            for name, (func, _) in self.stages.items():
+                self.results[name] = func(private[name])
+        else:
+            futures: dict[str, Future] = {}
+
+            def run_stage(name: str):
+                func, depends_on = self.stages[name]
+                for dependency in depends_on:
+                    futures[dependency].result()
+                self.results[name] = func(private[name])
+
+            with ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="stage"
+            ) as executor:
+                # each stage sees the context variables of the caller
+                for name in self.stages:
+                    futures[name] = executor.submit(copy_context().run, run_stage, name)
+            # re-raise the exception of the first failed stage in the order added
+            for future in futures.values():
+                future.result()
+        for name, values in private.items():
+            logger.debug(f"Merging {len(values)} keys of stage {name}")
+            for key, value in values.items():
+                # like the pynxtools template, None values are not instantiated
+                if value is not None:
+                    template[key] = value
+        return template
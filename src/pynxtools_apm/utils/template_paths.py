@@ -0,0 +1,102 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Build and intern frequently used template paths once instead of per write."""
+
+# template keys like /ENTRY[entry1]/atom_probeID[atom_probe]/ranging/...
+# /ionID[ion42]/charge_state_analysis/... are composed multiple times per ion
+# and field, the prefixes and the keys of all fields of an ion are therefore built
+# once, interned, and then reused, i.e. the template, the writer, and all cleanup
+# passes work with the same string objects
+
+import sys
+from functools import cache, lru_cache
+
+ION_FIELDS = (
+    "nuclide_hash",
+    "charge_state",
+    "mass_to_charge_range",
+    "mass_to_charge_range/@units",
+    "nuclide_list",
+    "name",
+)
+CHARGE_STATE_ANALYSIS_FIELDS = (
+    "config/nuclides",
+    "config/mass_to_charge_range",
+    "config/mass_to_charge_range/@units",
+    "config/min_abundance",
+    "config/min_half_life",
+    "config/min_half_life/@units",
+    "config/sacrifice_isotopic_uniqueness",
+    "nuclide_hash",
+    "charge_state",
+    "mass",
+    "mass/@units",
+    "natural_abundance_product",
+    "shortest_half_life",
+    "shortest_half_life/@units",
+)
+
+
+@cache
+def entry_prefix(entry_id: int) -> str:
+    """Path of the entry without trailing slash."""
+    return sys.intern(f"/ENTRY[entry{entry_id}]")
+
+
+@cache
+def peak_identification_prefix(entry_id: int) -> str:
+    """Path of the peak_identification group of the ranging with trailing slash."""
+    return sys.intern(
+        f"{entry_prefix(entry_id)}/atom_probeID[atom_probe]/ranging/peak_identification/"
+    )
+
+
+@lru_cache(maxsize=4096)
+def ion_paths(entry_id: int, ion_id: int) -> dict[str, str]:
+    """Interned template keys of all ION_FIELDS of an ion by field name."""
+    prefix = f"{peak_identification_prefix(entry_id)}ionID[ion{ion_id}]/"
+    return {field: sys.intern(f"{prefix}{field}") for field in ION_FIELDS}
+
+
+@lru_cache(maxsize=4096)
+def charge_state_analysis_paths(entry_id: int, ion_id: int) -> dict[str, str]:
+    """Interned template keys of all CHARGE_STATE_ANALYSIS_FIELDS of an ion."""
+    prefix = (
+        f"{peak_identification_prefix(entry_id)}ionID[ion{ion_id}]/"
+        f"charge_state_analysis/"
+    )
+    return {
+        field: sys.intern(f"{prefix}{field}") for field in CHARGE_STATE_ANALYSIS_FIELDS
+    }
+
+
+def index_keys_by_suffix(template: dict, suffixes: tuple[str, ...]) -> dict:
+    """Collect all keys of template which end with one of suffixes, by suffix."""
+    # an IndexedTemplate answers segment-aligned suffixes without a scan
+    if hasattr(template, "keys_with_suffix") and all(
+        suffix.startswith("/") for suffix in suffixes
+    ):
+        return {suffix: template.keys_with_suffix(suffix) for suffix in suffixes}
+    index: dict[str, list[str]] = {suffix: [] for suffix in suffixes}
+    for key in template:
+        if key.endswith(suffixes):
+            for suffix in suffixes:
+                if key.endswith(suffix):
+                    index[suffix].append(key)
+                    break
+    return index
@@ -0,0 +1,152 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Parse numeric columns of large text files blockwise in threads into float32."""
+
+# a first pass splits the file at line ends into blocks of about
+# TEXT_INGEST_BLOCK_SIZE byte and counts the rows per block, the result array is
+# then preallocated and the blocks are parsed in a thread pool, each block is read
+# by its worker, which releases the GIL, and parsed with np.fromstring, which holds
+# the GIL, the pool therefore overlaps reading with parsing but does not parse in
+# parallel, at most max_workers blocks are in memory next to the result array
+# the parser expects one row of numbers per line with the same number of columns,
+# the number of values is checked per line, if a line has a different number of
+# values, e.g. because of empty lines, text or missing values, None is returned
+# and callers fall back to their text reader
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from pynxtools_apm.utils.custom_logging import logger
+from pynxtools_apm.utils.stage_graph import get_available_cpus
+
+TEXT_INGEST_BLOCK_SIZE = 64 * 1024 * 1024  # byte
+
+
+def skip_lines(file_path: str, n_lines: int) -> tuple[int, list[bytes]]:
+    """Get the byte offset after the first n_lines and these lines."""
+    lines: list[bytes] = []
+    with open(file_path, "rb") as fp:
+        for _ in range(n_lines):
+            lines.append(fp.readline())
+        return fp.tell(), lines
+
+
+def split_into_blocks(
+    file_path: str, offset: int, block_size: int
+) -> list[tuple[int, int, int]]:
+    """Split the file from offset at line ends into (start, end, n_rows) blocks."""
+    blocks: list[tuple[int, int, int]] = []
+    file_size = os.path.getsize(file_path)
+    with open(file_path, "rb") as fp:
+        start = offset
+        while start < file_size:
+            fp.seek(start)
+            data = fp.read(block_size)
+            if start + len(data) < file_size:
+                end_of_line = data.rfind(b"\n")
+                if end_of_line >= 0:
+                    data = data[: end_of_line + 1]
+                n_rows = data.count(b"\n")
+            else:  # last line might lack a line end, trailing empty lines are ignored
+                data_end = data.rstrip()
+                n_rows = data_end.count(b"\n") + 1 if len(data_end) > 0 else 0
+            end = start + len(data)
+            blocks.append((start, end, n_rows))
+            start = end
+    return blocks
+
+
+def has_values_per_line(data: bytes, n_rows: int, n_columns: int) -> bool:
+    """Check that the first n_rows lines have n_columns values, the others none."""
+    if len(data) == 0:
+        return n_rows == 0
+    chars = np.frombuffer(data, np.uint8)
+    # whitespace and control characters are <= 32, a value starts with a
+    # character > 32 which follows such a character or the start of the block
+    is_space = chars <= 32
+    value_starts = np.empty(len(chars), np.uint8)
+    value_starts[0] = not is_space[0]
+    np.greater(is_space[:-1], is_space[1:], out=value_starts[1:])
+    line_starts = np.flatnonzero(chars == ord("\n")) + 1
+    line_starts = np.concatenate(([0], line_starts[line_starts < len(chars)]))
+    n_values = np.add.reduceat(value_starts, line_starts, dtype=np.uint32)
+    return bool(
+        np.all(n_values[:n_rows] == n_columns) and np.all(n_values[n_rows:] == 0)
+    )
+
+
+def parse_block(
+    file_path: str, start: int, end: int, delimiters: bytes, out: np.ndarray
+) -> bool:
+    """Parse the rows of the block into out, False if the block is malformed."""
+    with open(file_path, "rb") as fp:
+        fp.seek(start)
+        data = fp.read(end - start)
+    # whitespace is a separator of np.fromstring, delimiters are mapped on spaces
+    data = data.translate(bytes.maketrans(delimiters, b" " * len(delimiters)))
+    if not has_values_per_line(data, out.shape[0], out.shape[1]):
+        return False
+    try:
+        values = np.fromstring(data, dtype=np.float32, sep=" ")
+    except ValueError:
+        return False
+    if values.size != out.size:
+        return False
+    out[:] = values.reshape(out.shape)
+    return True
+
+
+def read_text_columns(
+    file_path: str,
+    n_header_lines: int = 0,
+    delimiters: bytes = b",;",
+    max_workers: int | None = None,
+    block_size: int = TEXT_INGEST_BLOCK_SIZE,
+) -> np.ndarray | None:
+    """Read all columns of a numeric text file into a (n_rows, n_columns) array."""
+    if max_workers is None:
+        max_workers = get_available_cpus()
+    offset, lines = skip_lines(file_path, n_header_lines + 1)
+    offset -= len(lines[-1])
+    n_columns = len(
+        lines[-1].translate(bytes.maketrans(delimiters, b" " * len(delimiters))).split()
+    )
+    blocks = split_into_blocks(file_path, offset, block_size)
+    n_rows = sum(block[2] for block in blocks)
+    if n_columns == 0 or n_rows == 0:
+        return None
+    values = np.empty((n_rows, n_columns), np.float32)
+    row_offsets = np.cumsum([0] + [block[2] for block in blocks])
+    with ThreadPoolExecutor(max_workers=max(max_workers, 1)) as executor:
+        parsed = executor.map(
+            lambda idx: parse_block(
+                file_path,
+                blocks[idx][0],
+                blocks[idx][1],
+                delimiters,
+                values[row_offsets[idx] : row_offsets[idx + 1]],
+            ),
+            range(len(blocks)),
+        )
+        is_valid = all(list(parsed))
+    if not is_valid:
+        logger.info(f"{file_path} is not a table of {n_columns} numeric columns")
+        return None
+    return values
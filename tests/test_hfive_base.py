@@ -0,0 +1,138 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import h5py
+import numpy as np
+
+from pynxtools_apm.parsers import hfive_base
+from pynxtools_apm.parsers.hfive_base import (
+    HdfFiveBaseParser,
+    get_sha256_of_dataset,
+    scan_dataset_payload,
+)
+from pynxtools_apm.utils.get_checksum import get_sha256_of_bytes_object
+
+
+def test_get_sha256_of_dataset(tmp_path):
+    file_path = tmp_path / "hashing.h5"
+    xyz = np.arange(3 * 1001, dtype=np.float32).reshape((1001, 3))
+    compound = np.zeros((77,), dtype=[("id", np.uint32), ("mq", np.float64)])
+    compound["id"] = np.arange(77)
+    compound["mq"] = np.linspace(0.0, 100.0, num=77)
+    with h5py.File(file_path, "w") as h5w:
+        h5w.create_dataset("contiguous", data=xyz)
+        h5w.create_dataset("chunked", data=xyz, chunks=(64, 3), compression="gzip")
+        h5w.create_dataset("compound", data=compound, chunks=(10,))
+        h5w.create_dataset("scalar", data=np.float64(42.0))
+        h5w.create_dataset("empty", data=np.zeros((0, 3), np.int8))
+
+    with h5py.File(file_path, "r") as h5r:
+        for name in ("contiguous", "chunked", "compound", "scalar", "empty"):
+            expected = get_sha256_of_bytes_object(h5r[name][()])
+            # small slabs to make sure the payload is split into many blocks
+            assert get_sha256_of_dataset(h5r[name], max_slab_size=100) == expected
+            assert get_sha256_of_dataset(h5r[name]) == expected
+        for field_name in ("id", "mq"):
+            expected = get_sha256_of_bytes_object(
+                h5r["compound"].fields(field_name)[()]
+            )
+            assert (
+                get_sha256_of_dataset(h5r["compound"], field_name, max_slab_size=16)
+                == expected
+            )
+
+
+def test_parallel_hashing(tmp_path, monkeypatch):
+    file_path = tmp_path / "parallel.h5"
+    with h5py.File(file_path, "w") as h5w:
+        grp = h5w.create_group("entry1/reconstruction")
+        grp.create_dataset("xyz", data=np.arange(3000, dtype=np.float32), chunks=(64,))
+        grp.create_dataset("mq", data=np.linspace(0.0, 1.0, num=1000))
+        grp.create_dataset("name", data="test")
+        grp.attrs["depends_on"] = "."
+
+    # hash everything but the scalar string in the process pool
+    monkeypatch.setattr(hfive_base, "HFIVE_HASHING_PARALLEL_MIN_SIZE", 1)
+    artifacts = []
+    for max_workers in (1, 2):
+        hfive_parser = HdfFiveBaseParser(
+            file_path=str(file_path), hashing=True, max_workers=max_workers
+        )
+        hfive_parser.get_content()
+        hfive_parser.store_hashes(
+            blacklist_by_key=[],
+            blacklist_by_suffix=(),
+            file_path=f"{file_path}.{max_workers}.yaml",
+        )
+        with open(f"{file_path}.{max_workers}.yaml") as fp:
+            artifacts.append(fp.read())
+    assert artifacts[0] == artifacts[1]
+
+
+def test_scan_dataset_payload(tmp_path):
+    file_path = tmp_path / "scanning.h5"
+    mq = np.linspace(-1.0, 100.0, num=1000, dtype=np.float32)
+    mq[[3, 500]] = np.nan
+    mq[999] = np.inf
+    with h5py.File(file_path, "w") as h5w:
+        h5w.create_dataset("mq", data=mq, chunks=(100,))
+        h5w.create_dataset("ids", data=np.arange(10, dtype=np.uint8))
+
+    with h5py.File(file_path, "r") as h5r:
+        sha, stats = scan_dataset_payload(h5r["mq"], max_slab_size=256)
+        assert sha == get_sha256_of_bytes_object(mq)
+        assert stats["finiteness"] == "not_all_finite"
+        assert stats["n_values"] == 1000
+        assert stats["n_finite"] == 997
+        assert stats["n_nan"] == 2
+        assert stats["n_non_finite"] == 3
+        assert stats["min"] == -1.0
+        assert stats["max"] == float(mq[998])
+        sha, stats = scan_dataset_payload(h5r["ids"], hashing=False)
+        assert sha == ""
+        assert stats["finiteness"] == "all_finite"
+        assert (stats["min"], stats["max"]) == (0, 9)
+
+
+def test_compound_subarray_field_signature(tmp_path, monkeypatch):
+    file_path = tmp_path / "subarray.h5"
+    compound = np.zeros((50,), dtype=[("xyz", np.float32, (3,)), ("mq", np.float32)])
+    compound["xyz"] = np.arange(150, dtype=np.float32).reshape((50, 3))
+    compound["mq"] = np.linspace(0.0, 100.0, num=50)
+    with h5py.File(file_path, "w") as h5w:
+        h5w.create_dataset("compound", data=compound, chunks=(8,))
+
+    monkeypatch.setattr(hfive_base, "HFIVE_HASHING_PARALLEL_MIN_SIZE", 1)
+    for max_workers in (1, 2):
+        hfive_parser = HdfFiveBaseParser(
+            file_path=str(file_path),
+            hashing=True,
+            malformed=True,
+            max_workers=max_workers,
+        )
+        hfive_parser.get_content()
+        for field_name, shape in (("xyz", (50, 3)), ("mq", (50,))):
+            dataset = hfive_parser.datasets[f"compound/#{field_name}"]
+            # element dtype as prefix and non_iufc, as for the compound itself
+            expected = get_sha256_of_bytes_object(
+                np.ascontiguousarray(compound[field_name])
+            )
+            assert dataset[1] == np.float32
+            assert dataset[2] == shape
+            assert dataset[4] == f"float32__{expected}"
+            assert dataset[5]["finiteness"] == "non_iufc"
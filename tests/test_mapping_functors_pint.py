@@ -0,0 +1,83 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+import numpy as np
+import pytest
+
+from pynxtools_apm.concepts.mapping_functors_pint import (
+    add_specific_metadata_pint,
+    compile_var_path,
+    get_mapping_plan,
+    resolve_var_path,
+    var_path_to_specific_path,
+)
+from pynxtools_apm.utils.pint_custom_unit_registry import convert_to, ureg
+
+
+@pytest.mark.parametrize(
+    "path,ids",
+    [
+        ("/ENTRY[entry*]/userID[user*]/name", [1, 2]),
+        ("/ENTRY[entry*]/userID[user*]/name", [1]),
+        ("/ENTRY[entry1]/name", []),
+    ],
+)
+def test_resolve_var_path(path, ids):
+    assert resolve_var_path(compile_var_path(path), ids) == (
+        var_path_to_specific_path(path, ids)
+    )
+
+
+def test_add_specific_metadata_pint():
+    cfg = {
+        "prefix_trg": "/ENTRY[entry*]/measurement",
+        "prefix_src": ["a/", "b/"],
+        "use": [("status", "success")],
+        "map": ["name", ("voltage", ureg.kilovolt, "hv", ureg.volt)],
+        "map_to_u4": [("count", "n")],
+    }
+    template: dict = {}
+    add_specific_metadata_pint(
+        cfg, {"a/name": "x", "a/hv": 5000.0, "b/n": 3}, [1], template
+    )
+    assert get_mapping_plan(cfg) is get_mapping_plan(cfg)
+    assert template["/ENTRY[entry1]/measurement/status"] == "success"
+    assert template["/ENTRY[entry1]/measurement/name"] == "x"
+    assert template["/ENTRY[entry1]/measurement/voltage"] == 5.0
+    assert template["/ENTRY[entry1]/measurement/voltage/@units"] == "kilovolt"
+    assert template["/ENTRY[entry1]/measurement/count"] == 3
+
+
+@pytest.mark.parametrize(
+    "magnitude,src_unit,trg_unit",
+    [
+        (5000.0, ureg.volt, ureg.kilovolt),
+        (np.float32(3.0), "nm", "m"),
+        (20.0, ureg.degC, ureg.kelvin),
+        ([1, 2], ureg.picosecond, ureg.nanosecond),
+        (np.arange(3), ureg.kelvin, ureg.kelvin),
+    ],
+)
+def test_convert_to(magnitude, src_unit, trg_unit):
+    expected = ureg.Quantity(magnitude, src_unit).to(trg_unit)
+    # twice to use the cached conversion the second time
+    for _ in range(2):
+        qnt = convert_to(magnitude, src_unit, trg_unit)
+        assert qnt.units == expected.units
+        assert np.allclose(qnt.magnitude, expected.magnitude, rtol=1.0e-12)
@@ -26,11 +26,13 @@ from pynxtools.dataconverter.convert import convert, get_reader
 from pynxtools.dataconverter.helpers import get_nxdl_root_and_path
 
 # from pynxtools.testing.nexus_conversion import ReaderTest
+import pynxtools_apm.reader
 from pynxtools_apm.parsers.hfive_base import (
     NXAPM_VOLATILE_NAMED_HDF_PATHS,
     NXAPM_VOLATILE_SUFFIX_HDF_PATHS,
     HdfFiveBaseParser,
 )
+from pynxtools_apm.utils.generate_synthetic_data import ApmCreateExampleData
 
 READER_NAME = "apm"
 READER_CLASS = get_reader(READER_NAME)
@@ -176,3 +178,44 @@ def test_nexus_conversion(nxdl, sub_reader_data_dir, tmp_path, caplog):
     # test.check_reproducibility_of_nexus()
 
     # TODO remove if not working
+
+
+def test_reader_threads_reproducible(tmp_path, caplog, monkeypatch):
+    """Conversions with concurrent parsing stages equal sequential ones."""
+    dataset = ApmCreateExampleData(7, 10_000)
+    for suffix in (".epos", ".rrng"):
+        dataset.write(str(tmp_path / f"synthetic{suffix}"))
+    files = [str(tmp_path / "synthetic.epos"), str(tmp_path / "synthetic.rrng")]
+    files += sorted(
+        glob(os.path.join(os.path.dirname(__file__), "data", "default", "*"))
+    )
+
+    artifacts = []
+    # run the stages concurrently also on machines with a single core
+    monkeypatch.setattr(pynxtools_apm.reader, "get_available_cpus", lambda: 4)
+    for reader_threads in (1, 4):
+        monkeypatch.setattr(pynxtools_apm.reader, "READER_THREADS", reader_threads)
+        trg_path = tmp_path / f"threads{reader_threads}"
+        trg_path.mkdir()
+        convert_using_example_data(files, trg_path, caplog)
+        hfive_parser = HdfFiveBaseParser(
+            file_path=f"{trg_path}/output.nxs", hashing=True, verbose=False
+        )
+        hfive_parser.get_content()
+        hfive_parser.store_hashes(
+            blacklist_by_key=NXAPM_VOLATILE_NAMED_HDF_PATHS,
+            blacklist_by_suffix=NXAPM_VOLATILE_SUFFIX_HDF_PATHS,
+            file_path=f"{trg_path}/output.nxs.sha256.yaml",
+        )
+        with open(f"{trg_path}/output.nxs.sha256.yaml") as fp:
+            artifact = yaml.safe_load(fp)
+        # hashes of object attributes are taken over the pointers of the array
+        artifacts.append(
+            {
+                key: value
+                for key, value in artifact.items()
+                if "__object__" not in f"{value}"
+                and not key.endswith("template_filling_elapsed_time")
+            }
+        )
+    assert artifacts[0] == artifacts[1]
@@ -0,0 +1,43 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import numpy as np
+import pytest
+
+from pynxtools_apm.utils.chunk_tuner import MAX_CHUNK_SIZE, tune_chunk_shape
+
+
+@pytest.mark.parametrize(
+    "shape,dtype,field_class,axes,chunks",
+    [
+        ((10_000_000, 3), np.float32, "positions", (0, 1), (16384, 3)),
+        ((100, 3), np.float32, "positions", (0, 1), (100, 3)),
+        ((10_000_000,), np.float32, "mass_to_charge", (0,), (262144,)),
+        ((7, 32), np.uint16, "metadata", (0, 1), (7, 32)),
+    ],
+)
+def test_tune_chunk_shape(shape, dtype, field_class, axes, chunks):
+    values = np.broadcast_to(np.zeros(1, dtype), shape)
+    assert tune_chunk_shape(values, field_class, axes) == chunks
+
+
+def test_tune_chunk_shape_viewer():
+    values = np.broadcast_to(np.zeros(1, np.uint32), (300, 300, 300))
+    chunks = tune_chunk_shape(values, "histograms", (0, 1, 2))
+    assert chunks[1:] == (300, 300)
+    assert np.prod(chunks) * values.itemsize <= MAX_CHUNK_SIZE
@@ -0,0 +1,94 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import h5py
+import numpy as np
+import pytest
+
+from pynxtools_apm.utils.compression_policy import (
+    COMPRESSION_MIN_SIZE_ENV_VAR,
+    COMPRESSION_POLICIES,
+    COMPRESSION_POLICY_ENV_VAR,
+    FIELD_CLASSES,
+    get_compression_policy,
+    get_hdf5_dataset_kwargs,
+    get_staged_values,
+    stage_compressed,
+    use_compression_policy,
+)
+
+
+@pytest.mark.parametrize("policy", list(COMPRESSION_POLICIES))
+def test_compression_policies(policy):
+    assert set(COMPRESSION_POLICIES[policy]) == set(FIELD_CLASSES)
+    for settings in COMPRESSION_POLICIES[policy].values():
+        assert settings["filter"] in ("gzip", "blosc")
+        assert 0 <= settings["strength"] <= 9
+
+
+def test_stage_compressed(monkeypatch):
+    values = np.zeros((1000, 3), np.float32)
+    # by default all fields are stored with gzip level 9 as before the policies
+    monkeypatch.delenv(COMPRESSION_POLICY_ENV_VAR, raising=False)
+    staged = stage_compressed(values, "positions", (0, 1))
+    assert (staged["filter"], staged["strength"]) == ("gzip", 9)
+    monkeypatch.setenv(COMPRESSION_POLICY_ENV_VAR, "fastest")
+    assert get_compression_policy() == "fastest"
+    staged = stage_compressed(values, "positions", (0, 1))
+    assert staged["compress"] is values
+    assert (
+        staged["strength"] == COMPRESSION_POLICIES["fastest"]["positions"]["strength"]
+    )
+    assert len(staged["chunks"]) == 2
+
+    with use_compression_policy("archival"):
+        staged = stage_compressed(values, "positions", (0, 1))
+        assert (
+            staged["filter"] == COMPRESSION_POLICIES["archival"]["positions"]["filter"]
+        )
+    assert get_compression_policy() == "fastest"
+
+    with pytest.raises(ValueError):
+        with use_compression_policy("unknown"):
+            pass
+
+
+def test_compression_min_size(monkeypatch):
+    values = np.zeros((32,), np.uint16)
+    assert stage_compressed(values, "metadata") is values
+    assert get_staged_values(values) is values
+    monkeypatch.setenv(COMPRESSION_MIN_SIZE_ENV_VAR, "0")
+    staged = stage_compressed(values, "metadata")
+    assert get_staged_values(staged) is values
+
+
+def test_get_hdf5_dataset_kwargs(tmp_path):
+    number_of_pulses = np.repeat(np.arange(1000, dtype=np.uint32), 4)
+    staged = stage_compressed(number_of_pulses, "ion_labels")
+    # like the pynxtools writer, only filter, strength and chunks are honoured
+    assert set(staged) == {"compress", "filter", "strength", "chunks"}
+    with h5py.File(tmp_path / "staged.h5", "w") as h5w:
+        dst = h5w.create_dataset(
+            "number_of_pulses",
+            data=number_of_pulses,
+            **get_hdf5_dataset_kwargs(staged),
+        )
+        assert dst.compression == "gzip"
+        assert dst.compression_opts == staged["strength"]
+        assert not dst.shuffle
+        assert np.array_equal(dst[...], number_of_pulses)
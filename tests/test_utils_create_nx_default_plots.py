@@ -0,0 +1,50 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import numpy as np
+
+from pynxtools_apm.utils.create_nx_default_plots import (
+    apm_default_plot_generator,
+    get_min_max_decimation_indices,
+)
+
+
+def test_get_min_max_decimation_indices():
+    rng = np.random.default_rng(42)
+    voltage = np.cumsum(rng.normal(size=100_001)).astype(np.float32)
+    assert np.array_equal(
+        get_min_max_decimation_indices(voltage, 200_000), np.arange(100_001)
+    )
+    selected = get_min_max_decimation_indices(voltage, 1000)
+    assert np.shape(selected)[0] <= 1002
+    assert np.all(np.diff(selected) > 0)
+    # the envelope of the preview is the one of the complete curve
+    assert np.min(voltage[selected]) == np.min(voltage)
+    assert np.max(voltage[selected]) == np.max(voltage)
+    assert np.argmax(voltage) in selected
+
+
+def test_default_plot_voltage_curve_preview():
+    template: dict = {}
+    for name in ("voltage_curve", "voltage_curve_preview"):
+        template[f"/ENTRY[entry1]/measurement/DATA[{name}]/DATA[voltage]"] = np.zeros(
+            (4,), np.float32
+        )
+    apm_default_plot_generator(template, 1)
+    assert template["/ENTRY[entry1]/measurement/@default"] == "voltage_curve_preview"
+    assert template["/@default"] == "entry1"
@@ -0,0 +1,85 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+
+import h5py
+import numpy as np
+import pytest
+
+from pynxtools_apm.parsers.ifes_ranging import IfesRangingDefinitionsParser
+from pynxtools_apm.parsers.ifes_reconstruction import IfesReconstructionParser
+from pynxtools_apm.utils.file_pool import FilePool, get_file_checksum
+
+N_IONS = 1000
+
+
+@pytest.fixture
+def cameca_file_path(tmp_path):
+    file_path = str(tmp_path / "synthetic.hdf5")
+    with h5py.File(file_path, "w") as h5w:
+        h5w.create_dataset("mass", data=np.full((N_IONS,), 27.0, np.float32))
+        h5w.create_dataset("xyz", data=np.zeros((N_IONS, 3), np.float32))
+        grp = h5w.create_group("ranges/range_1")
+        grp.attrs["element"] = "Al"
+        grp.attrs["min_da"] = np.float64(26.5)
+        grp.attrs["max_da"] = np.float64(27.5)
+    return file_path
+
+
+def test_file_pool_get():
+    n_calls = []
+
+    def factory():
+        n_calls.append(1)
+        return object()
+
+    with FilePool() as pool:
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            values = set(executor.map(lambda _: pool.get(("key",), factory), range(8)))
+    assert len(values) == 1 and len(n_calls) == 1
+    assert len(pool.entries) == 0
+    with pytest.raises(ValueError):
+        pool.get(("key",), factory)
+
+
+def test_file_pool_shares_multi_role_reader(cameca_file_path):
+    with FilePool([cameca_file_path]) as pool:
+        templates: list[dict] = [{}, {}]
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            for future in [
+                executor.submit(
+                    copy_context().run,
+                    IfesReconstructionParser(cameca_file_path, 1).parse,
+                    templates[0],
+                ),
+                executor.submit(
+                    copy_context().run,
+                    IfesRangingDefinitionsParser(cameca_file_path, 1).parse,
+                    templates[1],
+                ),
+            ]:
+                future.result()
+        assert [key[0] for key in pool.entries] == ["reader"]
+        assert get_file_checksum(cameca_file_path) == pool.get_checksum(
+            cameca_file_path
+        )
+        assert len(pool.entries) == 2
+    prefix = "/ENTRY[entry1]/atom_probeID[atom_probe]"
+    assert f"{prefix}/reconstruction/reconstructed_positions" in templates[0]
+    assert f"{prefix}/ranging/peak_identification/number_of_ion_types" in templates[1]
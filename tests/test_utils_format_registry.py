@@ -0,0 +1,75 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+import pytest
+
+from pynxtools_apm.utils import format_registry
+from pynxtools_apm.utils.format_registry import (
+    FileFormat,
+    detect_file_format,
+    get_file_formats,
+    get_file_name_suffixes,
+    get_reader_spec,
+    register_file_format,
+)
+from pynxtools_apm.utils.io_case_logic import ApmUseCaseSelector
+from pynxtools_apm.utils.lazy_import import load_object
+
+
+@pytest.mark.parametrize(
+    "file_path,role,name",
+    [
+        ("R5076_42.POS", "", "pos"),
+        ("R5076_42.pos", "ranging", None),
+        ("sample_range_.h5", "", "pyccapt_ranging"),
+        ("sample_range_.h5", "reconstruction", "pyccapt_calibration"),
+        ("sample.fig.txt", "", "fig_txt"),
+        ("sample.analysisset", "", "analysisset"),
+        ("sample.hdf5", "ranging", "cameca_hdf5"),
+    ],
+)
+def test_detect_file_format(file_path, role, name):
+    file_format = detect_file_format(file_path, role)
+    assert (file_format.name if file_format is not None else None) == name
+
+
+def test_detect_file_format_magic(tmp_path):
+    file_path = tmp_path / "not_hdf5.hdf5"
+    file_path.write_bytes(b"plain text")
+    assert detect_file_format(str(file_path), "reconstruction") is None
+
+
+def test_get_reader_spec():
+    for file_format in get_file_formats(plugins=False):
+        assert callable(load_object(file_format.reader))
+    assert get_reader_spec("cameca_hdf5", "ranging") == get_reader_spec(
+        "cameca_hdf5", "reconstruction"
+    )
+    with pytest.raises(ValueError):
+        get_reader_spec("pos", "ranging")
+
+
+def test_register_file_format(monkeypatch):
+    monkeypatch.setattr(format_registry, "FILE_FORMATS", [])
+    monkeypatch.setattr(format_registry, "FILE_FORMAT_PLUGINS_LOADED", True)
+    register_file_format(
+        FileFormat("root", "reconstruction", (".root",), "camecaroot:extract")
+    )
+    assert get_file_name_suffixes("reconstruction") == [".root"]
+    assert ApmUseCaseSelector(("a.root",)).reconstruction == ["a.root"]
@@ -0,0 +1,74 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import numpy as np
+import pytest
+
+from pynxtools_apm.parsers.ifes_ranging import IfesRangingDefinitionsParser
+from pynxtools_apm.parsers.ifes_reconstruction import IfesReconstructionParser
+from pynxtools_apm.utils.generate_synthetic_data import (
+    ApmCreateExampleData,
+    sample_categories,
+)
+
+N_IONS = 5000
+
+
+def test_synthetic_data_is_deterministic(tmp_path):
+    for synthesis_id in (1, 2):
+        ApmCreateExampleData(7, N_IONS).write(str(tmp_path / f"{synthesis_id}.pos"))
+    assert (tmp_path / "1.pos").read_bytes() == (tmp_path / "2.pos").read_bytes()
+    assert (tmp_path / "1.pos").stat().st_size == N_IONS * 16
+
+
+def test_sample_categories():
+    rng = np.random.default_rng(seed=7)
+    categories = sample_categories(rng, [1.0, 0.0, 3.0], 100000)
+    assert set(np.unique(categories)) == {0, 2}
+    assert np.isclose(np.mean(categories == 2), 0.75, atol=0.01)
+
+
+@pytest.mark.parametrize("suffix", [".pos", ".epos", ".apt"])
+def test_synthetic_reconstruction(tmp_path, suffix):
+    # small chunks to test that streaming the chunks matches creating all at once
+    dataset = ApmCreateExampleData(7, N_IONS, chunk_size=N_IONS // 7)
+    dataset.write(str(tmp_path / f"synthetic{suffix}"))
+    dataset = ApmCreateExampleData(7, N_IONS)
+    dataset.create()
+    template: dict = {}
+    IfesReconstructionParser(str(tmp_path / f"synthetic{suffix}"), 1).parse(template)
+    prefix = "/ENTRY[entry1]/atom_probeID[atom_probe]"
+    assert np.array_equal(
+        template[f"{prefix}/reconstruction/reconstructed_positions"]["compress"],
+        dataset.xyz,
+    )
+    assert np.array_equal(
+        template[f"{prefix}/mass_to_charge_conversion/mass_to_charge"]["compress"],
+        dataset.m_z,
+    )
+
+
+@pytest.mark.parametrize("suffix", [".rrng", ".rng"])
+def test_synthetic_ranging(tmp_path, suffix):
+    dataset = ApmCreateExampleData(7, N_IONS)
+    dataset.write(str(tmp_path / f"synthetic{suffix}"))
+    template: dict = {}
+    IfesRangingDefinitionsParser(str(tmp_path / f"synthetic{suffix}"), 1).parse(
+        template
+    )
+    trg = "/ENTRY[entry1]/atom_probeID[atom_probe]/ranging/peak_identification"
+    assert template[f"{trg}/number_of_ion_types"] == len(dataset.nrm_composition) + 1
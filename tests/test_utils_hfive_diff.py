@@ -0,0 +1,72 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+import h5py
+import numpy as np
+
+from pynxtools_apm.parsers.hfive_base import HdfFiveBaseParser
+from pynxtools_apm.utils.hfive_diff import HdfFiveDiff
+
+
+def write_example(file_path: str, shift: float = 0.0, n_ions: int = 100):
+    with h5py.File(file_path, "w") as h5w:
+        grp = h5w.create_group("entry1/reconstruction")
+        grp.attrs["NX_class"] = "NXreconstruction"
+        grp.create_dataset("mass_to_charge", data=np.arange(n_ions) + shift)
+        grp.create_dataset("name", data="test")
+        grp.create_group("naive_discretization")
+
+
+def test_hfive_diff(tmp_path):
+    ref_file_path = str(tmp_path / "ref.nxs")
+    write_example(ref_file_path)
+    ref_parser = HdfFiveBaseParser(file_path=ref_file_path, hashing=True)
+    ref_parser.get_content()
+    ref_parser.store_hashes(
+        blacklist_by_key=[], blacklist_by_suffix=(), file_path=f"{ref_file_path}.yaml"
+    )
+
+    same_file_path = str(tmp_path / "same.nxs")
+    write_example(same_file_path)
+    for reference in (ref_file_path, f"{ref_file_path}.yaml"):
+        diff = HdfFiveDiff(same_file_path, reference)
+        diff.compare()
+        assert diff.is_equal()
+
+    other_file_path = str(tmp_path / "other.nxs")
+    write_example(other_file_path, shift=1.0)
+    with h5py.File(other_file_path, "a") as h5w:
+        del h5w["entry1/reconstruction/naive_discretization"]
+        h5w["entry1/reconstruction/name"].attrs["units"] = "m"
+        del h5w["entry1/reconstruction/name"]
+        h5w["entry1/reconstruction/name"] = np.float32(1.0)
+    for reference in (ref_file_path, f"{ref_file_path}.yaml"):
+        diff = HdfFiveDiff(other_file_path, reference)
+        delta = diff.compare()
+        assert list(delta["missing"]) == ["entry1/reconstruction/naive_discretization"]
+        assert list(delta["unexpected"]) == []
+        assert list(delta["structure"]) == ["entry1/reconstruction/name"]
+        assert list(delta["content"]) == ["entry1/reconstruction/mass_to_charge"]
+        diff = HdfFiveDiff(
+            other_file_path,
+            reference,
+            blacklist_by_suffix=("naive_discretization", "mass_to_charge", "name"),
+        )
+        diff.compare()
+        assert diff.is_equal()
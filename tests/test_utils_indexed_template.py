@@ -0,0 +1,56 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import numpy as np
+from pynxtools.dataconverter.template import Template
+
+from pynxtools_apm.utils.indexed_template import IndexedTemplate
+from pynxtools_apm.utils.remove_uninstantiated import remove_uninstantiated_sensors
+
+
+def test_indexed_template():
+    template = IndexedTemplate(Template())
+    prefix = "/ENTRY[entry1]/measurement/eventID[event1]/instrument"
+    template[f"{prefix}/stage/temperature_sensor/measurement"] = "temperature"
+    template[f"{prefix}/analysis_chamber/pressure_sensor/measurement"] = "pressure"
+    template[f"{prefix}/analysis_chamber/pressure_sensor/value"] = np.zeros(
+        (10,), np.float64
+    )
+    template["/ENTRY[entry1]/measurement_old"] = "not below the prefix"
+    template["/ENTRY[entry1]/specimen/name"] = None
+    assert "/ENTRY[entry1]/specimen/name" not in template
+    assert len(template) == 4
+
+    assert len(template.keys_with_prefix("/ENTRY[entry1]/measurement")) == 3
+    assert len(template.keys_with_suffix("/measurement")) == 2
+    assert template.keys_with_suffix("/pressure_sensor/value") == [
+        f"{prefix}/analysis_chamber/pressure_sensor/value"
+    ]
+    assert template.subtree_stats("/ENTRY[entry1]", 1) == {
+        "/ENTRY[entry1]/measurement": (3, 11 + 8 + 80),
+        "/ENTRY[entry1]/measurement_old": (1, 20),
+    }
+
+    for key in template:
+        if key.endswith("_old"):
+            del template[key]
+    remove_uninstantiated_sensors(template, 1)
+    assert len(template) == 1
+    assert len(template.template.keys()) == 1
+    assert template.keys_with_suffix("/measurement") == []
+    assert template.subtree_stats("/", 1) == {"/ENTRY[entry1]": (1, 80)}
@@ -0,0 +1,85 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import numpy as np
+from ifes_apt_tc_data_modeling.utils.nx_ion import NxIon
+from ifes_apt_tc_data_modeling.utils.utils import nuclide_hash_to_nuclide_list
+
+from pynxtools_apm.utils.compression_policy import get_staged_values
+from pynxtools_apm.utils.ion_table import IonTable
+from pynxtools_apm.utils.template_paths import charge_state_analysis_paths, ion_paths
+
+
+def get_nx_ions() -> list:
+    ion_lst = []
+    for atoms, mqmin, mqmax in (
+        (["Fe"], 27.5, 28.5),
+        (["Ti", "O"], 31.5, 32.5),
+        (["Ni"], 29.0, 30.0),
+    ):
+        ion = NxIon(atoms, charge_state=0)
+        ion.add_range(mqmin, mqmax)
+        ion.apply_combinatorics()
+        ion_lst.append(ion)
+    ion = NxIon(["Al"], charge_state=0)
+    ion.add_range(26.5, 27.5)
+    ion.add_range(13.3, 13.7)
+    ion_lst.append(ion)
+    return ion_lst
+
+
+def test_ion_table():
+    ion_lst = get_nx_ions()
+    ion_table = IonTable.from_nx_ions(ion_lst)
+    assert len(ion_table) == len(ion_lst)
+    for ion_idx, ion in enumerate(ion_lst):
+        assert np.array_equal(ion_table.get_ranges(ion_idx), ion.ranges.magnitude)
+        n_cand = ion.charge_state_model.get("n_cand", 0)
+        cands = ion_table.get_candidates(ion_idx)
+        assert len(cands) == n_cand
+        if n_cand > 0:
+            assert np.array_equal(
+                cands["mass"], np.reshape(ion.charge_state_model["mass"], (n_cand,))
+            )
+        assert np.array_equal(
+            ion_table.get_nuclide_lists()[ion_idx],
+            nuclide_hash_to_nuclide_list(ion.nuclide_hash),
+        )
+    assert np.array_equal(
+        ion_table.label(np.asarray([0.5, 28.0, 32.0, 29.5, 27.0, 13.5], np.float32)),
+        [0, 1, 2, 3, 4, 4],
+    )
+
+    template: dict = {}
+    ion_table.to_template(template, 1)
+    assert template[ion_paths(1, 4)["mass_to_charge_range"]].shape == (2, 2)
+    assert template[ion_paths(1, 1)["name"]] == ion_lst[0].name
+    assert ion_paths(1, 4)["name"] in template
+    keys = charge_state_analysis_paths(1, 2)
+    assert get_staged_values(template[keys["mass"]]).dtype == np.float64
+    assert charge_state_analysis_paths(1, 4)["config/min_abundance"] not in template
+
+
+def test_ion_table_small_candidates_uncompressed():
+    ion_lst = get_nx_ions()
+    template: dict = {}
+    IonTable.from_nx_ions(ion_lst).to_template(template, 1)
+    keys = charge_state_analysis_paths(1, 2)
+    # candidates of an ion type are below COMPRESSION_MIN_SIZE and staged as is
+    for field in ("nuclide_hash", "charge_state", "mass", "shortest_half_life"):
+        assert isinstance(template[keys[field]], np.ndarray)
+    assert keys["mass/@units"] in template
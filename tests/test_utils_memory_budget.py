@@ -0,0 +1,64 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import numpy as np
+import pytest
+
+from pynxtools_apm.parsers.ifes_reconstruction import IfesReconstructionParser
+from pynxtools_apm.utils.format_registry import detect_file_format
+from pynxtools_apm.utils.memory_budget import MemoryPlan
+
+N_IONS = 1000
+
+
+@pytest.fixture
+def epos_file_path(tmp_path):
+    file_path = tmp_path / "synthetic.epos"
+    records = np.zeros((N_IONS, 11), ">f4")
+    records[:, 3] = 27.0
+    records.tofile(file_path)
+    return str(file_path)
+
+
+@pytest.mark.parametrize(
+    "budget,decision,has_hit_positions",
+    [
+        (0, "full", True),
+        (N_IONS * 44 * 2, "full", True),
+        (N_IONS * 40, "skip_optional", False),
+        (N_IONS, "over_budget", False),
+    ],
+)
+def test_memory_plan(epos_file_path, budget, decision, has_hit_positions):
+    memory_plan = MemoryPlan(
+        detect_file_format(epos_file_path, "reconstruction"), epos_file_path, budget
+    )
+    assert memory_plan.decision == decision
+    assert memory_plan.as_dict()["budget"] == budget
+
+    parser = IfesReconstructionParser(epos_file_path, 1)
+    parser.memory_plan = memory_plan
+    template: dict = {}
+    parser.parse(template)
+    prefix = "/ENTRY[entry1]/atom_probeID[atom_probe]"
+    assert f"{prefix}/reconstruction/reconstructed_positions" in template
+    assert (f"{prefix}/hit_finding/hit_positions" in template) == has_hit_positions
+    assert (
+        "/ENTRY[entry1]/measurement/eventID[event1]/instrument/pulser/pulse_voltage"
+        in template
+    ) == has_hit_positions
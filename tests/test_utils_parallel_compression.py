@@ -0,0 +1,120 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import os
+from glob import glob
+
+import h5py
+import numpy as np
+import yaml
+from click.testing import CliRunner
+from pynxtools.dataconverter.convert import convert
+
+from pynxtools_apm.parsers.hfive_base import (
+    NXAPM_VOLATILE_NAMED_HDF_PATHS,
+    NXAPM_VOLATILE_SUFFIX_HDF_PATHS,
+    HdfFiveBaseParser,
+)
+from pynxtools_apm.utils.generate_synthetic_data import ApmCreateExampleData
+from pynxtools_apm.utils.parallel_compression import (
+    repack,
+    repack_nexus_file,
+    write_compressed_chunks,
+)
+
+
+def test_write_compressed_chunks_and_repack(tmp_path):
+    rng = np.random.default_rng(42)
+    number_of_pulses = np.cumsum(rng.integers(0, 3, 100_003), dtype=np.uint32)
+    positions = rng.normal(size=(10_001, 3)).astype(np.float32)
+    file_path = str(tmp_path / "parallel.nxs")
+    with h5py.File(file_path, "w") as h5w:
+        entry = h5w.create_group("entry1")
+        entry.attrs["NX_class"] = "NXentry"
+        write_compressed_chunks(
+            entry,
+            "number_of_pulses",
+            number_of_pulses,
+            (4096,),
+            1,
+            shuffle=True,
+            max_workers=2,
+        )
+        write_compressed_chunks(entry, "positions", positions, (1024, 3), 1)
+        entry["link"] = h5py.SoftLink("/entry1/positions")
+
+    repacked_file_path = str(tmp_path / "repacked.nxs")
+    repack_nexus_file(file_path, repacked_file_path, 9, min_size=0, max_workers=2)
+    for path in (file_path, repacked_file_path):
+        with h5py.File(path, "r") as h5r:
+            assert h5r["entry1"].attrs["NX_class"] == "NXentry"
+            assert h5r["entry1/number_of_pulses"].shuffle
+            assert np.array_equal(h5r["entry1/number_of_pulses"][...], number_of_pulses)
+            assert np.array_equal(h5r["entry1/positions"][...], positions)
+            assert np.array_equal(h5r["entry1/link"][...], positions)
+    with h5py.File(repacked_file_path, "r") as h5r:
+        assert h5r["entry1/positions"].compression_opts == 9
+
+
+def get_hashes(file_path: str) -> dict:
+    hfive_parser = HdfFiveBaseParser(file_path=file_path, hashing=True, verbose=False)
+    hfive_parser.get_content()
+    hfive_parser.store_hashes(
+        blacklist_by_key=NXAPM_VOLATILE_NAMED_HDF_PATHS,
+        blacklist_by_suffix=NXAPM_VOLATILE_SUFFIX_HDF_PATHS,
+        file_path=f"{file_path}.sha256.yaml",
+    )
+    with open(f"{file_path}.sha256.yaml") as fp:
+        # hashes of object attributes are taken over the pointers of the array
+        return {
+            key: value
+            for key, value in yaml.safe_load(fp).items()
+            if "__object__" not in f"{value}"
+        }
+
+
+def test_repack_reader_output(tmp_path):
+    dataset = ApmCreateExampleData(7, 10_000)
+    for suffix in (".epos", ".rrng"):
+        dataset.write(str(tmp_path / f"synthetic{suffix}"))
+    files = [str(tmp_path / "synthetic.epos"), str(tmp_path / "synthetic.rrng")]
+    files += sorted(
+        glob(os.path.join(os.path.dirname(__file__), "data", "default", "*"))
+    )
+    file_path = str(tmp_path / "output.nxs")
+    convert(
+        input_file=tuple(files),
+        reader="apm",
+        nxdl="NXapm",
+        skip_verify=False,
+        ignore_undocumented=True,
+        output=file_path,
+    )
+
+    repacked_file_path = str(tmp_path / "repacked.nxs")
+    result = CliRunner().invoke(
+        repack, [file_path, repacked_file_path, "--strength", "4", "--min-size", "0"]
+    )
+    assert result.exit_code == 0, result.output
+    trg = "entry1/atom_probe/reconstruction/reconstructed_positions"
+    with h5py.File(repacked_file_path, "r") as h5r:
+        assert h5r[trg].compression_opts == 4
+    assert get_hashes(repacked_file_path) == get_hashes(file_path)
+
+    result = CliRunner().invoke(repack, [file_path, file_path])
+    assert result.exit_code != 0
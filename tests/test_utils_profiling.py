@@ -0,0 +1,69 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import json
+
+from pynxtools_apm.concepts.mapping_functors_pint import add_specific_metadata_pint
+from pynxtools_apm.utils.pint_custom_unit_registry import ureg
+from pynxtools_apm.utils.profiling import (
+    PROFILING_JSON_ENV_VAR,
+    StageProfiler,
+    get_field_costs,
+)
+
+
+def test_stage_profiler(tmp_path, monkeypatch):
+    cfg = {
+        "prefix_trg": "/ENTRY[entry*]/measurement",
+        "prefix_src": "",
+        "map": ["name", ("voltage", ureg.kilovolt, "hv", ureg.volt)],
+    }
+    template: dict = {}
+    profiler = StageProfiler()
+    with profiler.stage("eln", "Parse ELN"):
+        add_specific_metadata_pint(cfg, {"name": "x", "hv": 5000.0}, [1], template)
+        with open(__file__, "rb") as fp:
+            fp.read()
+    assert get_field_costs() is None
+    with profiler.stage("cleanup"):
+        pass
+
+    assert [record["name"] for record in profiler.stages] == ["eln", "cleanup"]
+    field_costs = profiler.stages[0]["field_costs"]
+    assert set(field_costs) == {
+        "/ENTRY[entry*]/measurement/name",
+        "/ENTRY[entry*]/measurement/voltage",
+    }
+    assert all(ifo["count"] == 1 for ifo in field_costs.values())
+    assert profiler.stages[1]["field_costs"] == {}
+
+    profiler.to_template(template, 1)
+    trg = "/ENTRY[entry1]/profiling/eventID[event1]"
+    assert template[f"{trg}/description"] == "Parse ELN"
+    assert template[f"{trg}/elapsed_time"] >= 0.0
+    # only fields which NXcs_profiling_event defines
+    assert f"{trg}/cpu_time" not in template
+    assert f"{trg}/number_of_fields" not in template
+    assert "/ENTRY[entry1]/profiling/eventID[event2]/description" in template
+
+    monkeypatch.setenv(PROFILING_JSON_ENV_VAR, str(tmp_path / "profiling.json"))
+    profiler.store_json_if_requested()
+    with open(tmp_path / "profiling.json") as fp:
+        stages = json.load(fp)["stages"]
+    assert stages[0]["field_costs"].keys() == field_costs.keys()
+    assert stages[0]["cpu_time"] >= 0.0
@@ -0,0 +1,69 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import time
+
+import pytest
+
+from pynxtools_apm.utils.stage_graph import StageGraph
+
+
+def get_stage_graph() -> StageGraph:
+    graph = StageGraph()
+
+    def slow(private: dict):
+        # finishes last but is merged in the order of adding, i.e. after
+        # fast_first and before fast, which therefore wins the merge
+        time.sleep(0.2)
+        private["/shared"] = "slow"
+        private["/slow"] = 1
+        return 42
+
+    def fast(private: dict):
+        private["/shared"] = "fast"
+        private["/ignored"] = None
+
+    def dependent(private: dict):
+        private["/dependent"] = graph.results["slow"] + 1
+
+    graph.add("fast_first", fast)
+    graph.add("slow", slow)
+    graph.add("fast", fast)
+    graph.add("dependent", dependent, ("slow",))
+    return graph
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_stage_graph_merges_in_order(max_workers):
+    template = get_stage_graph().run({}, max_workers)
+    assert list(template) == ["/shared", "/slow", "/dependent"]
+    assert template["/shared"] == "fast"
+    assert template["/dependent"] == 43
+
+
+def test_stage_graph_errors():
+    graph = StageGraph()
+    with pytest.raises(ValueError):
+        graph.add("dependent", print, ("unknown",))
+
+    def fail(private: dict):
+        raise RuntimeError("failed")
+
+    graph.add("fail", fail)
+    graph.add("dependent", lambda private: None, ("fail",))
+    with pytest.raises(RuntimeError):
+        graph.run({}, max_workers=2)
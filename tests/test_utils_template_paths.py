@@ -0,0 +1,53 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from pynxtools_apm.utils.remove_uninstantiated import remove_uninstantiated_sensors
+from pynxtools_apm.utils.template_paths import (
+    charge_state_analysis_paths,
+    index_keys_by_suffix,
+    ion_paths,
+)
+
+
+def test_ion_paths():
+    keys = ion_paths(1, 42)
+    assert (
+        keys["nuclide_hash"] == "/ENTRY[entry1]/atom_probeID[atom_probe]/ranging/"
+        "peak_identification/ionID[ion42]/nuclide_hash"
+    )
+    # same interned string objects on every call
+    assert ion_paths(1, 42)["name"] is keys["name"]
+    assert charge_state_analysis_paths(1, 42)["mass"].startswith(
+        keys["name"].replace("name", "charge_state_analysis/")
+    )
+
+
+def test_remove_uninstantiated_sensors():
+    prefix = "/ENTRY[entry1]/measurement/eventID[event1]/instrument"
+    template = {
+        f"{prefix}/analysis_chamber/pressure_sensor/measurement": "pressure",
+        f"{prefix}/analysis_chamber/pressure_sensor/value": 1.0e-10,
+        f"{prefix}/stage/temperature_sensor/measurement": "temperature",
+        f"{prefix}/stage/temperature_sensor/name": "stage",
+    }
+    index = index_keys_by_suffix(template, ("/measurement", "/name"))
+    assert len(index["/measurement"]) == 2 and len(index["/name"]) == 1
+    remove_uninstantiated_sensors(template, 1)
+    assert f"{prefix}/stage/temperature_sensor/measurement" not in template
+    assert f"{prefix}/stage/temperature_sensor/name" in template
+    assert f"{prefix}/analysis_chamber/pressure_sensor/value" in template
@@ -0,0 +1,47 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import numpy as np
+
+from pynxtools_apm.utils.text_ingest import read_text_columns
+
+
+def test_read_text_columns(tmp_path):
+    rng = np.random.default_rng(42)
+    values = (rng.normal(size=(1000, 4)) * 10).astype(np.float32)
+    file_path = tmp_path / "reconstruction.csv"
+    with open(file_path, "w") as fp:
+        fp.write("x;y;z;mq\n")
+        for row in values:
+            fp.write(";".join(f"{value:.6f}" for value in row) + "\n")
+        fp.write("\n")
+    expected = np.loadtxt(file_path, delimiter=";", skiprows=1, dtype=np.float32)
+    # small blocks split the file into many blocks parsed by several workers
+    parsed = read_text_columns(str(file_path), 1, b",;", 4, block_size=1000)
+    assert parsed.dtype == np.float32
+    assert np.array_equal(parsed, expected)
+
+    with open(file_path, "a") as fp:
+        fp.write("1.0;2.0;unknown;4.0\n")
+    assert read_text_columns(str(file_path), 1, b",;", 4, block_size=1000) is None
+
+    # a short and a long row have the right number of values in total
+    file_path = tmp_path / "malformed.csv"
+    with open(file_path, "w") as fp:
+        fp.write("x;y;z;mq\n1.0;2.0;3.0;4.0\n1.0;2.0;3.0\n1.0;2.0;3.0;4.0;5.0\n")
+    assert read_text_columns(str(file_path), 1, b",;", 4) is None